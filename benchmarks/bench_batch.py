@@ -0,0 +1,40 @@
+import os
+import time
+from expression import Expression
+from batch import parse_many
+from benchmarks.generator import generate_corpus
+
+UNIQUE = 20000
+REPEAT = 3
+CHUNK_SIZE = 2000
+
+
+def bench(label, function):
+    start = time.perf_counter()
+    count = sum(1 for _ in function())
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {count / elapsed / 1e3:9.1f} kexpressions/s")
+
+
+def parse_each(catalog):
+    for text in catalog:
+        try:
+            yield Expression(text)
+        except Exception as error:
+            yield error
+
+
+if __name__ == '__main__':
+    # A catalog where every expression appears several times, with an invalid one every hundred
+    corpus = generate_corpus(UNIQUE, length=16, depth=2, variables=4, function_ratio=0.3)
+    corpus = [text + ' +' if i % 100 == 0 else text for i, text in enumerate(corpus)]
+    catalog = corpus * REPEAT
+    print(f"{len(catalog)} expressions, {len(set(catalog))} unique")
+    bench('Expression per item', lambda: parse_each(catalog))
+    # The cache holds every distinct text, so each one is parsed once
+    bench('parse_many', lambda: parse_many(catalog, chunk_size=CHUNK_SIZE, cache_size=UNIQUE))
+    workers = 2
+    while workers <= (os.cpu_count() or 1):
+        bench(f"parse_many x{workers}", lambda: parse_many(catalog, workers=workers, chunk_size=CHUNK_SIZE,
+                                                           cache_size=UNIQUE))
+        workers *= 2
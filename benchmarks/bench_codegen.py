@@ -0,0 +1,37 @@
+import timeit
+import numpy as np
+from expression import Expression
+from benchmarks.generator import generate_expression
+
+EXPRESSIONS = {'short': 'x * y + 1',
+               'medium': 'sin(radians(theta))^2 * r + sqrt(x^2 + y^2) / (1 + x*y) - cbrt(r)',
+               'long': generate_expression(length=64, depth=3, variables=4, function_ratio=0.3)}
+ROWS = 2000
+COLUMNS = 1000000
+REPEAT = 5
+
+
+def per_row(function, rows):
+    return min(timeit.repeat(function, number=1, repeat=REPEAT)) / rows * 1e9
+
+
+def bench(name, text):
+    e = Expression(text)
+    rows = [{variable: 1.5 + (i + index) % 7 for index, variable in enumerate(e.variables)} for i in range(ROWS)]
+    closure = e.compile()
+    generated = e.compile(backend='ast')
+    if any(e.evaluate(row) != generated.evaluate(row) for row in rows):
+        raise AssertionError(f"the generated code of '{name}' does not match evaluate()")
+    columns = {variable: 1.5 + (np.arange(COLUMNS) + index) % 7 for index, variable in enumerate(e.variables)}
+    kernel = e.compile_kernel()
+    print(f"{name:<8} {per_row(lambda: [e.evaluate(row) for row in rows], ROWS):11.0f}ns "
+          f"{per_row(lambda: [closure.evaluate(row) for row in rows], ROWS):9.0f}ns "
+          f"{per_row(lambda: [generated.evaluate(row) for row in rows], ROWS):9.0f}ns "
+          f"{per_row(lambda: e.evaluate_batch(**columns), COLUMNS):13.2f}ns "
+          f"{per_row(lambda: kernel.evaluate(**columns), COLUMNS):9.2f}ns")
+
+
+if __name__ == '__main__':
+    print(f"{'case':<8} {'evaluate()':>13} {'closure':>11} {'ast':>11} {'evaluate_batch':>15} {'kernel':>11}")
+    for name, text in EXPRESSIONS.items():
+        bench(name, text)
@@ -0,0 +1,25 @@
+import timeit
+from expression import Expression
+
+EXPRESSIONS = ['3 + 4 * 2 / ( 1 - 5 ) ^ 2 ^ 3',
+               'sin(radians(theta))^2 + cos(radians(theta))^2',
+               '2pi * r * (r + h) + sqrt(x^2 + y^2) / (1 + x*y)']
+NUMBER = 20000
+
+
+def bench(text):
+    e = Expression(text)
+    bindings = dict.fromkeys(e.variables, 0.5)
+    for name, value in bindings.items():
+        e.assign_value(name, value)
+    compiled = e.compile()
+    interpreted_time = timeit.timeit(e.evaluate, number=NUMBER)
+    compiled_time = timeit.timeit(lambda: compiled.evaluate(bindings), number=NUMBER)
+    print(f"{text}\n    evaluate(): {interpreted_time / NUMBER * 1e6:8.2f} us/call"
+          f"    compiled: {compiled_time / NUMBER * 1e6:8.2f} us/call"
+          f"    speedup: {interpreted_time / compiled_time:5.2f}x")
+
+
+if __name__ == '__main__':
+    for expression in EXPRESSIONS:
+        bench(expression)
@@ -0,0 +1,25 @@
+import time
+import tracemalloc
+from expression import Expression
+from benchmarks.generator import generate_corpus
+
+CORPUS_SIZE = 20000
+
+
+def bench(corpus):
+    start = time.perf_counter()
+    expressions = [Expression(text) for text in corpus]
+    elapsed = time.perf_counter() - start
+    del expressions
+    tracemalloc.start()
+    expressions = [Expression(text) for text in corpus]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tokens = sum(len(expression.tokens) for expression in expressions)
+    print(f"{len(expressions)} expressions, {tokens} tokens: {size / 2 ** 20:.2f} MiB"
+          f" ({size / len(expressions):.0f} bytes/expression, {size / tokens:.1f} bytes/token),"
+          f" {elapsed / len(expressions) * 1e6:.1f} us/expression")
+
+
+if __name__ == '__main__':
+    bench(generate_corpus(CORPUS_SIZE, length=8, depth=1, variables=4, function_ratio=0.3))
@@ -0,0 +1,32 @@
+import decimal
+import timeit
+from expression import Expression
+
+EXPRESSIONS = {'interest': 'principal * (1 + rate / 12) ^ months - principal',
+               'geometry': 'sin(radians(theta))^2 * r + sqrt(x^2 + y^2) / (1 + x*y) - cbrt(r)'}
+ROWS = {'principal': 1000, 'rate': 0.05, 'months': 12, 'theta': 30, 'r': 2, 'x': 3, 'y': 4}
+MODES = {'evaluate()': None,
+         'float': {'numeric': 'float'},
+         'integer': {'numeric': 'integer'},
+         'fraction': {'numeric': 'fraction'},
+         'decimal': {'numeric': 'decimal', 'context': decimal.Context(prec=28)}}
+NUMBER = 2000
+
+
+def per_call(function, variables):
+    return min(timeit.repeat(lambda: function(variables), number=NUMBER, repeat=5)) / NUMBER * 1e6
+
+
+def bench(e, backend, options):
+    # evaluate() is the interpreter, which always works with floats
+    function = e.evaluate if options is None else e.compile(backend, **options).evaluate
+    return per_call(function, {name: ROWS[name] for name in e.variables})
+
+
+if __name__ == '__main__':
+    print(f"{'case':<10} {'backend':<8}" + ''.join(f"{mode:>12}" for mode in MODES))
+    for name, text in EXPRESSIONS.items():
+        e = Expression(text)
+        for backend in ['closure', 'ast']:
+            print(f"{name:<10} {backend:<8}" + ''.join(f"{bench(e, backend, options):10.2f}us"
+                                                      for options in MODES.values()))
@@ -0,0 +1,31 @@
+import os
+import time
+from expression import Expression
+from parallel import parallel_evaluate
+
+EXPRESSION = 'sin(radians(theta))^2 * r + sqrt(x^2 + y^2) / (1 + x*y) - cbrt(r)'
+ROWS = 400000
+CHUNK_SIZE = 10000
+
+
+def rows(count):
+    for i in range(count):
+        yield {'theta': i % 360, 'r': 1 + i % 7, 'x': i / count, 'y': 1 - i / count}
+
+
+def bench(label, results):
+    start = time.perf_counter()
+    count = sum(1 for _ in results)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<20} {count / elapsed / 1e3:9.1f} krows/s")
+
+
+if __name__ == '__main__':
+    expression = Expression(EXPRESSION)
+    compiled = expression.compile()
+    bench('serial', (compiled.evaluate(row) for row in rows(ROWS)))
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        for backend in ['thread', 'process']:
+            bench(f"{backend} x{workers}", parallel_evaluate(expression, rows(ROWS), workers, backend, CHUNK_SIZE))
+        workers *= 2
@@ -0,0 +1,60 @@
+import time
+from tokenizer import Tokenizer, Value, Variable, Function, Operator, Constant, OpenParentheses, CloseParentheses
+from syntax import parse, to_rpn
+from benchmarks.generator import generate_corpus
+from benchmarks.suite import CASES
+
+REPEAT = 5
+
+
+def shunting_yard(tokens):
+    # The conversion to RPN used before the parser built a syntax tree, kept as a reference
+    queue = []
+    stack = []
+    for token in tokens:
+        if isinstance(token, (Value, Variable, Constant)):
+            queue.append(token)
+        if isinstance(token, (OpenParentheses, Function)):
+            stack.append(token)
+        if isinstance(token, Operator):
+            while stack and isinstance(stack[-1], Operator) and _has_operator_higher_precedence(token, stack[-1]):
+                queue.append(stack.pop())
+            stack.append(token)
+        if isinstance(token, CloseParentheses):
+            while not isinstance(stack[-1], OpenParentheses):
+                queue.append(stack.pop())
+            stack.pop()  # Discard open parentheses
+            if stack and isinstance(stack[-1], Function):
+                queue.append(stack.pop())
+    while stack:
+        queue.append(stack.pop())
+    return queue
+
+
+def _has_operator_higher_precedence(token, top):
+    return (top.precedence > token.precedence or
+            (top.precedence == token.precedence and top.associativity == 'left')
+            and not isinstance(top, OpenParentheses))
+
+
+def best_time(function, corpus):
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for tokens in corpus:
+            function(tokens)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1e6
+
+
+if __name__ == '__main__':
+    tokenizer = Tokenizer()
+    print(f"{'case':<8} {'tokens':>8} {'shunting-yard':>16} {'tree':>10} {'tree + rpn':>12}")
+    for name, parameters in CASES.items():
+        corpus = [tokenizer.tokenize(text)[0] for text in generate_corpus(200, **parameters)]
+        mismatches = sum(1 for tokens in corpus if to_rpn(parse(tokens)) != shunting_yard(tokens))
+        if mismatches:
+            raise AssertionError(f"{mismatches} expressions of '{name}' convert to a different RPN")
+        tokens = sum(len(tokens) for tokens in corpus) / len(corpus)
+        print(f"{name:<8} {tokens:8.1f} {best_time(shunting_yard, corpus):14.1f}us "
+              f"{best_time(parse, corpus):8.1f}us {best_time(lambda item: to_rpn(parse(item)), corpus):10.1f}us")
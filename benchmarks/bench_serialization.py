@@ -0,0 +1,33 @@
+import os
+import tempfile
+import time
+from expression import Expression
+from bundle import ExpressionBundle, write_bundle
+from benchmarks.generator import generate_corpus
+
+COUNT = 20000
+USED = 0.1
+
+
+def bench(label, function):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed * 1e3:9.1f} ms")
+    return elapsed
+
+
+if __name__ == '__main__':
+    corpus = list(dict.fromkeys(generate_corpus(COUNT, length=16, depth=2, variables=4, function_ratio=0.3)))
+    used = corpus[:int(len(corpus) * USED)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'expressions.mpxb')
+        bench('write bundle', lambda: write_bundle(path, corpus))
+        print(f"{len(corpus)} expressions, {os.path.getsize(path) / len(corpus):.0f} bytes each")
+        parse = bench('parse all', lambda: [Expression(text) for text in corpus])
+        load = bench('open bundle and load all', lambda: [bundle[text] for bundle in [ExpressionBundle(path)]
+                                                          for text in bundle])
+        bench(f"open bundle and load {USED:.0%}", lambda: [bundle[text] for bundle in [ExpressionBundle(path)]
+                                                           for text in used])
+        bench('open bundle', lambda: ExpressionBundle(path))
+        print(f"loading is {parse / load:.1f}x faster than parsing")
@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import random
+import time
+from server import EvaluationServer
+from client import EvaluationClient
+from benchmarks.generator import generate_corpus, variable_names
+
+PERCENTILES = {'p50': 0.5, 'p90': 0.9, 'p99': 0.99}
+VARIABLES = variable_names(4)
+
+
+def _bindings(generator):
+    return {name: generator.uniform(1, 2) for name in VARIABLES}
+
+
+async def _client(connect, corpus, requests, concurrency, seed, latencies):
+    generator = random.Random(seed)
+    async with await connect() as client:
+        async def request():
+            text = generator.choice(corpus)
+            start = time.perf_counter()
+            try:
+                await client.evaluate(text, _bindings(generator))
+            except (ArithmeticError, ValueError):
+                pass
+            latencies.append(time.perf_counter() - start)
+
+        # Every client keeps a number of requests in flight, like the workers of a web tier
+        for _ in range(requests // concurrency):
+            await asyncio.gather(*(request() for _ in range(concurrency)))
+        return await client.stats()
+
+
+async def run(args):
+    server = None
+    if args.port is None and args.socket is None:
+        server = await EvaluationServer(batch_size=args.batch_size, batch_delay=args.batch_delay / 1e3).start()
+        host, port = server.address[:2]
+    else:
+        host, port = args.host, args.port
+
+    async def connect():
+        return await EvaluationClient.connect(host, port, args.socket)
+
+    corpus = list(generate_corpus(args.expressions, length=8, depth=2, variables=len(VARIABLES), function_ratio=0.3))
+    latencies = []
+    start = time.perf_counter()
+    clients = [_client(connect, corpus, args.requests, args.concurrency, seed, latencies)
+               for seed in range(args.clients)]
+    stats = (await asyncio.gather(*clients))[-1]
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        await server.close()
+
+    latencies.sort()
+    print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.0f} requests/s)")
+    print('client latency ms  ' + '  '.join(f"{name}={latencies[int(q * len(latencies))] * 1e3:.2f}"
+                                            for name, q in PERCENTILES.items()))
+    print(f"server batches={stats['batches']} mean_batch_size={stats['mean_batch_size']:.1f} "
+          f"throughput={stats['throughput']:.0f}/s  " +
+          '  '.join(f"{name}={value:.2f}" for name, value in stats['latency_ms'].items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmarks.bench_server', description='Generate load on the server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('-p', '--port', type=int, help='server port, an in-process server is started by default')
+    parser.add_argument('-s', '--socket', help='server Unix socket')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent connections')
+    parser.add_argument('--requests', type=int, default=5000, help='requests per client')
+    parser.add_argument('--concurrency', type=int, default=50, help='requests in flight per client')
+    parser.add_argument('--expressions', type=int, default=20, help='distinct expressions requested')
+    parser.add_argument('--batch-size', type=int, default=256, help='batch size of the in-process server')
+    parser.add_argument('--batch-delay', type=float, default=1., help='batch delay in ms of the in-process server')
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == '__main__':
+    main()
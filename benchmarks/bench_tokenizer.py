@@ -0,0 +1,32 @@
+import random
+import timeit
+from tokenizer import Tokenizer
+
+TERMS = ['x', '2pi', 'sin(radians(theta))', '3.25', '(a+b)(a-b)', 'sqrt(y^2+1)', '5!', '-z', 'cos(2x)10']
+OPERATORS = ['+', '-', '*', '/', '^']
+NUMBER = 5
+
+
+def generate(length, seed=0):
+    rnd = random.Random(seed)
+    parts = [rnd.choice(TERMS)]
+    size = len(parts[0])
+    while size < length:
+        parts.append(rnd.choice(OPERATORS))
+        parts.append(rnd.choice(TERMS))
+        size += len(parts[-1]) + 3
+    return ' '.join(parts)
+
+
+def bench(length):
+    expression = generate(length)
+    tokenizer = Tokenizer()
+    tokens, _ = tokenizer.tokenize(expression)
+    elapsed = timeit.timeit(lambda: tokenizer.tokenize(expression), number=NUMBER) / NUMBER
+    print(f"{len(expression):>9} chars  {len(tokens):>8} tokens  {elapsed * 1e3:9.2f} ms"
+          f"  {len(expression) / elapsed / 1e6:6.2f} Mchars/s  {len(tokens) / elapsed / 1e6:6.2f} Mtokens/s")
+
+
+if __name__ == '__main__':
+    for size in [1_000, 10_000, 100_000, 1_000_000]:
+        bench(size)
@@ -0,0 +1,46 @@
+import random
+
+OPERATORS = ['+', '-', '*', '/']
+# Functions that are defined for every real argument, sqrt and cbrt get a non-negative one
+FUNCTIONS = ['sin', 'cos', 'radians', 'degrees']
+ROOTS = ['sqrt', 'cbrt']
+CONSTANTS = ['pi', 'e', 'phi']
+
+
+def variable_names(count):
+    return [f"v{chr(ord('a') + i % 26)}{'' if i < 26 else chr(ord('a') + i // 26)}" for i in range(count)]
+
+
+def generate_expression(length=8, depth=2, variables=3, function_ratio=0.2, seed=0):
+    rnd = random.Random(seed)
+    return _expression(rnd, length, depth, variable_names(variables), function_ratio)
+
+
+def generate_corpus(count, length=8, depth=2, variables=3, function_ratio=0.2, seed=0):
+    return [generate_expression(length, depth, variables, function_ratio, seed + i) for i in range(count)]
+
+
+def _expression(rnd, length, depth, names, function_ratio):
+    parts = [_term(rnd, depth, names, function_ratio)]
+    for _ in range(length - 1):
+        parts.append(rnd.choice(OPERATORS))
+        parts.append(_term(rnd, depth, names, function_ratio))
+    return ''.join(parts)
+
+
+def _term(rnd, depth, names, function_ratio):
+    if depth > 0:
+        draw = rnd.random()
+        if draw < function_ratio:
+            inner = _expression(rnd, 2, depth - 1, names, function_ratio)
+            if rnd.random() < 0.3:
+                return f"{rnd.choice(ROOTS)}(({inner})^2)"
+            return f"{rnd.choice(FUNCTIONS)}({inner})"
+        if draw < function_ratio + 0.3:
+            return f"({_expression(rnd, 3, depth - 1, names, function_ratio)})"
+    draw = rnd.random()
+    if draw < 0.5:
+        return rnd.choice(names)
+    if draw < 0.6:
+        return rnd.choice(CONSTANTS)
+    return f"{rnd.randint(1, 99)}.{rnd.randint(0, 9)}"
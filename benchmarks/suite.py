@@ -0,0 +1,139 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from expression import Expression
+from tokenizer import Tokenizer
+from benchmarks.generator import generate_corpus
+
+CASES = {'small': {'length': 4, 'depth': 1, 'variables': 2, 'function_ratio': 0.2},
+         'medium': {'length': 16, 'depth': 2, 'variables': 4, 'function_ratio': 0.3},
+         'large': {'length': 64, 'depth': 3, 'variables': 8, 'function_ratio': 0.3},
+         'deep': {'length': 3, 'depth': 8, 'variables': 2, 'function_ratio': 0.5},
+         'wide': {'length': 128, 'depth': 0, 'variables': 64, 'function_ratio': 0.0}}
+CORPUS_SIZE = 100
+
+
+def _best_time(function, corpus, repeat):
+    # The best of several runs is the least disturbed by the rest of the system
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in corpus:
+            function(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1e6
+
+
+def _memory(corpus):
+    tracemalloc.start()
+    expressions = [Expression(text) for text in corpus]
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del expressions
+    return size / len(corpus), peak / len(corpus)
+
+
+def _bindings(expression):
+    return {name: 1.5 + i / 7 for i, name in enumerate(sorted(expression.variables))}
+
+
+def _evaluates(text):
+    expression = Expression(text)
+    try:
+        expression.evaluate(_bindings(expression))
+    except ArithmeticError:
+        return False
+    return True
+
+
+def run_case(parameters, repeat, corpus_size=CORPUS_SIZE):
+    # Random expressions may divide by zero (e.g. x/(x-x)), those are left out of the corpus
+    corpus = [text for text in generate_corpus(corpus_size, **parameters) if _evaluates(text)]
+    tokenizer = Tokenizer()
+    expressions = [Expression(text) for text in corpus]
+    bindings = [(expression, _bindings(expression)) for expression in expressions]
+    compiled = [(expression.compile(), variables) for expression, variables in bindings]
+    memory, peak_memory = _memory(corpus)
+    return {'parameters': parameters,
+            'tokens': sum(len(expression.tokens) for expression in expressions) / len(expressions),
+            'tokenize_us': _best_time(tokenizer.tokenize, corpus, repeat),
+            'rpn_us': _best_time(lambda expression: expression._convert_to_rpn(), expressions, repeat),
+            'parse_us': _best_time(Expression, corpus, repeat),
+            'evaluate_us': _best_time(lambda item: item[0].evaluate(item[1]), bindings, repeat),
+            'compile_us': _best_time(lambda expression: expression.compile(), expressions, repeat),
+            'compiled_evaluate_us': _best_time(lambda item: item[0].evaluate(item[1]), compiled, repeat),
+            'memory_bytes': memory,
+            'peak_memory_bytes': peak_memory}
+
+
+def run(cases, repeat):
+    results = {}
+    for name in cases:
+        results[name] = run_case(CASES[name], repeat)
+        print(_format_case(name, results[name]), file=sys.stderr)
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results': results}
+
+
+def _format_case(name, result):
+    metrics = '  '.join(f"{metric}={value:.1f}" for metric, value in result.items() if metric != 'parameters')
+    return f"{name:<8} {metrics}"
+
+
+def compare(baseline, current, threshold):
+    regressions = []
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        for metric, value in result.items():
+            previous = baseline['results'][name].get(metric)
+            if metric in ('parameters', 'tokens') or not previous:
+                continue
+            change = value / previous - 1
+            flag = 'REGRESSION' if change > threshold else ''
+            print(f"{name:<8} {metric:<22} {previous:12.1f} {value:12.1f} {change:+8.1%} {flag}", file=sys.stderr)
+            if flag:
+                regressions.append((name, metric, change))
+    return regressions
+
+
+def _load(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmarks.suite', description='Benchmark the parser stages.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('-o', '--output', help='write the results as JSON to this file')
+    run_parser.add_argument('-c', '--cases', default=','.join(CASES), help='comma separated cases to run')
+    run_parser.add_argument('-r', '--repeat', type=int, default=5, help='runs per measurement, the best is kept')
+    run_parser.add_argument('-b', '--baseline', help='compare the results with this JSON file')
+    run_parser.add_argument('-t', '--threshold', type=float, default=0.1, help='relative slowdown flagged')
+    compare_parser = commands.add_parser('compare', help='compare two JSON result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('-t', '--threshold', type=float, default=0.1, help='relative slowdown flagged')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        current = run(args.cases.split(','), args.repeat)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                json.dump(current, file, indent=2)
+        baseline = _load(args.baseline) if args.baseline else None
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+    if baseline is None:
+        return 0
+    return 1 if compare(baseline, current, args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
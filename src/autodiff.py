@@ -0,0 +1,182 @@
+import math
+from types import SimpleNamespace
+from tokenizer import Value, Variable, Function, Operator, Constant, FUNCTION_TOKENS
+from errors import UnassignedVariable
+import vectorized
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+MODES = ('forward', 'reverse')
+EULER_GAMMA = 0.5772156649015329
+
+
+def _digamma_of_successor(value):
+    # factorial(n) = gamma(n + 1) is only defined for integers here, where digamma(n + 1) = H(n) - gamma
+    return math.fsum(1. / k for k in range(1, int(value) + 1)) - EULER_GAMMA
+
+
+def _scalar_log(value):
+    # Only used for the derivative of a ^ b with respect to b, which is 0 at a = 0 and undefined for a < 0
+    if value > 0:
+        return math.log(value)
+    return 0. if value == 0 else math.nan
+
+
+def _vector_log(values):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(values > 0, np.log(np.where(values > 0, values, 1.)), np.where(values == 0, 0., np.nan))
+
+
+def _scalar_divide(a, b):
+    # Derivatives can be unbounded where the value is defined, like sqrt at 0, they are then inf or nan as with NumPy
+    try:
+        return a / b
+    except ZeroDivisionError:
+        return math.nan if a == 0 or math.isnan(a) else math.copysign(math.inf, a) * math.copysign(1., b)
+
+
+def _scalar_power_derivative(a, b):
+    # b * a ^ (b - 1), which is 0 for b = 0 whatever a is, and unbounded at a = 0 for b < 1
+    if b == 0:
+        return 0.
+    if a == 0 and b < 1:
+        return b * math.inf
+    return b * a ** (b - 1)
+
+
+def _vector_power_derivative(a, b):
+    return np.where(b == 0, 0., b * np.power(a, b - 1))
+
+
+SCALAR = SimpleNamespace(sin=math.sin, cos=math.cos, log=_scalar_log, digamma_of_successor=_digamma_of_successor,
+                         divide=_scalar_divide, power_derivative=_scalar_power_derivative,
+                         literal=float, apply=lambda token, operands: token.function(*operands))
+
+if np is not None:
+    VECTOR = SimpleNamespace(sin=np.sin, cos=np.cos, log=_vector_log, divide=np.true_divide,
+                             power_derivative=_vector_power_derivative,
+                             digamma_of_successor=lambda values: np.asarray(
+                                 np.frompyfunc(_digamma_of_successor, 1, 1)(values), dtype=float),
+                             literal=lambda value: np.float64(float(value)),
+                             apply=vectorized.apply)
+else:  # pragma: no cover
+    VECTOR = None
+
+# Partial derivatives of every operator and function with respect to each of its operands,
+# given the operands, the result and the math backend
+OPERATOR_DERIVATIVES = {'+': lambda a, b, result, lib: (1., 1.),
+                        '-': lambda a, b, result, lib: (1., -1.),
+                        '*': lambda a, b, result, lib: (b, a),
+                        '/': lambda a, b, result, lib: (1. / b, -a / b ** 2),
+                        '^': lambda a, b, result, lib: (lib.power_derivative(a, b), result * lib.log(a)),
+                        '!': lambda a, result, lib: (result * lib.digamma_of_successor(a),),
+                        '-u': lambda a, result, lib: (-1.,)}
+
+FUNCTION_DERIVATIVES = {'sqrt': lambda a, result, lib: (lib.divide(.5, result),),
+                        'cbrt': lambda a, result, lib: (lib.divide(1., 3 * result ** 2),),
+                        'sin': lambda a, result, lib: (lib.cos(a),),
+                        'cos': lambda a, result, lib: (-lib.sin(a),),
+                        'tan': lambda a, result, lib: (1 + result ** 2,),
+                        'radians': lambda a, result, lib: (math.pi / 180,),
+                        'degrees': lambda a, result, lib: (180 / math.pi,)}
+
+
+def derivative_of(token):
+    if isinstance(token, Operator):
+        return OPERATOR_DERIVATIVES[token.symbol]
+    # The rules are those of the built-in functions, a registered function of the same name computes something else
+    if FUNCTION_TOKENS.get(token.symbol) is not token:
+        raise ValueError(f"no derivative is known for the registered function '{token.symbol}'")
+    return FUNCTION_DERIVATIVES[token.symbol]
+
+
+def _ensure_variables_assigned(variables, bindings):
+    unassigned_variables = [name for name in variables if bindings.get(name) is None]
+    if unassigned_variables:
+        raise UnassignedVariable(str(unassigned_variables))
+
+
+def _trace(rpn, bindings, lib):
+    # Evaluates the RPN keeping every intermediate value and which nodes are the operands of each node
+    values = []
+    nodes = []
+    stack = []
+    for token in rpn:
+        if isinstance(token, (Operator, Function)):
+            operands = tuple(stack[-token.operands_count:])
+            del stack[-token.operands_count:]
+            arguments = [values[operand] for operand in operands]
+            values.append(lib.apply(token, arguments))
+            nodes.append((derivative_of(token), operands))
+        if isinstance(token, (Value, Constant)):
+            values.append(lib.literal(token.value))
+            nodes.append((None, ()))
+        if isinstance(token, Variable):
+            values.append(bindings[token.symbol])
+            nodes.append((None, token.symbol))
+        stack.append(len(values) - 1)
+    return values, nodes, stack[0]
+
+
+def _partials(nodes, values, index, lib):
+    rule, operands = nodes[index]
+    return rule(*[values[operand] for operand in operands], values[index], lib)
+
+
+def _forward_mode(values, nodes, root, lib):
+    tangents = []
+    for index, (rule, operands) in enumerate(nodes):
+        if rule is None:
+            tangents.append({operands: 1.} if isinstance(operands, str) else {})
+            continue
+        tangent = {}
+        for operand, partial in zip(operands, _partials(nodes, values, index, lib)):
+            for name, derivative in tangents[operand].items():
+                tangent[name] = tangent.get(name, 0.) + partial * derivative
+        tangents.append(tangent)
+    return tangents[root]
+
+
+def _reverse_mode(values, nodes, root, lib):
+    adjoints = [0.] * len(nodes)
+    adjoints[root] = 1.
+    partials = {}
+    for index in range(root, -1, -1):
+        rule, operands = nodes[index]
+        adjoint = adjoints[index]
+        if rule is None:
+            if isinstance(operands, str):
+                partials[operands] = partials.get(operands, 0.) + adjoint
+            continue
+        for operand, partial in zip(operands, _partials(nodes, values, index, lib)):
+            adjoints[operand] = adjoints[operand] + adjoint * partial
+    return partials
+
+
+def gradient(rpn, variables, bindings, mode='reverse'):
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    _ensure_variables_assigned(variables, bindings)
+    values, nodes, root = _trace(rpn, bindings, SCALAR)
+    differentiate = _forward_mode if mode == 'forward' else _reverse_mode
+    partials = differentiate(values, nodes, root, SCALAR)
+    return values[root], {name: partials.get(name, 0.) for name in variables}
+
+
+def gradient_batch(rpn, variables, columns, mode='reverse'):
+    if np is None:
+        raise ImportError('NumPy is required for batch evaluation')
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    _ensure_variables_assigned(variables, columns)
+    arrays = {name: np.asarray(columns[name], dtype=float) for name in variables}
+    shape = np.broadcast_shapes(*(array.shape for array in arrays.values()))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        values, nodes, root = _trace(rpn, arrays, VECTOR)
+        differentiate = _forward_mode if mode == 'forward' else _reverse_mode
+        partials = differentiate(values, nodes, root, VECTOR)
+    return np.broadcast_to(values[root], shape).copy(), \
+        {name: np.broadcast_to(partials.get(name, 0.), shape).copy() for name in variables}
@@ -0,0 +1,206 @@
+import os
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from expression import Expression, ExpressionOptions
+from parallel import chunks
+from serialization import dumps, loads
+
+# Parsed texts kept to answer repeated texts, the oldest are forgotten first
+CACHE_SIZE = 10000
+
+
+class ParseResult:
+    __slots__ = ('index', 'text', 'expression', 'error')
+
+    def __init__(self, index, text, expression=None, error=None):
+        self.index = index
+        self.text = text
+        self.expression = expression
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def position(self):
+        return getattr(self.error, 'position', None)
+
+    def __repr__(self):
+        outcome = repr(self.expression) if self.error is None else f"{self.error.__class__.__name__} at {self.position}"
+        return f"ParseResult ({self.index}, {self.text!r}, {outcome})"
+
+
+def _parse(text, registry=None):
+    # Any failure is the result of its text only and never stops the batch
+    try:
+        expression = Expression(text, registry=registry)
+    except Exception as error:
+        return error
+    return tuple(expression.tokens), tuple(expression.variables), tuple(expression.rpn)
+
+
+def _not_a_string(text):
+    return TypeError(f"expression must be a string, not {text.__class__.__name__}")
+
+
+def _parse_chunk(texts, registry):
+    return [_parse(text, registry) for text in texts]
+
+
+def _parse_in_worker(text, registry):
+    # Parsed expressions travel back in the binary format, so the tokens are interned again when they are loaded
+    try:
+        parsed = _parse(text, registry)
+        return parsed if isinstance(parsed, Exception) else dumps(Expression.from_parsed(*parsed))
+    except Exception as error:
+        return error
+
+
+def _parse_chunk_in_worker(texts, registry):
+    return [_parse_in_worker(text, registry) for text in texts]
+
+
+def _load(result, registry):
+    if isinstance(result, Exception):
+        return result
+    try:
+        return loads(result, registry)
+    except Exception as error:
+        return error
+
+
+class _ParsedTexts:
+    # The last cache_size distinct texts of a stream with their parsed parts, and the options of their expressions
+    def __init__(self, options, cache_size):
+        self.options = options
+        self.cache_size = cache_size
+        self._parsed = OrderedDict()
+        # Every distinct text seen, so that texts parsed again after they were forgotten are not counted twice. Unlike
+        # the parsed texts this set is not bounded, it keeps one reference to each distinct text of the stream
+        self._seen = set()
+
+    @property
+    def unique(self):
+        return len(self._seen)
+
+    def missing(self, chunk, in_flight):
+        parsed = self._parsed
+        # Items that are not strings, some of them unhashable, are left out and fail on their own
+        return list(dict.fromkeys(text for text in chunk
+                                  if isinstance(text, str) and text not in parsed and text not in in_flight))
+
+    def get(self, text):
+        parsed = self._parsed.get(text)
+        if parsed is not None:
+            self._parsed.move_to_end(text)
+            return parsed
+        # Texts forgotten since they were sent to a worker are parsed again here
+        return self.store(text, _parse(text, self.options.registry))
+
+    def store(self, text, parsed):
+        self._seen.add(text)
+        self._parsed[text] = parsed
+        if len(self._parsed) > self.cache_size:
+            self._parsed.popitem(last=False)
+        return parsed
+
+
+class ParseStream:
+    def __init__(self, texts, workers, chunk_size, parsed, progress):
+        self.parsed = parsed
+        self.progress = progress
+        self._counts = Counter()
+        self._start = None
+        self._elapsed = 0.
+        self._results = self._stream(texts, workers, chunk_size)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._results)
+
+    def _stream(self, texts, workers, chunk_size):
+        self._start = perf_counter()
+        registry = self.parsed.options.registry
+        try:
+            if workers > 1:
+                yield from self._stream_in_workers(texts, workers, chunk_size, registry)
+            else:
+                for chunk in chunks(texts, chunk_size):
+                    unique = self.parsed.missing(chunk, ())
+                    yield from self._results_of(chunk, dict(zip(unique, _parse_chunk(unique, registry))))
+        finally:
+            self._elapsed = perf_counter() - self._start
+            self._start = None
+
+    def _stream_in_workers(self, texts, workers, chunk_size, registry):
+        with ProcessPoolExecutor(workers) as executor:
+            # Texts already sent to a worker are not sent again, chunks are resolved in order so their results
+            # are known by the time a later chunk needs them
+            pending = deque()
+            in_flight = set()
+            for chunk in chunks(texts, chunk_size):
+                unique = self.parsed.missing(chunk, in_flight)
+                in_flight.update(unique)
+                pending.append((chunk, unique, executor.submit(_parse_chunk_in_worker, unique, registry)))
+                if len(pending) >= 2 * workers:
+                    yield from self._resolve(pending.popleft(), in_flight)
+            while pending:
+                yield from self._resolve(pending.popleft(), in_flight)
+
+    def _resolve(self, entry, in_flight):
+        chunk, unique, future = entry
+        try:
+            results = [_load(result, self.parsed.options.registry) for result in future.result()]
+        except Exception as error:
+            # A chunk that could not be parsed at all, like when a worker dies, fails its texts but not the stream
+            results = [error] * len(unique)
+        in_flight.difference_update(unique)
+        return self._results_of(chunk, dict(zip(unique, results)))
+
+    def _results_of(self, chunk, fresh):
+        for text, parsed in fresh.items():
+            self.parsed.store(text, parsed)
+        counts = self._counts
+        results = []
+        for text in chunk:
+            if not isinstance(text, str):
+                counts['not_strings'] += 1
+                parsed = _not_a_string(text)
+            else:
+                parsed = fresh.get(text)
+                if parsed is None:
+                    parsed = self.parsed.get(text)
+            if isinstance(parsed, Exception):
+                counts['errors'] += 1
+                results.append(ParseResult(counts['items'], text, error=parsed))
+            else:
+                expression = Expression.from_parsed(*parsed, self.parsed.options)
+                results.append(ParseResult(counts['items'], text, expression))
+            counts['items'] += 1
+        if self.progress is not None:
+            self.progress(self.stats())
+        return results
+
+    def stats(self):
+        elapsed = self._elapsed if self._start is None else perf_counter() - self._start
+        counts = self._counts
+        return {'items': counts['items'],
+                'unique': self.parsed.unique,
+                'duplicates': counts['items'] - self.parsed.unique - counts['not_strings'],
+                'errors': counts['errors'],
+                'elapsed': elapsed,
+                'throughput': counts['items'] / elapsed if elapsed else 0.}
+
+
+def parse_many(texts, workers=1, chunk_size=1000, progress=None, cache_size=CACHE_SIZE, **options):
+    # The other keyword arguments, like optimize, simplify and registry, are the options of the parsed expressions
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    if workers < 0:
+        raise ValueError('workers must not be negative')
+    return ParseStream(texts, workers or os.cpu_count() or 1, chunk_size,
+                       _ParsedTexts(ExpressionOptions(**options), cache_size), progress)
@@ -0,0 +1,104 @@
+import mmap
+import struct
+from expression import Expression, ExpressionOptions
+from errors import InvalidFormat
+from serialization import FORMAT_VERSION, READABLE_VERSIONS, dumps, loads
+
+# A bundle is a header followed by an index of (key, offset, length) entries and the serialized expressions
+BUNDLE_MAGIC = b'MPXB'
+BUNDLE_HEADER = struct.Struct('<4sBI')
+KEY_LENGTH = struct.Struct('<H')
+ENTRY = struct.Struct('<QI')
+
+
+def write_bundle(path, expressions):
+    # Expressions are given as texts, which are their own keys, or as a mapping of keys to expressions or texts
+    if not hasattr(expressions, 'items'):
+        expressions = {text: text for text in expressions}
+    records = [(key.encode('utf-8'), dumps(Expression(value) if isinstance(value, str) else value))
+               for key, value in expressions.items()]
+    # Keys are checked before the file is opened, so that a failure leaves no truncated bundle behind
+    longest = max((len(key) for key, _ in records), default=0)
+    if longest >= 2 ** (8 * KEY_LENGTH.size):
+        raise ValueError(f"keys of {longest} bytes are too long to store in a bundle")
+    offset = BUNDLE_HEADER.size + sum(KEY_LENGTH.size + len(key) + ENTRY.size for key, _ in records)
+    with open(path, 'wb') as file:
+        file.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, FORMAT_VERSION, len(records)))
+        for key, record in records:
+            file.write(KEY_LENGTH.pack(len(key)) + key + ENTRY.pack(offset, len(record)))
+            offset += len(record)
+        for _, record in records:
+            file.write(record)
+
+
+class ExpressionBundle:
+    def __init__(self, path, optimize=True, simplify=False, registry=None):
+        self.path = path
+        self.options = ExpressionOptions(optimize, simplify, registry=registry)
+        self._parsed = {}
+        with open(path, 'rb') as file:
+            # Empty files cannot be memory mapped
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if file.seek(0, 2) else b''
+        try:
+            self._index = self._read_index()
+        except (struct.error, UnicodeDecodeError) as error:
+            self.close()
+            raise InvalidFormat('corrupted bundle index') from error
+        except InvalidFormat:
+            self.close()
+            raise
+
+    def _read_index(self):
+        if len(self._data) < BUNDLE_HEADER.size:
+            raise InvalidFormat('truncated bundle header')
+        magic, version, count = BUNDLE_HEADER.unpack_from(self._data)
+        if magic != BUNDLE_MAGIC:
+            raise InvalidFormat('not an expression bundle')
+        if version not in READABLE_VERSIONS:
+            raise InvalidFormat(f"unsupported format version {version}, expected {FORMAT_VERSION}")
+        index = {}
+        offset = BUNDLE_HEADER.size
+        for _ in range(count):
+            length, = KEY_LENGTH.unpack_from(self._data, offset)
+            offset += KEY_LENGTH.size
+            key = self._data[offset:offset + length].decode('utf-8')
+            start, size = ENTRY.unpack_from(self._data, offset + length)
+            offset += length + ENTRY.size
+            if start + size > len(self._data):
+                raise InvalidFormat(f"entry '{key}' out of bounds")
+            index[key] = (start, size)
+        return index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __getitem__(self, key):
+        # Expressions are decoded on first use only, and every call returns a fresh expression with its own variables
+        parsed = self._parsed.get(key)
+        if parsed is None:
+            start, size = self._index[key]
+            parsed = self._parsed[key] = loads(self._data[start:start + size], self.options.registry)
+        return Expression.from_parsed(*parsed, self.options)
+
+    def get(self, key, default=None):
+        return self[key] if key in self._index else default
+
+    @property
+    def materialized(self):
+        return len(self._parsed)
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,65 @@
+import threading
+from collections import OrderedDict
+from expression import Expression, ExpressionOptions
+from tokenizer import DEFAULT_REGISTRY
+
+
+class ParserCache:
+    def __init__(self, maxsize=4096):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, expression, metrics=None, registry=None):
+        # The same text is parsed differently by every registry, and by a registry once a name is registered, which
+        # replaces its tokens table
+        key = (registry if registry is not None else DEFAULT_REGISTRY, expression)
+        words = key[0].tokens
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = entry is not None and entry[0] is words
+            if hit:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if not hit:
+            entry = words, self._parse(expression, metrics, registry)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        if metrics is not None:
+            metrics.record_parse_cache(hit=hit)
+        return Expression.from_parsed(*entry[1], ExpressionOptions(metrics=metrics, registry=registry))
+
+    @staticmethod
+    def _parse(expression, metrics, registry):
+        parsed = Expression(expression, metrics=metrics, registry=registry)
+        return tuple(parsed.tokens), tuple(parsed.variables), tuple(parsed.rpn)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'size': len(self._entries),
+                    'maxsize': self.maxsize}
+
+
+PARSER_CACHE = ParserCache()
+
+
+def parse(expression, metrics=None, registry=None):
+    return PARSER_CACHE.get(expression, metrics, registry)
@@ -0,0 +1,78 @@
+import asyncio
+import itertools
+import json
+from errors import UnassignedVariable, UnexpectedToken
+from src.errors import UnmatchingOpenParentheses, UnmatchingCloseParentheses, UnexpectedCharacter
+
+# Errors reported by the server are raised again on the client with the same type
+ERRORS = {error.__name__: error for error in (UnmatchingOpenParentheses, UnmatchingCloseParentheses,
+                                              UnexpectedCharacter, UnexpectedToken, UnassignedVariable,
+                                              ZeroDivisionError, OverflowError, ArithmeticError, KeyError,
+                                              IndexError, TypeError, ValueError)}
+
+
+class EvaluationClient:
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._pending = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def evaluate(self, expression, variables=None):
+        return await self._request({'expression': expression, 'variables': variables or {}})
+
+    async def evaluate_many(self, expression, rows):
+        return await asyncio.gather(*(self.evaluate(expression, variables) for variables in rows))
+
+    async def stats(self):
+        return await self._request({'command': 'stats'})
+
+    async def _request(self, request):
+        request['id'] = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request['id']] = future
+        self._writer.write(json.dumps(request).encode() + b'\n')
+        await self._writer.drain()
+        return await future
+
+    async def _receive(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._pending.pop(response['id'])
+                if future.done():
+                    continue
+                if 'error' in response:
+                    future.set_exception(ERRORS.get(response['error'], RuntimeError)(response['message']))
+                else:
+                    future.set_result(response['result'])
+        except ConnectionError:
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('connection to the evaluation server lost'))
+            self._pending.clear()
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        await self._receiver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
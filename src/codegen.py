@@ -0,0 +1,158 @@
+import ast
+import types
+from tokenizer import Value, Variable, Function, Operator, Constant
+from errors import UnassignedVariable
+import vectorized
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+BINARY_OPERATORS = {'+': ast.Add, '-': ast.Sub, '*': ast.Mult, '/': ast.Div, '^': ast.Pow}
+UNARY_OPERATORS = {'-u': ast.USub}
+# Rows are evaluated in blocks small enough for the operands and temporaries of a block to stay in cache
+BLOCK_SIZE = 4096
+
+
+def _name(identifier, context=ast.Load):
+    return ast.Name(identifier, context())
+
+
+class _Bindings:
+    # The functions and literals the generated code refers to by name
+    def __init__(self, function_of, numeric):
+        self.function_of = function_of
+        self.numeric = numeric
+        self.functions = {}
+        self.literals = {}
+
+    def function(self, function):
+        return _name(self.functions.setdefault(function, f"f{len(self.functions)}"))
+
+    def literal(self, value):
+        identifier = f"c{len(self.literals)}"
+        self.literals[identifier] = value
+        return _name(identifier)
+
+    def call(self, token, operands):
+        if self.numeric is not None:
+            function = self.numeric.function(token)
+        else:
+            function = token.function if self.function_of is None else self.function_of(token)
+        return ast.Call(self.function(function), operands, [])
+
+    def values(self):
+        return {**{identifier: function for function, identifier in self.functions.items()}, **self.literals}
+
+
+def generate(rpn, variables, function_of=None, numeric=None):
+    # Every variable is an argument and every RPN stack slot a local that holds the result of the last operation
+    # written to it, so the function is flat whatever the depth of the expression. Without function_of or a
+    # numeric mode, arithmetic operators are written as Python operators and the other tokens call their function
+    native = function_of is None and numeric is None
+    arguments = {name: f"v{index}" for index, name in enumerate(variables)}
+    bindings = _Bindings(function_of, numeric)
+    body = []
+    if numeric is not None and numeric.convert is not None:
+        convert = bindings.function(numeric.convert)
+        body.extend(ast.Assign([_name(argument, ast.Store)], ast.Call(convert, [_name(argument)], []))
+                    for argument in arguments.values())
+    stack = []
+    for token in rpn:
+        if isinstance(token, (Value, Constant)) and numeric is None:
+            stack.append(ast.Constant(float(token.value)))
+        elif isinstance(token, (Value, Constant)):
+            # Values of other types than float cannot be written in the code, they are bound like functions
+            stack.append(bindings.literal(numeric.value(token)))
+        elif isinstance(token, Variable):
+            stack.append(_name(arguments[token.symbol]))
+        elif isinstance(token, (Operator, Function)):
+            operands = stack[-token.operands_count:]
+            del stack[-token.operands_count:]
+            if native and isinstance(token, Operator) and token.symbol in BINARY_OPERATORS:
+                value = ast.BinOp(operands[0], BINARY_OPERATORS[token.symbol](), operands[1])
+            elif native and isinstance(token, Operator) and token.symbol in UNARY_OPERATORS:
+                value = ast.UnaryOp(UNARY_OPERATORS[token.symbol](), operands[0])
+            else:
+                value = bindings.call(token, operands)
+            slot = f"s{len(stack)}"
+            body.append(ast.Assign([_name(slot, ast.Store)], value))
+            stack.append(_name(slot))
+    body.append(ast.Return(stack[0]))
+    return _define(list(arguments.values()), bindings.values(), body)
+
+
+def _define(arguments, values, body):
+    module = ast.parse('def expression(): pass')
+    definition = module.body[0]
+    # Functions and literals are bound as keyword defaults, which are read as fast as locals
+    definition.args = ast.arguments(posonlyargs=[], args=[ast.arg(argument) for argument in arguments],
+                                    vararg=None, kwonlyargs=[ast.arg(identifier) for identifier in values],
+                                    kw_defaults=[_name(identifier) for identifier in values],
+                                    kwarg=None, defaults=[])
+    definition.body = body
+    ast.fix_missing_locations(module)
+    # The module only defines the function, so the function is made from its code without running the module, and
+    # given the values of its defaults directly
+    code = next(constant for constant in compile(module, '<expression>', 'exec').co_consts
+                if isinstance(constant, types.CodeType))
+    function = types.FunctionType(code, {})
+    function.__kwdefaults__ = values
+    return function, ast.unparse(module)
+
+
+def _ensure_assigned(names, values):
+    unassigned_variables = [name for name, value in zip(names, values) if value is None]
+    if unassigned_variables:
+        raise UnassignedVariable(str(unassigned_variables))
+
+
+class GeneratedExpression:
+    def __init__(self, rpn, variables, numeric=None):
+        self.rpn = rpn
+        self.variables = tuple(variables)
+        self.numeric = numeric
+        self.function, self.source = generate(rpn, self.variables, numeric=numeric)
+
+    def __reduce__(self):
+        # Generated functions cannot be pickled, so the expression is generated again when unpickled
+        return self.__class__, (self.rpn, self.variables, self.numeric)
+
+    def evaluate(self, variables):
+        values = list(map(variables.get, self.variables))
+        for value in values:
+            if value is None:
+                _ensure_assigned(self.variables, values)
+        return self.function(*values)
+
+
+class GeneratedKernel:
+    def __init__(self, rpn, variables, block_size=BLOCK_SIZE):
+        if np is None:
+            raise ImportError('NumPy is required for kernels')
+        self.rpn = rpn
+        self.variables = tuple(variables)
+        self.block_size = block_size
+        self.function, self.source = generate(rpn, self.variables, vectorized.function_of)
+
+    def __reduce__(self):
+        return self.__class__, (self.rpn, self.variables, self.block_size)
+
+    def evaluate(self, **columns):
+        values = [columns.get(name) for name in self.variables]
+        _ensure_assigned(self.variables, values)
+        arrays = [np.asarray(value, dtype=float) for value in values]
+        shape = np.broadcast_shapes(*(array.shape for array in arrays))
+        # Columns of a single value are given whole to every block, the others are cut into blocks of rows
+        arrays = [array.reshape(()) if array.size == 1 else np.broadcast_to(array, shape).reshape(-1)
+                  for array in arrays]
+        result = np.empty(shape)
+        output = result.reshape(-1)
+        block_size = self.block_size
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            for start in range(0, output.size, block_size):
+                end = start + block_size
+                output[start:end] = self.function(*[array if array.ndim == 0 else array[start:end]
+                                                    for array in arrays])
+        return result
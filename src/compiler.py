@@ -0,0 +1,83 @@
+from tokenizer import Value, Variable, Function, Operator, Constant
+from errors import UnassignedVariable
+
+# Closures call each other once per level of the tree, deeper sub-trees are evaluated apart so that evaluation
+# never gets close to the recursion limit
+MAX_DEPTH = 100
+
+
+class CompiledExpression:
+    def __init__(self, rpn, variables, numeric=None):
+        self.rpn = rpn
+        self.variables = tuple(variables)
+        self.numeric = numeric
+        self._function = self._compile(rpn, numeric)
+
+    def __reduce__(self):
+        # Closures cannot be pickled, so the expression is compiled again when unpickled
+        return self.__class__, (self.rpn, self.variables, self.numeric)
+
+    @classmethod
+    def _compile(cls, rpn, numeric=None):
+        # The functions and literals of a numeric mode are chosen here once, the closures never check types
+        stack = []
+        stages = []
+        for token in rpn:
+            if isinstance(token, (Operator, Function)):
+                operands = stack[-token.operands_count:]
+                del stack[-token.operands_count:]
+                function = cls._apply(token.function if numeric is None else numeric.function(token),
+                                      *[operand for operand, _ in operands])
+                depth = 1 + max((depth for _, depth in operands), default=0)
+                if depth >= MAX_DEPTH:
+                    # The result of the sub-tree is computed first and read like a variable by the rest of the tree
+                    key = (len(stages),)
+                    stages.append((key, function))
+                    function, depth = cls._variable(key), 1
+                stack.append((function, depth))
+            if isinstance(token, (Value, Constant)):
+                stack.append((cls._literal(float(token.value) if numeric is None else numeric.value(token)), 1))
+            if isinstance(token, Variable):
+                if numeric is None or numeric.convert is None:
+                    stack.append((cls._variable(token.symbol), 1))
+                else:
+                    stack.append((cls._converted_variable(token.symbol, numeric.convert), 1))
+        function = stack[0][0]
+        return cls._staged(stages, function) if stages else function
+
+    @staticmethod
+    def _staged(stages, function):
+        def evaluate(variables):
+            scope = dict(variables)
+            for key, stage in stages:
+                scope[key] = stage(scope)
+            return function(scope)
+        return evaluate
+
+    @staticmethod
+    def _literal(value):
+        return lambda variables: value
+
+    @staticmethod
+    def _variable(name):
+        return lambda variables: variables[name]
+
+    @staticmethod
+    def _converted_variable(name, convert):
+        return lambda variables: convert(variables[name])
+
+    @staticmethod
+    def _apply(function, *operands):
+        if len(operands) == 1:
+            operand, = operands
+            return lambda variables: function(operand(variables))
+        if len(operands) == 2:
+            left, right = operands
+            return lambda variables: function(left(variables), right(variables))
+        return lambda variables: function(*[operand(variables) for operand in operands])
+
+    def evaluate(self, variables):
+        unassigned_variables = [name for name in self.variables if variables.get(name) is None]
+        if unassigned_variables:
+            raise UnassignedVariable(str(unassigned_variables))
+        return self._function(variables)
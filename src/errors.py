@@ -1,6 +1,6 @@
 class UnmatchingCloseParentheses(Exception):
     def __init__(self, position):
-        super().__init__()
+        super().__init__(position)
         self.position = position
 
 
@@ -10,11 +10,23 @@ class UnmatchingOpenParentheses(Exception):
 
 class UnexpectedCharacter(Exception):
     def __init__(self, position):
-        super().__init__()
+        super().__init__(position)
         self.position = position
 
 
 class UnassignedVariable(Exception):
     def __init__(self, variable_name):
-        super().__init__()
+        super().__init__(variable_name)
         self.variable_name = variable_name
+
+
+class InvalidFormat(Exception):
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class UnexpectedToken(Exception):
+    def __init__(self, position):
+        super().__init__(position)
+        self.position = position
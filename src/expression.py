@@ -1,43 +1,153 @@
-from tokenizer import Tokenizer, Value, Variable, Function, Operator, Constant, OpenParentheses, CloseParentheses
+import math
+from time import perf_counter
+from collections import Counter
+from tokenizer import Tokenizer, Value, Variable, Function, Operator, Constant
 from errors import UnassignedVariable
+from compiler import CompiledExpression
+from codegen import GeneratedExpression, GeneratedKernel, BLOCK_SIZE
+from vectorized import evaluate_batch
+from optimizer import fold_constants
+from autodiff import gradient, gradient_batch
+from interval import evaluate_interval
+from serialization import dumps, loads
+from syntax import parse, to_rpn
+from numeric import numeric_mode
+from memo import ResultMemo
+
+MISSING = object()
+COMPILERS = {'closure': CompiledExpression, 'ast': GeneratedExpression}
+
+
+class ExpressionOptions:
+    # How an expression is parsed, folded and measured, apart from its text. The same options are shared by the
+    # expressions of a batch or a cache, so they are replaced rather than changed in place
+    __slots__ = ('optimize', 'simplify', 'metrics', 'registry')
+
+    def __init__(self, optimize=True, simplify=False, metrics=None, registry=None):
+        self.optimize = optimize
+        self.simplify = simplify
+        self.metrics = metrics
+        self.registry = registry
+
+    def replace(self, **changes):
+        options = {name: getattr(self, name) for name in self.__slots__}
+        options.update(changes)
+        return ExpressionOptions(**options)
+
+
+DEFAULT_OPTIONS = ExpressionOptions()
 
 
 class Expression:
-    def __init__(self, expression):
-        self.tokenizer = Tokenizer()
-        self.tokens, self.variables = self.tokenizer.tokenize(expression)
+    memo = None
+    _optimized = None
+    _profile = None
+
+    def __init__(self, expression, optimize=True, simplify=False, metrics=None, registry=None):
+        self.options = ExpressionOptions(optimize, simplify, metrics, registry)
+        self.tokens, self.variables = self._run_stage('tokenize', self.tokenizer.tokenize, expression)
         self.reset_variables()
-        self.rpn = self._convert_to_rpn()
+        self.rpn = self._run_stage('rpn', self._convert_to_rpn)
+        if metrics is not None:
+            metrics.record_parse(self.tokens, self.rpn)
+
+    @classmethod
+    def from_parsed(cls, tokens, variables, rpn, options=None):
+        expression = cls.__new__(cls)
+        expression.options = options if options is not None else DEFAULT_OPTIONS
+        expression.tokens = list(tokens)
+        expression.variables = dict.fromkeys(variables)
+        expression.rpn = list(rpn)
+        return expression
+
+    @classmethod
+    def load(cls, data, optimize=True, simplify=False, metrics=None, registry=None):
+        return cls.from_parsed(*loads(data, registry), ExpressionOptions(optimize, simplify, metrics, registry))
+
+    @property
+    def tokenizer(self):
+        return Tokenizer(self.options.registry)
+
+    @property
+    def optimize(self):
+        return self.options.optimize
+
+    @optimize.setter
+    def optimize(self, optimize):
+        self.options = self.options.replace(optimize=optimize)
+
+    @property
+    def simplify(self):
+        return self.options.simplify
+
+    @simplify.setter
+    def simplify(self, simplify):
+        self.options = self.options.replace(simplify=simplify)
+
+    @property
+    def metrics(self):
+        return self.options.metrics
+
+    def dump(self):
+        return dumps(self)
+
+    def _run_stage(self, stage, function, *args):
+        if self.metrics is None:
+            return function(*args)
+        start = perf_counter()
+        result = function(*args)
+        self.metrics.record_stage(stage, perf_counter() - start)
+        return result
 
     def _convert_to_rpn(self):
-        queue = []
-        stack = []
-        for token in self.tokens:
-            if isinstance(token, (Value, Variable, Constant)):
-                queue.append(token)
-            if isinstance(token, (OpenParentheses, Function)):
-                stack.append(token)
-            if isinstance(token, Operator):
-                while stack and isinstance(stack[-1], Operator) and \
-                        self._has_operator_higher_precedence(token, stack[-1]):
-                    queue.append(stack.pop())
-                stack.append(token)
-            if isinstance(token, CloseParentheses):
-                while not isinstance(stack[-1], OpenParentheses):
-                    queue.append(stack.pop())
-                stack.pop()  # Discard open parentheses
-        while stack:
-            queue.append(stack.pop())
-        return queue
-
-    @staticmethod
-    def _has_operator_higher_precedence(token, top):
-        return (top.precedence > token.precedence or
-                (top.precedence == token.precedence and top.associativity == 'left')
-                and not isinstance(top, OpenParentheses))
-
-    def evaluate(self):
-        self._ensure_variables_assigned()
+        return to_rpn(parse(self.tokens))
+
+    def syntax_tree(self):
+        return parse(self.tokens)
+
+    def memoize(self, maxsize=256, ttl=None):
+        impure = [token.symbol for token in self.rpn if isinstance(token, Function) and not token.pure]
+        if impure:
+            raise ValueError(f"results of impure functions {impure} cannot be memoized")
+        self.memo = ResultMemo(maxsize, ttl)
+        return self
+
+    def evaluate(self, variables=None):
+        if variables is None:
+            variables = self.variables
+        if self.memo is not None:
+            return self._evaluate_memoized(variables)
+        return self._evaluate(variables)
+
+    def _evaluate_memoized(self, variables):
+        # Results are keyed by the bound values, and their types since 1 == 1.0 but 1 + 1 is not 1.0 + 1.0,
+        # so a memo entry can never outlive the bindings it was computed for
+        values = tuple(map(variables.get, self.variables))
+        try:
+            key = (values, tuple(map(type, values)))
+            if 0. in values:
+                # 0.0 == -0.0 but 2 * -0.0 is -0.0, so zeros are also keyed by their sign
+                key += (tuple(map(_sign, values)),)
+            result = self.memo.get(key, MISSING)
+        except (TypeError, ValueError):
+            # Unhashable values, like arrays, are evaluated every time
+            return self._evaluate(variables)
+        if self.metrics is not None:
+            self.metrics.record_memo(hit=result is not MISSING)
+        if result is MISSING:
+            result = self._evaluate(variables)
+            self.memo.put(key, result)
+        return result
+
+    def _evaluate(self, variables):
+        self._ensure_variables_assigned(variables)
+        if self.metrics is None:
+            return self._evaluate_rpn(variables)
+        result = self._run_stage('evaluate', self._evaluate_rpn, variables)
+        self.metrics.record_evaluation(*self._evaluation_profile())
+        return result
+
+    def _evaluate_rpn(self, variables):
         stack = []
         for token in self.rpn:
             if isinstance(token, (Operator, Function)):
@@ -47,11 +157,68 @@ class Expression:
             if isinstance(token, (Value, Constant)):
                 stack.append(float(token.value))
             if isinstance(token, Variable):
-                stack.append(self.variables[token.symbol])
+                stack.append(variables[token.symbol])
         return stack[0]
 
-    def _ensure_variables_assigned(self):
-        unassigned_variables = [k for k, v in self.variables.items() if not v]
+    def _evaluation_profile(self):
+        # The calls and the stack depth of an evaluation only depend on the RPN, so they are counted once
+        profile = self._profile
+        if profile is None or profile[0] is not self.rpn:
+            calls = Counter()
+            stack_depth = max_stack_depth = 0
+            for token in self.rpn:
+                if isinstance(token, (Operator, Function)):
+                    calls[token.symbol] += 1
+                    stack_depth -= token.operands_count - 1
+                if isinstance(token, (Value, Constant, Variable)):
+                    stack_depth += 1
+                max_stack_depth = max(max_stack_depth, stack_depth)
+            profile = self._profile = (self.rpn, calls, max_stack_depth)
+        return profile[1], profile[2]
+
+    def optimized_rpn(self):
+        if not self.optimize:
+            return self.rpn
+        # The folded RPN is kept until the RPN or the simplify option change
+        optimized = self._optimized
+        if optimized is None or optimized[0] is not self.rpn or optimized[1] != self.simplify:
+            optimized = self._optimized = (self.rpn, self.simplify, fold_constants(self.rpn, self.simplify))
+        return optimized[2]
+
+    @property
+    def eliminated_tokens(self):
+        return len(self.rpn) - len(self.optimized_rpn())
+
+    def compile(self, backend='closure', numeric='float', context=None):
+        if backend not in COMPILERS:
+            raise ValueError(f"backend must be one of {tuple(COMPILERS)}")
+        mode = numeric_mode(numeric, context)
+        if mode is None:
+            return self._run_stage('compile', COMPILERS[backend], self.optimized_rpn(), self.variables)
+        # Constants are folded as floats, which would round the exact results of the other modes
+        return self._run_stage('compile', COMPILERS[backend], self.rpn, self.variables, mode)
+
+    def compile_kernel(self, block_size=BLOCK_SIZE):
+        return self._run_stage('compile', GeneratedKernel, self.optimized_rpn(), self.variables, block_size)
+
+    def evaluate_batch(self, **columns):
+        return evaluate_batch(self.optimized_rpn(), self.variables, columns)
+
+    def gradient(self, variables=None, mode='reverse'):
+        if variables is None:
+            variables = self.variables
+        return gradient(self.optimized_rpn(), self.variables, variables, mode)
+
+    def gradient_batch(self, mode='reverse', **columns):
+        return gradient_batch(self.optimized_rpn(), self.variables, columns, mode)
+
+    def evaluate_interval(self, ranges=None):
+        if ranges is None:
+            ranges = self.variables
+        return evaluate_interval(self.optimized_rpn(), self.variables, ranges)
+
+    def _ensure_variables_assigned(self, variables):
+        unassigned_variables = [k for k in self.variables if variables.get(k) is None]
         if unassigned_variables:
             raise UnassignedVariable(str(unassigned_variables))
 
@@ -60,3 +227,7 @@ class Expression:
 
     def reset_variables(self):
         self.variables = dict.fromkeys(self.variables, None)
+
+
+def _sign(value):
+    return math.copysign(1.0, value) if isinstance(value, float) else None
@@ -0,0 +1,72 @@
+import math
+from tokenizer import Value, Variable, Function, Operator, Constant
+from errors import UnassignedVariable
+
+
+class ExpressionGroup:
+    def __init__(self, expressions):
+        self.expressions = list(expressions)
+        self.variables = set()
+        self.total_nodes = 0
+        self._literals = []
+        self._variable_nodes = []
+        self._operations = []
+        # The nodes by key are only needed to share them while the expressions are merged
+        keys = {}
+        self._outputs = [self._merge(expression.optimized_rpn(), keys) for expression in self.expressions]
+
+    @property
+    def unique_nodes(self):
+        return len(self._literals) + len(self._variable_nodes) + len(self._operations)
+
+    def _merge(self, rpn, keys):
+        stack = []
+        for token in rpn:
+            self.total_nodes += 1
+            if isinstance(token, (Operator, Function)):
+                operands = tuple(stack[-token.operands_count:])
+                del stack[-token.operands_count:]
+                # Functions are part of the key since registries may give the same name to different functions. Calls
+                # to functions that are not pure may return something else every time, so they are never shared
+                key = (type(token), token.symbol, token.function, operands)
+                if not getattr(token, 'pure', True):
+                    key += (self.total_nodes,)
+                stack.append(self._node(keys, key, self._operations, (token.function, operands)))
+            if isinstance(token, (Value, Constant)):
+                value = float(token.value)
+                # 0.0 and -0.0 are equal but must not share a node
+                key = (Value, value, math.copysign(1.0, value))
+                stack.append(self._node(keys, key, self._literals, value))
+            if isinstance(token, Variable):
+                self.variables.add(token.symbol)
+                key = (Variable, token.symbol)
+                stack.append(self._node(keys, key, self._variable_nodes, token.symbol))
+        return stack[0]
+
+    @staticmethod
+    def _node(keys, key, nodes, payload):
+        index = keys.get(key)
+        if index is None:
+            index = keys[key] = len(keys)
+            nodes.append((index, payload))
+        return index
+
+    def evaluate_all(self, variables):
+        unassigned_variables = [name for name in self.variables if variables.get(name) is None]
+        if unassigned_variables:
+            raise UnassignedVariable(str(unassigned_variables))
+        values = [None] * self.unique_nodes
+        for index, value in self._literals:
+            values[index] = value
+        for index, name in self._variable_nodes:
+            values[index] = variables[name]
+        # Nodes are created after their operands, so operations are already in evaluation order
+        for index, (function, operands) in self._operations:
+            values[index] = function(*[values[operand] for operand in operands])
+        return [values[output] for output in self._outputs]
+
+    def stats(self):
+        return {'expressions': len(self.expressions),
+                'nodes': self.total_nodes,
+                'unique_nodes': self.unique_nodes,
+                'deduplicated_nodes': self.total_nodes - self.unique_nodes}
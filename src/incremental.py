@@ -0,0 +1,95 @@
+import math
+from tokenizer import Value, Variable, Function, Operator, Constant
+from expression import Expression
+
+# Operations calling a function that is not pure depend on this pseudo variable, which changes at every evaluation
+IMPURE = object()
+
+
+class IncrementalExpression(Expression):
+    def __init__(self, expression, optimize=True, simplify=False, metrics=None, registry=None):
+        super().__init__(expression, optimize, simplify, metrics, registry)
+        self._build()
+
+    @classmethod
+    def from_parsed(cls, tokens, variables, rpn, options=None):
+        expression = super().from_parsed(tokens, variables, rpn, options)
+        expression.reset_variables()
+        expression._build()
+        return expression
+
+    def _build(self):
+        self._values = []
+        self._leaves = {}
+        self._operations = []
+        self._dependents = {}
+        stack = []
+        for token in self.optimized_rpn():
+            if isinstance(token, (Operator, Function)):
+                operands = stack[-token.operands_count:]
+                del stack[-token.operands_count:]
+                dependencies = frozenset().union(*[dependencies for _, dependencies in operands])
+                if not getattr(token, 'pure', True):
+                    dependencies |= {IMPURE}
+                operation = (len(self._values), token.function, tuple(index for index, _ in operands))
+                self._operations.append(operation)
+                for name in dependencies:
+                    self._dependents.setdefault(name, []).append(operation)
+                stack.append((len(self._values), dependencies))
+                self._values.append(None)
+            if isinstance(token, (Value, Constant)):
+                stack.append((len(self._values), frozenset()))
+                self._values.append(float(token.value))
+            if isinstance(token, Variable):
+                if token.symbol not in self._leaves:
+                    self._leaves[token.symbol] = len(self._values)
+                    self._values.append(None)
+                stack.append((self._leaves[token.symbol], frozenset([token.symbol])))
+        self._root = stack[0][0]
+        self._impure = IMPURE in self._dependents
+
+    def evaluate(self, variables=None):
+        if variables is not None:
+            return super().evaluate(variables)
+        self._ensure_variables_assigned(self.variables)
+        if self._changed_variables is None or self._changed_variables or self._impure:
+            self._update()
+        return self._values[self._root]
+
+    def _update(self):
+        if self._changed_variables is None:
+            # Nothing was computed yet, or every variable was reset
+            changed_variables = self._leaves.keys()
+            operations = self._operations
+        else:
+            changed_variables = self._changed_variables | {IMPURE} if self._impure else self._changed_variables
+            if len(changed_variables) == 1:
+                operations = self._dependents.get(next(iter(changed_variables)), [])
+            else:
+                operations = sorted({operation for name in changed_variables
+                                     for operation in self._dependents.get(name, [])},
+                                    key=lambda operation: operation[0])
+        values = self._values
+        for name in changed_variables:
+            if name in self._leaves:
+                values[self._leaves[name]] = self.variables[name]
+        for index, function, operands in operations:
+            values[index] = function(*[values[operand] for operand in operands])
+        self._changed_variables = set()
+
+    def assign_value(self, variable, value):
+        previous_value = self.variables.get(variable)
+        super().assign_value(variable, value)
+        if self._changed_variables is not None and not _same_value(previous_value, value):
+            self._changed_variables.add(variable)
+
+    def reset_variables(self):
+        super().reset_variables()
+        self._changed_variables = None
+
+
+def _same_value(previous_value, value):
+    if type(previous_value) is not type(value) or previous_value != value:
+        return False
+    # 0.0 and -0.0 are equal but functions like copysign tell them apart
+    return not isinstance(value, float) or math.copysign(1.0, previous_value) == math.copysign(1.0, value)
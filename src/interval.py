@@ -0,0 +1,265 @@
+import math
+from tokenizer import Value, Variable, Function, Operator, Constant, FUNCTION_TOKENS
+from errors import UnassignedVariable
+from src.tokens import cbrt
+
+INFINITY = float('inf')
+TWO_PI = 2 * math.pi
+HALF_PI = math.pi / 2
+# Extrema of sin, cos and the poles of tan are looked for with this margin, since their exact position
+# cannot be represented; finding one that is not there only makes the interval wider
+MARGIN = 1e-9
+# Beyond this the period is lost to rounding and the whole range is assumed
+LARGE = 1e9
+
+
+class Interval:
+    __slots__ = ('lo', 'hi')
+
+    def __init__(self, lo, hi=None):
+        self.lo = lo
+        self.hi = lo if hi is None else hi
+
+    def __eq__(self, other):
+        if not isinstance(other, Interval):
+            return NotImplemented
+        return self.lo == other.lo and self.hi == other.hi
+
+    def __contains__(self, value):
+        return self.lo <= value <= self.hi
+
+    def __iter__(self):
+        return iter((self.lo, self.hi))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} ([{self.lo}, {self.hi}])"
+
+
+def _down(value):
+    # Every bound computed with floats may be off by one rounding, so it is widened to the next float. Rounding never
+    # carries a result across zero and a zero keeps the sign of the exact result, so a +0 is already a lower bound:
+    # x * y over [0, 1] starts at 0 and not below the domain of sqrt
+    if value == 0 and math.copysign(1., value) > 0:
+        return value
+    return math.nextafter(value, -INFINITY)
+
+
+def _up(value):
+    if value == 0 and math.copysign(1., value) < 0:
+        return value
+    return math.nextafter(value, INFINITY)
+
+
+def _outward(lo, hi):
+    return Interval(_down(lo), _up(hi))
+
+
+def _is_exact_sum(x, y, total):
+    # The rounding error of a float sum is a float itself (two-sum), the sum is exact when it is zero. Exact bounds
+    # are not widened, so that x - 1 over [1, 2] starts at 0 and not below the domain of sqrt
+    y_part = total - x
+    return (x - (total - y_part)) + (y - y_part) == 0
+
+
+def _sum_down(x, y):
+    total = x + y
+    return total if _is_exact_sum(x, y, total) else math.nextafter(total, -INFINITY)
+
+
+def _sum_up(x, y):
+    total = x + y
+    return total if _is_exact_sum(x, y, total) else math.nextafter(total, INFINITY)
+
+
+def _product(a, b):
+    # 0 * inf is taken as 0: the product of an unbounded interval and one touching zero contains 0
+    return 0. if a == 0 or b == 0 else a * b
+
+
+def _power(base, exponent):
+    try:
+        return float(base ** exponent)
+    except OverflowError:
+        # Odd powers keep the sign of the base
+        return math.copysign(INFINITY, base) if exponent % 2 == 1 else INFINITY
+    except ZeroDivisionError:
+        return INFINITY
+
+
+def _add(a, b):
+    return Interval(_sum_down(a.lo, b.lo), _sum_up(a.hi, b.hi))
+
+
+def _subtract(a, b):
+    return Interval(_sum_down(a.lo, -b.hi), _sum_up(a.hi, -b.lo))
+
+
+def _multiply(a, b):
+    products = [_product(x, y) for x in (a.lo, a.hi) for y in (b.lo, b.hi)]
+    return _outward(min(products), max(products))
+
+
+def _reciprocal(a):
+    if a.lo == a.hi == 0:
+        raise ZeroDivisionError('interval division by zero')
+    if a.lo < 0 < a.hi:
+        return Interval(-INFINITY, INFINITY)
+    if a.lo == 0:
+        return Interval(math.nextafter(1. / a.hi, -INFINITY), INFINITY)
+    if a.hi == 0:
+        return Interval(-INFINITY, math.nextafter(1. / a.lo, INFINITY))
+    return _outward(1. / a.hi, 1. / a.lo)
+
+
+def _divide(a, b):
+    return _multiply(a, _reciprocal(b))
+
+
+def _integer_power(a, exponent):
+    if exponent == 0:
+        return Interval(1., 1.)
+    if exponent < 0:
+        return _reciprocal(_integer_power(a, -exponent))
+    at_lo, at_hi = _power(a.lo, exponent), _power(a.hi, exponent)
+    if exponent % 2 or a.lo >= 0:
+        return _outward(at_lo, at_hi)
+    if a.hi <= 0:
+        # Even powers decrease over negative numbers
+        return _outward(at_hi, at_lo)
+    return Interval(0., _up(max(at_lo, at_hi)))
+
+
+def _pow(a, b):
+    if b.lo == b.hi and float(b.lo).is_integer():
+        return _integer_power(a, int(b.lo))
+    if a.lo < 0:
+        raise ValueError('a negative base with a non-integer exponent has no real result')
+    # x ^ y is monotone in x and in y for x >= 0, so its extrema are on the corners
+    corners = [_power(x, y) for x in (a.lo, a.hi) for y in (b.lo, b.hi)]
+    return _outward(min(corners), max(corners))
+
+
+def _factorial(a):
+    # Factorial is only defined for integers, so the result encloses the factorials of the integers in the range
+    if a.hi < 0:
+        raise ValueError('factorial() only accepts integral values')
+    # Infinite bounds cannot be rounded to an integer, the unbounded ends are kept as they are
+    lo = (math.ceil(a.lo) if a.lo != INFINITY else INFINITY) if a.lo > 0 else 0
+    hi = math.floor(a.hi) if a.hi != INFINITY else INFINITY
+    if lo > hi:
+        raise ValueError('factorial() only accepts integral values')
+    return Interval(_factorial_bound(lo), _factorial_bound(hi))
+
+
+def _factorial_bound(value):
+    # 171! is already too large for a float
+    return float(math.factorial(value)) if value <= 170 else INFINITY
+
+
+def _negative(a):
+    return Interval(-a.hi, -a.lo)
+
+
+def _monotone(function, a):
+    return _outward(function(a.lo), function(a.hi))
+
+
+def _sqrt(a):
+    if a.lo < 0:
+        raise ValueError('math domain error')
+    return Interval(max(math.nextafter(math.sqrt(a.lo), -INFINITY), 0.), math.nextafter(math.sqrt(a.hi), INFINITY))
+
+
+def _cbrt(a):
+    # The real cube root is increasing, and never crosses zero for a range that does not
+    lo = math.nextafter(cbrt(a.lo), -INFINITY)
+    return Interval(max(lo, 0.) if a.lo >= 0 else lo, math.nextafter(cbrt(a.hi), INFINITY))
+
+
+def _contains_point(a, offset, period):
+    # Whether offset + k * period lies in the interval for some integer k
+    k = math.ceil((a.lo - offset) / period - MARGIN)
+    return offset + k * period <= a.hi + MARGIN * max(1., abs(a.hi))
+
+
+def _is_wide(a, period):
+    return max(abs(a.lo), abs(a.hi)) > LARGE or a.hi - a.lo >= period
+
+
+def _periodic(function, a, maximum_offset, minimum_offset):
+    if _is_wide(a, TWO_PI):
+        return Interval(-1., 1.)
+    # Between the extrema the function is monotone, either way, so otherwise the bounds are on the endpoints
+    ends = function(a.lo), function(a.hi)
+    lo = -1. if _contains_point(a, minimum_offset, TWO_PI) else max(_down(min(ends)), -1.)
+    hi = 1. if _contains_point(a, maximum_offset, TWO_PI) else min(_up(max(ends)), 1.)
+    return Interval(lo, hi)
+
+
+def _sin(a):
+    return _periodic(math.sin, a, HALF_PI, -HALF_PI)
+
+
+def _cos(a):
+    return _periodic(math.cos, a, 0., math.pi)
+
+
+def _tan(a):
+    if _is_wide(a, math.pi) or _contains_point(a, HALF_PI, math.pi):
+        return Interval(-INFINITY, INFINITY)
+    return _monotone(math.tan, a)
+
+
+OPERATORS = {'+': _add,
+             '-': _subtract,
+             '/': _divide,
+             '*': _multiply,
+             '^': _pow,
+             '!': _factorial,
+             '-u': _negative}
+
+FUNCTIONS = {'sqrt': _sqrt,
+             'cbrt': _cbrt,
+             'sin': _sin,
+             'cos': _cos,
+             'tan': _tan,
+             'radians': lambda a: _monotone(math.radians, a),
+             'degrees': lambda a: _monotone(math.degrees, a)}
+
+
+def enclosure_of(token):
+    if isinstance(token, Operator):
+        return OPERATORS[token.symbol]
+    # The bounds are those of the built-in functions, a registered function of the same name computes something else
+    if FUNCTION_TOKENS.get(token.symbol) is not token:
+        raise ValueError(f"no interval bounds are known for the registered function '{token.symbol}'")
+    return FUNCTIONS[token.symbol]
+
+
+def _to_interval(value):
+    if isinstance(value, Interval):
+        return value
+    if isinstance(value, (int, float)):
+        return Interval(float(value), float(value))
+    lo, hi = value
+    if lo > hi:
+        raise ValueError(f"invalid range ({lo}, {hi})")
+    return Interval(float(lo), float(hi))
+
+
+def evaluate_interval(rpn, variables, ranges):
+    unassigned_variables = [name for name in variables if ranges.get(name) is None]
+    if unassigned_variables:
+        raise UnassignedVariable(str(unassigned_variables))
+    intervals = {name: _to_interval(ranges[name]) for name in variables}
+    stack = []
+    for token in rpn:
+        if isinstance(token, (Operator, Function)):
+            operands = stack[-token.operands_count:]
+            del stack[-token.operands_count:]
+            stack.append(enclosure_of(token)(*operands))
+        if isinstance(token, (Value, Constant)):
+            stack.append(Interval(float(token.value)))
+        if isinstance(token, Variable):
+            stack.append(intervals[token.symbol])
+    return stack[0]
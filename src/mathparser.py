@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from contextlib import ExitStack
+from expression import Expression
+from parallel import BACKENDS, chunks, parallel_evaluate
+from server import serve
+from errors import UnassignedVariable, UnexpectedToken
+from src.errors import UnmatchingOpenParentheses, UnmatchingCloseParentheses, UnexpectedCharacter
+
+FORMATS = ('csv', 'jsonl')
+
+
+def _read_csv(stream):
+    yield from csv.DictReader(stream)
+
+
+def _read_jsonl(stream):
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError(f"line {number} is not a JSON object")
+            yield row
+
+
+READERS = {'csv': _read_csv, 'jsonl': _read_jsonl}
+
+
+def _to_number(value):
+    if isinstance(value, str):
+        return float(value)
+    return value
+
+
+def _bindings(rows, columns):
+    for row in rows:
+        yield {variable: _to_number(row.get(column)) for variable, column in columns.items()}
+
+
+def _infer_format(path):
+    if path.endswith('.jsonl') or path.endswith('.ndjson'):
+        return 'jsonl'
+    return 'csv'
+
+
+def _columns(expression, mappings):
+    columns = {variable: variable for variable in expression.variables}
+    for mapping in mappings:
+        variable, _, column = mapping.partition('=')
+        if variable not in columns or not column:
+            raise ValueError(f"invalid column mapping '{mapping}'")
+        columns[variable] = column
+    return columns
+
+
+def _evaluate(expression, bindings, args):
+    if args.workers:
+        yield from chunks(parallel_evaluate(expression, bindings, args.workers, args.backend, args.chunk_size),
+                          args.chunk_size)
+    else:
+        compiled = expression.compile()
+        for chunk in chunks(bindings, args.chunk_size):
+            yield [compiled.evaluate(row) for row in chunk]
+
+
+def _open(streams, path, standard_stream, *args, **kwargs):
+    # '-' is stdin or stdout, which are left open
+    return standard_stream if path == '-' else streams.enter_context(open(path, *args, **kwargs))
+
+
+def evaluate_command(args):
+    expression = Expression(args.expression)
+    columns = _columns(expression, args.map)
+    data_format = args.format or _infer_format(args.input)
+    count = 0
+    start = time.perf_counter()
+    with ExitStack() as streams:
+        input_stream = _open(streams, args.input, sys.stdin, newline='', encoding='utf-8')
+        output_stream = _open(streams, args.output, sys.stdout, 'w', encoding='utf-8')
+        bindings = _bindings(READERS[data_format](input_stream), columns)
+        for results in _evaluate(expression, bindings, args):
+            output_stream.write(''.join(f"{result}\n" for result in results))
+            count += len(results)
+    elapsed = time.perf_counter() - start
+    print(f"{count} rows in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} rows/s)", file=sys.stderr)
+
+
+def serve_command(args):
+    print(f"mathparser: serving on {args.socket or f'{args.host}:{args.port}'}", file=sys.stderr)
+    try:
+        asyncio.run(serve(args.host, args.port, args.socket, batch_size=args.batch_size,
+                          batch_delay=args.batch_delay / 1e3, max_pending=args.max_pending))
+    except KeyboardInterrupt:
+        pass
+
+
+def _positive_integer(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"{text} is not a positive integer")
+    return value
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog='mathparser', description='Parse and evaluate math expressions.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    evaluate = commands.add_parser('eval', help='evaluate an expression for every row of a CSV or JSONL file')
+    evaluate.add_argument('expression')
+    evaluate.add_argument('-i', '--input', default='-', help="input file, '-' for stdin (default)")
+    evaluate.add_argument('-o', '--output', default='-', help="output file, '-' for stdout (default)")
+    evaluate.add_argument('-f', '--format', choices=FORMATS,
+                          help='input format, inferred from the input file extension by default')
+    evaluate.add_argument('-m', '--map', action='append', default=[], metavar='VARIABLE=COLUMN',
+                          help='read a variable from a column with a different name')
+    evaluate.add_argument('-c', '--chunk-size', type=_positive_integer, default=10000, help='rows evaluated at a time')
+    evaluate.add_argument('-w', '--workers', type=_positive_integer, help='evaluate in parallel with this many workers')
+    evaluate.add_argument('-b', '--backend', choices=BACKENDS, default='process', help='parallel backend')
+    evaluate.set_defaults(handler=evaluate_command)
+    server = commands.add_parser('serve', help='serve evaluations over a socket with a JSON lines protocol')
+    server.add_argument('--host', default='127.0.0.1', help='address to listen on (default 127.0.0.1)')
+    server.add_argument('-p', '--port', type=int, default=8765, help='TCP port to listen on (default 8765)')
+    server.add_argument('-s', '--socket', help='listen on this Unix socket instead of TCP')
+    server.add_argument('--batch-size', type=int, default=256, help='most requests evaluated in one batch')
+    server.add_argument('--batch-delay', type=float, default=1., help='milliseconds a batch waits for requests')
+    server.add_argument('--max-pending', type=int, default=1024, help='requests in flight before reading stops')
+    server.set_defaults(handler=serve_command)
+    return parser
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    try:
+        args.handler(args)
+    except (UnmatchingOpenParentheses, UnmatchingCloseParentheses, UnexpectedCharacter, UnexpectedToken) as error:
+        print(f"mathparser: invalid expression: {error.__class__.__name__} {error}", file=sys.stderr)
+        return 2
+    except UnassignedVariable as error:
+        print(f"mathparser: missing value for variables {error.variable_name}", file=sys.stderr)
+        return 1
+    except (ArithmeticError, TypeError) as error:
+        print(f"mathparser: evaluation failed: {error.__class__.__name__} {error}", file=sys.stderr)
+        return 1
+    except (ValueError, OSError) as error:
+        print(f"mathparser: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
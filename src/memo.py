@@ -0,0 +1,55 @@
+import threading
+from collections import Counter, OrderedDict
+from time import monotonic
+
+
+class ResultMemo:
+    def __init__(self, maxsize=256, ttl=None, clock=monotonic):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        # Hits, misses, evictions and expirations
+        self._counts = Counter()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, expires = entry
+                if expires is None or self.clock() < expires:
+                    self._entries.move_to_end(key)
+                    self._counts['hits'] += 1
+                    return result
+                del self._entries[key]
+                self._counts['expirations'] += 1
+            self._counts['misses'] += 1
+            return default
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = (result, None if self.ttl is None else self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._counts['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counts.clear()
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self._counts['hits'], self._counts['misses']
+            return {'hits': hits,
+                    'misses': misses,
+                    'hit_rate': hits / (hits + misses) if hits + misses else 0.,
+                    'evictions': self._counts['evictions'],
+                    'expirations': self._counts['expirations'],
+                    'size': len(self._entries),
+                    'maxsize': self.maxsize,
+                    'ttl': self.ttl}
@@ -0,0 +1,57 @@
+import threading
+from collections import Counter, defaultdict
+
+
+# Counted once per parse, evaluation or lookup, and kept together in Metrics.counts
+COUNTS = ('expressions', 'tokens', 'rpn_tokens', 'evaluations', 'parse_cache_hits', 'parse_cache_misses', 'memo_hits',
+          'memo_misses')
+
+
+class Metrics:
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stage_times = defaultdict(float)
+            self.stage_calls = Counter()
+            self.counts = Counter(dict.fromkeys(COUNTS, 0))
+            self.max_stack_depth = 0
+            self.calls = Counter()
+
+    def record_stage(self, stage, elapsed):
+        with self._lock:
+            self.stage_times[stage] += elapsed
+            self.stage_calls[stage] += 1
+        if self.callback is not None:
+            self.callback(stage, elapsed)
+
+    def record_parse(self, tokens, rpn):
+        with self._lock:
+            self.counts['expressions'] += 1
+            self.counts['tokens'] += len(tokens)
+            self.counts['rpn_tokens'] += len(rpn)
+
+    def record_evaluation(self, calls, max_stack_depth):
+        with self._lock:
+            self.counts['evaluations'] += 1
+            self.calls.update(calls)
+            self.max_stack_depth = max(self.max_stack_depth, max_stack_depth)
+
+    def record_parse_cache(self, hit):
+        with self._lock:
+            self.counts['parse_cache_hits' if hit else 'parse_cache_misses'] += 1
+
+    def record_memo(self, hit):
+        with self._lock:
+            self.counts['memo_hits' if hit else 'memo_misses'] += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {'stage_times': dict(self.stage_times),
+                    'stage_calls': dict(self.stage_calls),
+                    **self.counts,
+                    'max_stack_depth': self.max_stack_depth,
+                    'calls': dict(self.calls)}
@@ -0,0 +1,243 @@
+import decimal
+import functools
+import math
+import operator
+from fractions import Fraction
+from tokenizer import Value, Operator, FUNCTION_TOKENS, CONSTANT_TOKENS
+from src.tokens import factorial, negative
+
+MODES = ('float', 'fraction', 'decimal', 'integer')
+# Digits added to the context while computing constants and series, so they are rounded only once at the end
+GUARD_DIGITS = 5
+
+
+class NumericTables:
+    # The implementations of the operators, functions and constants of a mode, by symbol
+    __slots__ = ('operators', 'functions', 'constants')
+
+    def __init__(self, operators, functions, constants):
+        self.operators = operators
+        self.functions = functions
+        self.constants = constants
+
+
+class NumericMode:
+    def __init__(self, name, literal, tables, convert=None, context=None):
+        self.name = name
+        self.context = context
+        self.literal = literal
+        self.tables = tables
+        self.convert = convert
+
+    def __reduce__(self):
+        # The tables are made of closures, so the mode is built again when unpickled
+        return numeric_mode, (self.name, self.context)
+
+    def function(self, token):
+        if isinstance(token, Operator):
+            return self.tables.operators[token.symbol]
+        # Functions added by a registry, or replacing a built-in one, are given the values of the mode as they are
+        if FUNCTION_TOKENS.get(token.symbol) is not token:
+            return token.function
+        return self.tables.functions[token.symbol]
+
+    def value(self, token):
+        if isinstance(token, Value):
+            return self.literal(str(token.value))
+        if CONSTANT_TOKENS.get(token.symbol) is token:
+            return self.tables.constants[token.symbol]
+        return token.value if self.convert is None else self.convert(token.value)
+
+
+def _integral(value):
+    if value != int(value):
+        raise ValueError('factorial() only accepts integral values')
+    return math.factorial(int(value))
+
+
+def _perfect_sqrt(value):
+    # The square root of a perfect square is exact, any other is rounded to the nearest float
+    root = math.isqrt(value)
+    return root if root * root == value else None
+
+
+# Integer mode: integers stay integers as long as every operation has an integer result
+
+def _integer_literal(text):
+    return int(text) if text.isdigit() else float(text)
+
+
+def _is_integer(value):
+    # Booleans are integers to Python, but not values the integer mode keeps exact
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _integer_divide(a, b):
+    if _is_integer(a) and _is_integer(b) and b and a % b == 0:
+        return a // b
+    return a / b
+
+
+def _integer_sqrt(value):
+    if _is_integer(value) and value >= 0:
+        root = _perfect_sqrt(value)
+        if root is not None:
+            return root
+    return math.sqrt(value)
+
+
+def integer_mode():
+    operators = {'+': operator.add, '-': operator.sub, '/': _integer_divide, '*': operator.mul,
+                 '^': operator.pow, '!': factorial, '-u': negative}
+    functions = {**{name: token.function for name, token in FUNCTION_TOKENS.items()}, 'sqrt': _integer_sqrt}
+    constants = {name: token.value for name, token in CONSTANT_TOKENS.items()}
+    return NumericMode('integer', _integer_literal, NumericTables(operators, functions, constants))
+
+
+# Fraction mode: arithmetic, integer powers and roots of perfect squares are exact, the other functions are
+# computed as floats and turned back into fractions
+
+def _fraction(value):
+    # Floats are read from their shortest representation, like the literals, so 0.1 is 1/10 and not
+    # 3602879701896397/36028797018963968
+    return Fraction(repr(value)) if isinstance(value, float) else Fraction(value)
+
+
+def _through_float(function):
+    return lambda *operands: Fraction(function(*map(float, operands)))
+
+
+def _fraction_power(base, exponent):
+    if exponent.denominator == 1:
+        return base ** int(exponent)
+    return Fraction(math.pow(base, exponent))
+
+
+def _fraction_sqrt(value):
+    if value >= 0:
+        numerator, denominator = _perfect_sqrt(value.numerator), _perfect_sqrt(value.denominator)
+        if numerator is not None and denominator is not None:
+            return Fraction(numerator, denominator)
+    return Fraction(math.sqrt(value))
+
+
+def fraction_mode():
+    functions = {name: _through_float(token.function) for name, token in FUNCTION_TOKENS.items()}
+    functions['sqrt'] = _fraction_sqrt
+    operators = {'+': operator.add, '-': operator.sub, '/': operator.truediv, '*': operator.mul,
+                 '^': _fraction_power, '!': lambda value: Fraction(_integral(value)), '-u': operator.neg}
+    constants = {name: Fraction(token.value) for name, token in CONSTANT_TOKENS.items()}
+    return NumericMode('fraction', Fraction, NumericTables(operators, functions, constants), _fraction)
+
+
+# Decimal mode: every operation is rounded to the precision of the context
+
+def _decimal_pi(context, digits=GUARD_DIGITS):
+    # Returns pi with the given number of digits more than the context, not rounded to the context
+    with decimal.localcontext(context) as working:
+        working.prec += digits
+        three = decimal.Decimal(3)
+        last, term, total, n, na, d, da = 0, three, three, 1, 0, 0, 24
+        while total != last:
+            last = total
+            n, na = n + na, na + 8
+            d, da = d + da, da + 32
+            term = (term * n) / d
+            total += term
+    return total
+
+
+def _decimal_phi(context):
+    with decimal.localcontext(context) as working:
+        working.prec += GUARD_DIGITS
+        total = (1 + decimal.Decimal(5).sqrt()) / 2
+    return context.plus(total)
+
+
+def _decimal_series(x, context, pi_with, first):
+    # Sums the Taylor series of sine (first=1) or cosine (first=0) of x brought back to [-pi, pi]. Every digit of x
+    # before the decimal point needs one more digit of pi for the remainder to keep the precision of the context
+    with decimal.localcontext(context) as working:
+        digits = GUARD_DIGITS + max(0, x.adjusted())
+        working.prec += digits
+        x = x.remainder_near(2 * pi_with(digits))
+        term = x if first else decimal.Decimal(1)
+        last, total, i = None, term, first
+        while total != last:
+            last = total
+            i += 2
+            term = -term * x * x / ((i - 1) * i)
+            total += term
+    return context.plus(total)
+
+
+def _decimal_cbrt(x, context):
+    # Negative values have a real cube root too. Perfect cubes have an exact one, which is among the neighbours of
+    # the rounded root whatever the rounding of the context
+    if x < 0:
+        return context.minus(_decimal_cbrt(context.minus(x), context))
+    with decimal.localcontext(context) as working:
+        working.prec += GUARD_DIGITS
+        root = context.plus(x ** (decimal.Decimal(1) / 3))
+        working.prec = 3 * context.prec + 1
+        for candidate in (root, context.next_plus(root), context.next_minus(root)):
+            if candidate * candidate * candidate == x:
+                return candidate
+    return root
+
+
+def decimal_mode(context=None):
+    context = (context or decimal.getcontext()).copy()
+
+    @functools.lru_cache(maxsize=16)
+    def pi_with(digits):
+        return _decimal_pi(context, digits)
+
+    pi = context.plus(pi_with(GUARD_DIGITS))
+
+    def literal(text):
+        return context.create_decimal(text)
+
+    def convert(value):
+        if isinstance(value, Fraction):
+            return context.divide(decimal.Decimal(value.numerator), value.denominator)
+        # Floats are read from their shortest representation, so 0.1 is 0.1 and not 0.1000000000000000055511151231
+        if isinstance(value, float):
+            return context.create_decimal(repr(value))
+        return context.create_decimal(value)
+
+    def sin(x):
+        return _decimal_series(x, context, pi_with, 1)
+
+    def cos(x):
+        return _decimal_series(x, context, pi_with, 0)
+
+    def cbrt(x):
+        return _decimal_cbrt(x, context)
+
+    operators = {'+': context.add, '-': context.subtract, '/': context.divide, '*': context.multiply,
+                 '^': context.power, '!': lambda value: context.create_decimal(_integral(value)), '-u': context.minus}
+    functions = {'sqrt': context.sqrt,
+                 'cbrt': cbrt,
+                 'sin': sin,
+                 'cos': cos,
+                 'tan': lambda x: context.divide(sin(x), cos(x)),
+                 'radians': lambda x: context.divide(context.multiply(x, pi), 180),
+                 'degrees': lambda x: context.divide(context.multiply(x, 180), pi)}
+    constants = {'pi': pi,
+                 'e': context.exp(1),
+                 'phi': _decimal_phi(context)}
+    return NumericMode('decimal', literal, NumericTables(operators, functions, constants), convert, context)
+
+
+def numeric_mode(name, context=None):
+    if name not in MODES:
+        raise ValueError(f"numeric mode must be one of {MODES}")
+    if context is not None and name != 'decimal':
+        raise ValueError('a context is only used by the decimal mode')
+    if name == 'float':
+        # Float is the mode of the tokens themselves, compilers keep their fast path when no mode is given
+        return None
+    if name == 'decimal':
+        return decimal_mode(context)
+    return integer_mode() if name == 'integer' else fraction_mode()
@@ -0,0 +1,95 @@
+from tokenizer import Value, Variable, Function, Operator, Constant, FUNCTION_TOKENS
+
+# Identities are only removed from operands that are never integers: 'x * 1' turns an integer x into a float. 'x + 0'
+# is never removed, since -0.0 + 0 is 0.0
+LEFT_IDENTITIES = {'*': 1}
+RIGHT_IDENTITIES = {'*': 1, '-': 0, '/': 1, '^': 1}
+# Results of these operators are not integers when any operand is not one
+FLOAT_PRESERVING = {'+', '-', '*', '^', '-u'}
+
+
+def fold_constants(rpn, simplify=False):
+    # Every operand on the stack is a contiguous slice of the output, so a sub-tree can be
+    # replaced in place by truncating the output at its start
+    output = []
+    starts = []
+    constants = []
+    floats = []
+    for token in rpn:
+        if isinstance(token, (Value, Constant)):
+            starts.append(len(output))
+            constants.append(_literal(token))
+            floats.append(True)
+            output.append(token)
+        elif isinstance(token, Variable):
+            starts.append(len(output))
+            constants.append(None)
+            floats.append(False)
+            output.append(token)
+        elif isinstance(token, (Operator, Function)):
+            operands_starts = starts[-token.operands_count:]
+            operands = constants[-token.operands_count:]
+            operands_floats = floats[-token.operands_count:]
+            del starts[-token.operands_count:]
+            del constants[-token.operands_count:]
+            del floats[-token.operands_count:]
+            start = operands_starts[0] if operands_starts else len(output)
+            # Functions that are not pure may return something else every time, so they are always called
+            result = _apply(token.function, operands) if getattr(token, 'pure', True) else None
+            if result is not None:
+                del output[start:]
+                output.append(Value(result))
+            elif not (simplify and _simplify(token, output, operands_starts, operands, operands_floats)):
+                output.append(token)
+            starts.append(start)
+            constants.append(result)
+            floats.append(result is not None or _is_float(token, operands_floats))
+    return output
+
+
+def _literal(token):
+    try:
+        return float(token.value)
+    except ValueError:
+        return None
+
+
+def _apply(function, operands):
+    if None in operands:
+        return None
+    try:
+        result = function(*operands)
+        # Integers, like large factorials, would lose digits as floats, they are computed at evaluation instead
+        return result if isinstance(result, float) else None
+    except (ArithmeticError, ValueError, TypeError):
+        # Leave the sub-tree as it is so the error is raised when the expression is evaluated
+        return None
+
+
+def _is_float(token, operands_floats):
+    # Whether the result is never an integer. Literals and constants are evaluated as floats, variables may be
+    # given integers and registered functions may return them
+    if isinstance(token, Function):
+        return FUNCTION_TOKENS.get(token.symbol) is token
+    if token.symbol == '/':
+        return True
+    return token.symbol in FLOAT_PRESERVING and any(operands_floats)
+
+
+def _simplify(token, output, operands_starts, operands, operands_floats):
+    if not isinstance(token, Operator):
+        return False
+    if token.symbol == '-u' and output and isinstance(output[-1], Operator) and output[-1].symbol == '-u':
+        output.pop()
+        return True
+    if len(operands) != 2:
+        return False
+    left, right = operands
+    left_float, right_float = operands_floats
+    if token.symbol in RIGHT_IDENTITIES and right == RIGHT_IDENTITIES[token.symbol] and left_float:
+        del output[operands_starts[1]:]
+        return True
+    if token.symbol in LEFT_IDENTITIES and left == LEFT_IDENTITIES[token.symbol] and right_float:
+        del output[operands_starts[0]:operands_starts[1]]
+        return True
+    return False
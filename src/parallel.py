@@ -0,0 +1,60 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from types import SimpleNamespace
+
+BACKENDS = ('process', 'thread')
+
+# Every worker process holds its own copy, set once by the pool initializer
+_worker = SimpleNamespace(expression=None)
+
+
+def _initialize_worker(compiled):
+    _worker.expression = compiled
+
+
+def _evaluate_chunk_in_worker(rows):
+    return _evaluate_chunk(_worker.expression, rows)
+
+
+def _evaluate_chunk(compiled, rows):
+    return [compiled.evaluate(row) for row in rows]
+
+
+def chunks(rows, chunk_size):
+    rows = iter(rows)
+    chunk = list(islice(rows, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, chunk_size))
+
+
+def parallel_evaluate(expression, rows, workers=None, backend='process', chunk_size=10000):
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}")
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    if workers is not None and workers < 1:
+        raise ValueError('workers must be at least 1')
+    return _evaluate_stream(expression.compile(), rows, workers or os.cpu_count() or 1, backend, chunk_size)
+
+
+def _evaluate_stream(compiled, rows, workers, backend, chunk_size):
+    if backend == 'process':
+        # The compiled expression is sent once to every worker instead of with every chunk
+        executor = ProcessPoolExecutor(workers, initializer=_initialize_worker, initargs=(compiled,))
+        submit = partial(executor.submit, _evaluate_chunk_in_worker)
+    else:
+        executor = ThreadPoolExecutor(workers)
+        submit = partial(executor.submit, _evaluate_chunk, compiled)
+    with executor:
+        # Only a couple of chunks per worker are in flight, so rows are streamed in bounded memory
+        pending = deque()
+        for chunk in chunks(rows, chunk_size):
+            pending.append(submit(chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,175 @@
+import struct
+import zlib
+from tokenizer import Value, Variable, Function, Operator, Constant, OpenParentheses, CloseParentheses, Comma, \
+    OPERATOR_TOKENS, FUNCTION_TOKENS, CONSTANT_TOKENS, OPEN_PARENTHESES_TOKEN, CLOSE_PARENTHESES_TOKEN, COMMA_TOKEN
+from errors import InvalidFormat
+
+# Version 2 added the comma opcode, records of version 1 have none and are read the same way
+FORMAT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+
+# An expression is a header followed by its constant pool, variable table and symbol table, each a length prefixed
+# block of NUL separated UTF-8 strings, and by its token stream and RPN as fixed size (opcode, index) instructions
+EXPRESSION_MAGIC = b'MPXE'
+EXPRESSION_HEADER = struct.Struct('<4sBIHHHII')
+TABLE_LENGTH = struct.Struct('<I')
+INSTRUCTION = struct.Struct('<BH')
+# Table sizes are stored in the header and indexes in the instructions as unsigned shorts
+MAX_TABLE_SIZE = 0xFFFF
+
+# Values index the constant pool, variables the variable table and operators, functions and constants the symbols
+VALUE, VARIABLE, OPERATOR, FUNCTION, CONSTANT, OPEN_PARENTHESES, CLOSE_PARENTHESES, COMMA = range(8)
+SYMBOL_TOKENS = {OPERATOR: OPERATOR_TOKENS, FUNCTION: FUNCTION_TOKENS, CONSTANT: CONSTANT_TOKENS}
+
+
+OPCODES = ((Value, VALUE), (Variable, VARIABLE), (Operator, OPERATOR), (Function, FUNCTION), (Constant, CONSTANT),
+           (OpenParentheses, OPEN_PARENTHESES), (CloseParentheses, CLOSE_PARENTHESES), (Comma, COMMA))
+
+
+def _opcode(token):
+    for kind, opcode in OPCODES:
+        if isinstance(token, kind):
+            return opcode
+    raise TypeError(f"cannot serialize {token!r}")
+
+
+class _Tables:
+    def __init__(self, variables):
+        self.constants = []
+        self.variables = list(variables)
+        self.symbols = []
+        self._indexes = {'constants': {}, 'variables': {name: i for i, name in enumerate(self.variables)},
+                         'symbols': {}}
+
+    def index(self, table, item):
+        indexes = self._indexes[table]
+        if item not in indexes:
+            indexes[item] = len(indexes)
+            getattr(self, table).append(item)
+        return indexes[item]
+
+    def encode(self, tokens):
+        instructions = []
+        for token in tokens:
+            opcode = _opcode(token)
+            if opcode in (OPEN_PARENTHESES, CLOSE_PARENTHESES, COMMA):
+                index = 0
+            elif opcode == VALUE:
+                index = self.index('constants', str(token.value))
+            elif opcode == VARIABLE:
+                index = self.index('variables', token.symbol)
+            else:
+                index = self.index('symbols', token.symbol)
+            instructions.append(INSTRUCTION.pack(opcode, index))
+        return b''.join(instructions)
+
+
+def _pack_strings(strings):
+    packed = '\0'.join(strings).encode('utf-8')
+    return TABLE_LENGTH.pack(len(packed)) + packed
+
+
+def dumps(expression):
+    tables = _Tables(expression.variables)
+    try:
+        tokens = tables.encode(expression.tokens)
+        rpn = tables.encode(expression.rpn)
+    except struct.error as error:
+        raise ValueError('too many distinct constants or symbols to serialize') from error
+    if max(len(tables.constants), len(tables.variables), len(tables.symbols)) > MAX_TABLE_SIZE:
+        raise ValueError('too many distinct constants or symbols to serialize')
+    body = _pack_strings(tables.constants) + _pack_strings(tables.variables) + _pack_strings(tables.symbols) + \
+        tokens + rpn
+    header = EXPRESSION_HEADER.pack(EXPRESSION_MAGIC, FORMAT_VERSION, zlib.crc32(body), len(tables.constants),
+                                    len(tables.variables), len(tables.symbols), len(expression.tokens),
+                                    len(expression.rpn))
+    return header + body
+
+
+def _unpack_strings(data, offset, count):
+    length, = TABLE_LENGTH.unpack_from(data, offset)
+    offset += TABLE_LENGTH.size
+    if offset + length > len(data):
+        raise InvalidFormat('truncated string table')
+    strings = str(data[offset:offset + length], 'utf-8').split('\0') if count else []
+    if len(strings) != count:
+        raise InvalidFormat('corrupted string table')
+    return strings, offset + length
+
+
+def _resolve(constants, variables, symbols, registry):
+    # Every table entry is turned into its token once, instructions then only index into these tables
+    tokens = {VALUE: [Value(constant) for constant in constants],
+              VARIABLE: [Variable(variable) for variable in variables]}
+    symbols_tokens = SYMBOL_TOKENS if registry is None else \
+        {OPERATOR: OPERATOR_TOKENS, FUNCTION: registry.functions, CONSTANT: registry.constants}
+    for opcode, symbol_tokens in symbols_tokens.items():
+        tokens[opcode] = {index: symbol_tokens[symbol] for index, symbol in enumerate(symbols)
+                          if symbol in symbol_tokens}
+    return tokens
+
+
+def _decode(data, offset, count, tokens):
+    end = offset + count * INSTRUCTION.size
+    if end > len(data):
+        raise InvalidFormat('truncated instructions')
+    try:
+        decoded = [tokens[opcode][index] for opcode, index in INSTRUCTION.iter_unpack(data[offset:end])]
+    except (KeyError, IndexError) as error:
+        raise InvalidFormat('invalid instruction or unknown symbol') from error
+    return decoded, end
+
+
+def _validate_rpn(rpn):
+    depth = 0
+    for token in rpn:
+        operands_count = getattr(token, 'operands_count', 0)
+        if depth < operands_count:
+            raise InvalidFormat(f"missing operands for '{token.symbol}'")
+        depth += 1 - operands_count
+    if rpn and depth != 1:
+        raise InvalidFormat('the RPN does not evaluate to a single value')
+
+
+def _read_header(data):
+    if len(data) < EXPRESSION_HEADER.size:
+        raise InvalidFormat('truncated header')
+    magic, version, checksum, *counts = EXPRESSION_HEADER.unpack_from(data)
+    if magic != EXPRESSION_MAGIC:
+        raise InvalidFormat('not a serialized expression')
+    if version not in READABLE_VERSIONS:
+        raise InvalidFormat(f"unsupported format version {version}, expected {FORMAT_VERSION}")
+    data = memoryview(data)[EXPRESSION_HEADER.size:]
+    if zlib.crc32(data) != checksum:
+        raise InvalidFormat('checksum mismatch')
+    return data, counts
+
+
+def _read_tables(data, constants_count, variables_count, symbols_count):
+    try:
+        constants, offset = _unpack_strings(data, 0, constants_count)
+        variables, offset = _unpack_strings(data, offset, variables_count)
+        symbols, offset = _unpack_strings(data, offset, symbols_count)
+    except (struct.error, UnicodeDecodeError) as error:
+        raise InvalidFormat('corrupted string table') from error
+    for constant in constants:
+        try:
+            float(constant)
+        except ValueError as error:
+            raise InvalidFormat(f"invalid constant '{constant}'") from error
+    return constants, variables, symbols, offset
+
+
+def loads(data, registry=None):
+    # Every field of the header is checked against the data before any table is read
+    data, (constants_count, variables_count, symbols_count, tokens_count, rpn_count) = _read_header(data)
+    constants, variables, symbols, offset = _read_tables(data, constants_count, variables_count, symbols_count)
+    rpn_tokens = _resolve(constants, variables, symbols, registry)
+    infix_tokens = {**rpn_tokens, OPEN_PARENTHESES: [OPEN_PARENTHESES_TOKEN],
+                    CLOSE_PARENTHESES: [CLOSE_PARENTHESES_TOKEN], COMMA: [COMMA_TOKEN]}
+    tokens, offset = _decode(data, offset, tokens_count, infix_tokens)
+    rpn, offset = _decode(data, offset, rpn_count, rpn_tokens)
+    if offset != len(data):
+        raise InvalidFormat('trailing data')
+    _validate_rpn(rpn)
+    return tokens, variables, rpn
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import time
+from collections import Counter, OrderedDict, deque
+from expression import Expression
+
+PERCENTILES = {'p50': 0.5, 'p90': 0.9, 'p99': 0.99}
+
+
+class ServerOptions:
+    __slots__ = ('batch_size', 'batch_delay', 'max_pending', 'max_expressions', 'registry')
+
+    def __init__(self, batch_size=256, batch_delay=0.001, max_pending=1024, max_expressions=1024, registry=None):
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_pending = max_pending
+        self.max_expressions = max_expressions
+        self.registry = registry
+
+
+class ServerStats:
+    # The requests, errors and batches counted since the last reset, and the latencies of the last responses
+    def __init__(self, latency_window):
+        self.counts = Counter()
+        self.latencies = deque(maxlen=latency_window)
+        self.started = time.perf_counter()
+
+    def reset(self):
+        self.counts.clear()
+        self.latencies.clear()
+        self.started = time.perf_counter()
+
+    def as_dict(self, pending, expressions):
+        counts = self.counts
+        uptime = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        latency_ms = {name: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3 if latencies else 0.
+                      for name, q in PERCENTILES.items()}
+        latency_ms['max'] = latencies[-1] * 1e3 if latencies else 0.
+        return {'requests': counts['requests'],
+                'errors': counts['errors'],
+                'batches': counts['batches'],
+                'mean_batch_size': counts['batched_requests'] / counts['batches'] if counts['batches'] else 0.,
+                'pending': pending,
+                'expressions': expressions,
+                'uptime': uptime,
+                'throughput': counts['requests'] / uptime if uptime else 0.,
+                'latency_ms': latency_ms}
+
+
+class EvaluationServer:
+    def __init__(self, latency_window=10000, **options):
+        # The other keyword arguments are those of ServerOptions
+        self.options = ServerOptions(**options)
+        self.server = None
+        self.pending = 0
+        self._expressions = OrderedDict()
+        self._batches = {}
+        self._slots = None
+        self._stats = ServerStats(latency_window)
+
+    def reset_stats(self):
+        self._stats.reset()
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        # Requests are only read from the sockets while there is room for them, which pushes back on the clients
+        self._slots = asyncio.Semaphore(self.options.max_pending)
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self._handle_connection, path)
+        else:
+            self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self
+
+    @property
+    def address(self):
+        return self.server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        await self.server.serve_forever()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _handle_connection(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                await self._slots.acquire()
+                self.pending += 1
+                task = asyncio.ensure_future(self._respond(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, line, writer, lock):
+        start = time.perf_counter()
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('a request must be a JSON object')
+            request_id = request.get('id')
+            response = {'id': request_id, 'result': await self._handle(request)}
+        except Exception as error:
+            # Every request is answered, a client must never wait for a response that will not come
+            self._stats.counts['errors'] += 1
+            response = {'id': request_id, 'error': error.__class__.__name__, 'message': str(error)}
+        finally:
+            self.pending -= 1
+            self._slots.release()
+        try:
+            async with lock:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            return
+        self._stats.latencies.append(time.perf_counter() - start)
+
+    async def _handle(self, request):
+        if request.get('command') == 'stats':
+            return self.stats()
+        self._stats.counts['requests'] += 1
+        variables = request.get('variables') or {}
+        if not isinstance(variables, dict):
+            raise ValueError('variables must be a JSON object')
+        expression = request['expression']
+        if not isinstance(expression, str):
+            raise ValueError('expression must be a JSON string')
+        result = await self.submit(expression, variables)
+        if isinstance(result, complex):
+            raise ValueError('the result is not a real number')
+        return result
+
+    def submit(self, expression, variables):
+        compiled = self._compiled(expression)
+        future = asyncio.get_running_loop().create_future()
+        batch = self._batches.get(expression)
+        if batch is None:
+            batch = self._batches[expression] = (compiled, [])
+            asyncio.get_running_loop().call_later(self.options.batch_delay, self._flush, expression, batch)
+        batch[1].append((variables, future))
+        if len(batch[1]) >= self.options.batch_size:
+            self._flush(expression, batch)
+        return future
+
+    def _compiled(self, expression):
+        compiled = self._expressions.get(expression)
+        if compiled is None:
+            compiled = self._expressions[expression] = Expression(expression, registry=self.options.registry).compile()
+            while len(self._expressions) > self.options.max_expressions:
+                self._expressions.popitem(last=False)
+        self._expressions.move_to_end(expression)
+        return compiled
+
+    def _flush(self, expression, batch):
+        # A full batch is flushed before its timer expires, the timer must not flush the next one early
+        if self._batches.get(expression) is not batch:
+            return
+        del self._batches[expression]
+        compiled, requests = batch
+        self._stats.counts['batches'] += 1
+        self._stats.counts['batched_requests'] += len(requests)
+        for variables, future in requests:
+            if future.cancelled():
+                continue
+            # Any failure only fails its own request, the other requests of the batch still get their result
+            try:
+                future.set_result(compiled.evaluate(variables))
+            except Exception as error:
+                future.set_exception(error)
+
+    def stats(self):
+        return self._stats.as_dict(self.pending, len(self._expressions))
+
+
+async def serve(host='127.0.0.1', port=8765, path=None, **options):
+    server = await EvaluationServer(**options).start(host, port, path)
+    async with server:
+        await server.serve_forever()
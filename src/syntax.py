@@ -0,0 +1,202 @@
+from tokenizer import Value, Variable, Function, Operator, Constant, OpenParentheses, CloseParentheses, Comma, \
+    OPERATOR_TOKENS
+from errors import UnexpectedToken
+
+NEGATIVE = OPERATOR_TOKENS['-u']
+# A function called without parentheses, like in 'sin-x', takes the following power as its argument
+FUNCTION_PRECEDENCE = OPERATOR_TOKENS['^'].precedence
+
+
+class Node:
+    __slots__ = ('token', 'operands')
+
+    def __init__(self, token, *operands):
+        self.token = token
+        self.operands = operands
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.token == other.token and self.operands == other.operands
+
+    def __repr__(self):
+        operands = ''.join(f", {operand!r}" for operand in self.operands)
+        return f"{self.__class__.__name__} ({self.token!r}{operands})"
+
+
+class Number(Node):
+    __slots__ = ()
+
+
+class NamedConstant(Node):
+    __slots__ = ()
+
+
+class Name(Node):
+    __slots__ = ()
+
+
+class UnaryOperation(Node):
+    __slots__ = ()
+
+    @property
+    def operand(self):
+        return self.operands[0]
+
+
+class BinaryOperation(Node):
+    __slots__ = ()
+
+    @property
+    def left(self):
+        return self.operands[0]
+
+    @property
+    def right(self):
+        return self.operands[1]
+
+
+class Call(Node):
+    __slots__ = ()
+
+    @property
+    def arguments(self):
+        return self.operands
+
+
+LEAVES = {Value: Number, Variable: Name, Constant: NamedConstant}
+# What is left to do with an expression once it is parsed, kept on an explicit stack instead of the call stack so
+# that the depth of nested parentheses, negations, calls and right associative powers is not limited by recursion
+PARENTHESES, NEGATION, CALL, BARE_CALL, RIGHT_OPERAND = range(5)
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.count = len(tokens)
+        self.position = 0
+        self.pending = []
+        self.min_precedence = 0
+
+    def expression(self):
+        node = self._prefix()
+        while True:
+            node = self._infix(node)
+            if not self.pending:
+                return node
+            node = self._continuation(node)
+
+    def _prefix(self):
+        # Opening tokens are pushed with the precedence to return to, until a leaf starts the operand
+        tokens, count, position, pending = self.tokens, self.count, self.position, self.pending
+        while True:
+            if position >= count:
+                raise UnexpectedToken(position)
+            token = tokens[position]
+            position += 1
+            leaf = LEAVES.get(token.__class__)
+            if leaf is not None:
+                self.position = position
+                return leaf(token)
+            if isinstance(token, OpenParentheses):
+                pending.append((PARENTHESES, self.min_precedence, None, None))
+                self.min_precedence = 0
+            elif isinstance(token, Function) and position < count and isinstance(tokens[position], OpenParentheses):
+                position += 1
+                pending.append((CALL, self.min_precedence, token, []))
+                self.min_precedence = 0
+            elif isinstance(token, Function):
+                pending.append((BARE_CALL, self.min_precedence, token, None))
+                self.min_precedence = FUNCTION_PRECEDENCE
+            # The tokenizer takes a '-' after an open parentheses, like in '(-2)', as a subtraction
+            elif isinstance(token, Operator) and (token is NEGATIVE or token.symbol == '-'):
+                pending.append((NEGATION, self.min_precedence, None, None))
+                self.min_precedence = NEGATIVE.precedence
+            else:
+                raise UnexpectedToken(position - 1)
+
+    def _infix(self, node):
+        # Operators are applied while they bind at least as tightly as the current precedence
+        tokens, count, position = self.tokens, self.count, self.position
+        while position < count:
+            token = tokens[position]
+            if not isinstance(token, Operator):
+                if isinstance(token, (CloseParentheses, Comma)):
+                    break
+                raise UnexpectedToken(position)
+            if token.operands_count == 1 and token.associativity != 'left':
+                # The tokenizer takes a '-' after a postfix operator, like in '3!-2', as a negation
+                token = OPERATOR_TOKENS['-']
+            if token.precedence < self.min_precedence:
+                break
+            position += 1
+            if token.operands_count == 1:
+                node = UnaryOperation(token, node)
+                continue
+            right_precedence = token.precedence + 1 if token.associativity == 'left' else token.precedence
+            # Most right operands are a single leaf followed by an operator that does not bind tighter
+            leaf = LEAVES.get(tokens[position].__class__) if position < count else None
+            if leaf is not None:
+                following = tokens[position + 1] if position + 1 < count else None
+                if not isinstance(following, Operator) or following.precedence < right_precedence:
+                    node = BinaryOperation(token, node, leaf(tokens[position]))
+                    position += 1
+                    continue
+            self.pending.append((RIGHT_OPERAND, self.min_precedence, token, node))
+            self.min_precedence = right_precedence
+            self.position = position
+            node = self._prefix()
+            position = self.position
+        self.position = position
+        return node
+
+    def _continuation(self, node):
+        # The innermost pending construct is completed with the operand that was just parsed
+        kind, self.min_precedence, token, operands = self.pending.pop()
+        if kind == RIGHT_OPERAND:
+            return BinaryOperation(token, operands, node)
+        if kind == NEGATION:
+            return UnaryOperation(NEGATIVE, node)
+        if kind == BARE_CALL:
+            return self._call(token, [node], self.position)
+        tokens, count, position = self.tokens, self.count, self.position
+        if kind == CALL and position < count and isinstance(tokens[position], Comma):
+            operands.append(node)
+            self.pending.append((CALL, self.min_precedence, token, operands))
+            self.min_precedence = 0
+            self.position = position + 1
+            return self._prefix()
+        if position >= count or not isinstance(tokens[position], CloseParentheses):
+            raise UnexpectedToken(position)
+        self.position = position + 1
+        if kind == CALL:
+            operands.append(node)
+            return self._call(token, operands, self.position)
+        return node
+
+    @staticmethod
+    def _call(function, arguments, position):
+        if len(arguments) != function.operands_count:
+            raise UnexpectedToken(position - 1)
+        return Call(function, *arguments)
+
+
+def parse(tokens):
+    # An empty expression has no value, it is rejected like an operand missing at its start
+    if not tokens:
+        raise UnexpectedToken(0)
+    parser = _Parser(tokens)
+    node = parser.expression()
+    if parser.position < parser.count:
+        raise UnexpectedToken(parser.position)
+    return node
+
+
+def to_rpn(node):
+    # Nodes are visited root first and right to left without recursion, which is the RPN reversed
+    rpn = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        rpn.append(node.token)
+        stack.extend(node.operands)
+    rpn.reverse()
+    return rpn
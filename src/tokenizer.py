@@ -1,82 +1,121 @@
 import re
-from src.tokens import OPEN_PARENTHESES, CLOSE_PARENTHESES, HYPHEN, MINUS_SIGN, NUMBERS, FUNCTIONS, \
-    CONSTANTS, OPERATORS, Constant, Value, Variable, Operator, Function, OpenParentheses, CloseParentheses
+from string import ascii_letters
+from src.tokens import SPACE, OPEN_PARENTHESES, CLOSE_PARENTHESES, COMMA, HYPHEN, MINUS_SIGN, OPERATORS, Constant, \
+    Value, Variable, Operator, Function, OpenParentheses, CloseParentheses, Comma, OPERATOR_TOKENS, FUNCTION_TOKENS, \
+    CONSTANT_TOKENS, OPEN_PARENTHESES_TOKEN, CLOSE_PARENTHESES_TOKEN, COMMA_TOKEN, Registry, DEFAULT_REGISTRY
 from src.errors import UnmatchingOpenParentheses, UnmatchingCloseParentheses, UnexpectedCharacter
 
+# The tokens and registries are defined in tokens, the rest of the package imports them from here
+__all__ = ['Tokenizer', 'Value', 'Variable', 'Operator', 'Function', 'Constant', 'OpenParentheses', 'CloseParentheses',
+           'Comma', 'OPERATOR_TOKENS', 'FUNCTION_TOKENS', 'CONSTANT_TOKENS', 'Registry', 'DEFAULT_REGISTRY']
+
+SCANNER = re.compile(r"(?P<number>[0-9.]+)|(?P<word>[a-zA-Z]+)|(?P<space>\s+)|(?P<char>.)", re.DOTALL)
+ASCII_LETTERS = frozenset(ascii_letters)
+
 
 class Tokenizer:
+    def __init__(self, registry=None):
+        self.registry = registry if registry is not None else DEFAULT_REGISTRY
+
     def tokenize(self, expression):
         expression = self._sanitize_expression(expression)
-        expression = self.expand_implicit_expression(expression)
-        tokens = []
-        variables = set()
-        parentheses_level = 0
-        current_char_sequence = []
-        for position, char in enumerate(expression):
-            self._evaluate_unexpected_char(position, char, expression)
-            self._generate_new_token(tokens, current_char_sequence, variables, char)
-            if char == OPEN_PARENTHESES:
-                parentheses_level += 1
-                tokens.append(OpenParentheses())
-            elif char == CLOSE_PARENTHESES:
-                parentheses_level -= 1
-                tokens.append(CloseParentheses())
-            elif char in NUMBERS or char.isalpha():
-                current_char_sequence += char
-            elif char in OPERATORS.keys():
-                tokens.append(self._generate_operator(char, tokens))
-            self._evaluate_matching_parentheses(parentheses_level, position, len(expression))
-        self._generate_new_token(tokens, current_char_sequence, variables)
-        return tokens, variables
+        scan = _Scan(self.registry.tokens)
+        # Implicit multiplications are emitted as if a '*' had been written in the expression,
+        # so every one of them shifts the position of the following characters by one
+        shift = 0
+        previous_char = ''
+        for match in SCANNER.finditer(expression):
+            kind = match.lastgroup
+            text = match.group()
+            if kind == 'space':
+                previous_char = SPACE
+                continue
+            start = match.start()
+            if text not in OPERATORS and self._is_implicit_multiplication(previous_char, text[0]):
+                scan.add(OPERATOR_TOKENS['*'])
+                shift += 1
+            position = start + shift
+            previous_char = text[-1]
+            if kind == 'number':
+                self._evaluate_unexpected_dots(position, text, expression[start - 1])
+                scan.sequence.append(text)
+            elif kind == 'word' or text.isalpha():
+                scan.sequence.append(text)
+            else:
+                self._tokenize_char(scan, text, position, expression[start - 1])
+        if scan.parentheses_level > 0:
+            raise UnmatchingOpenParentheses()
+        scan.flush()
+        return scan.tokens, set(scan.variables)
+
+    def _tokenize_char(self, scan, char, position, previous_char):
+        if char == OPEN_PARENTHESES:
+            scan.add(OPEN_PARENTHESES_TOKEN)
+            scan.parentheses_level += 1
+        elif char == CLOSE_PARENTHESES:
+            if previous_char == OPEN_PARENTHESES:
+                raise UnexpectedCharacter(position)
+            scan.add(CLOSE_PARENTHESES_TOKEN)
+            scan.parentheses_level -= 1
+            if scan.parentheses_level < 0:
+                raise UnmatchingCloseParentheses(position)
+        elif char == COMMA:
+            scan.add(COMMA_TOKEN)
+        elif char in OPERATORS:
+            scan.flush()
+            scan.tokens.append(self._generate_operator(char, scan.tokens))
 
     @staticmethod
     def _sanitize_expression(expression):
         return expression.replace(MINUS_SIGN, HYPHEN)
 
     @staticmethod
-    def expand_implicit_expression(expression):
-        expression = expression.replace(')(', ')*(')
-        expression = re.sub(r"(\d+)([a-zA-Z]+)", r"\1*\2", expression)
-        expression = re.sub(r"([a-zA-Z]+)(\d+)", r"\1*\2", expression)
-        expression = re.sub(r"(\d+)(\()", r"\1*\2", expression)
-        expression = re.sub(r"(\))(\d+)", r"\1*\2", expression)
-        return expression
-
-    def _generate_new_token(self, tokens, current_char_sequence, variables, current_char=None):
-        if self._should_generate_new_token(current_char_sequence, current_char):
-            token = "".join(current_char_sequence)
-            if token in CONSTANTS.keys():
-                tokens.append(Constant(token))
-            elif token in FUNCTIONS.keys():
-                tokens.append(Function(token))
-            elif token.isalpha():
-                variables.add(token)
-                tokens.append(Variable(token))
-            else:
-                tokens.append(Value(token))
-            current_char_sequence.clear()
-
-    @staticmethod
-    def _should_generate_new_token(current_char_sequence, current_char):
-        return current_char_sequence and (current_char is None
-                                          or current_char in {OPEN_PARENTHESES, CLOSE_PARENTHESES}
-                                          or current_char in OPERATORS.keys())
+    def _is_implicit_multiplication(previous_char, current_char):
+        if previous_char == CLOSE_PARENTHESES:
+            return current_char == OPEN_PARENTHESES or current_char.isdecimal()
+        if previous_char.isdecimal():
+            return current_char == OPEN_PARENTHESES or current_char in ASCII_LETTERS
+        return previous_char in ASCII_LETTERS and current_char.isdecimal()
 
     @staticmethod
-    def _evaluate_matching_parentheses(parentheses_level, position, length):
-        if parentheses_level <= -1:
-            raise UnmatchingCloseParentheses(position)
-        if position == length - 1 and parentheses_level > 0:
-            raise UnmatchingOpenParentheses()
-
-    @staticmethod
-    def _evaluate_unexpected_char(position, current_char, expression):
-        previous_char = expression[position - 1]
-        if (current_char == '.' and previous_char == '.') or (current_char == ')' and previous_char == '('):
+    def _evaluate_unexpected_dots(position, number, previous_char):
+        if number[0] == '.' and previous_char == '.':
             raise UnexpectedCharacter(position)
+        index = number.find('..')
+        if index >= 0:
+            raise UnexpectedCharacter(position + index + 1)
 
     @staticmethod
     def _generate_operator(op, tokens):
         if op == HYPHEN and (not tokens or isinstance(tokens[-1], Operator)):
             op = '-u'
-        return Operator(op)
+        return OPERATOR_TOKENS[op]
+
+
+class _Scan:
+    # The state of one call to tokenize: the tokens so far and the characters of the current word or number
+    __slots__ = ('words', 'tokens', 'variables', 'sequence', 'parentheses_level')
+
+    def __init__(self, words):
+        self.words = words
+        self.tokens = []
+        self.variables = {}
+        self.sequence = []
+        self.parentheses_level = 0
+
+    def add(self, token):
+        self.flush()
+        self.tokens.append(token)
+
+    def flush(self):
+        if self.sequence:
+            token = "".join(self.sequence)
+            if token in self.words:
+                self.tokens.append(self.words[token])
+            elif token.isalpha():
+                if token not in self.variables:
+                    self.variables[token] = Variable(token)
+                self.tokens.append(self.variables[token])
+            else:
+                self.tokens.append(Value(token))
+            self.sequence.clear()
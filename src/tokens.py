@@ -1,5 +1,6 @@
 import math
 import operator
+import threading
 
 NUMBERS = '0123456789.'
 SPACE = ' '
@@ -7,10 +8,28 @@ HYPHEN = '-'
 MINUS_SIGN = u"\u2212"
 OPEN_PARENTHESES = '('
 CLOSE_PARENTHESES = ')'
+COMMA = ','
+
+
+def factorial(value):
+    if not float(value).is_integer():
+        raise ValueError('factorial() only accepts integral values')
+    return math.factorial(int(value))
+
+
+def cbrt(value):
+    # The real cube root, a negative power of 1/3 would be complex
+    return -(-value) ** (1. / 3) if value < 0 else value ** (1. / 3)
+
+
+def negative(value):
+    return -value
+
+
 CONSTANTS = {'pi': math.pi, 'e': math.e, 'phi': 1.618033988749894}
 
 FUNCTIONS = {'sqrt': (math.sqrt, 1),
-             'cbrt': (lambda v: v ** (1. / 3), 1),
+             'cbrt': (cbrt, 1),
              'sin': (math.sin, 1),
              'cos': (math.cos, 1),
              'tan': (math.tan, 1),
@@ -22,22 +41,32 @@ OPERATORS = {'+': (operator.add, 2, 'left', 2),
              '/': (operator.truediv, 3, 'left', 2),
              '*': (operator.mul, 3, 'left', 2),
              '^': (operator.pow, 4, 'right', 2),
-             '!': (math.factorial, 5, 'left', 1),
-             '-u': (lambda v: -v, 5, 'right', 1)}
+             '!': (factorial, 5, 'left', 1),
+             '-u': (negative, 5, 'right', 1)}
 
 
 class Token:
+    __slots__ = ('symbol',)
+
     def __init__(self, symbol):
         self.symbol = symbol
 
     def __eq__(self, other):
         return self.symbol == other.symbol
 
+    def __reduce_ex__(self, protocol):
+        # The shared tokens are told apart from registered ones by identity, so they are unpickled as themselves
+        if SHARED_TOKENS.get((self.__class__, self.symbol)) is self:
+            return shared_token, (self.__class__, self.symbol)
+        return super().__reduce_ex__(protocol)
+
     def __repr__(self):
         return f"{self.__class__.__name__} ({self.symbol})"
 
 
 class Value:
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
@@ -49,39 +78,125 @@ class Value:
 
 
 class Operator(Token):
+    __slots__ = ('function', 'precedence', 'associativity', 'operands_count')
+
     def __init__(self, symbol):
         super().__init__(symbol)
-        self.function = OPERATORS[symbol][0]
-        self.precedence = OPERATORS[symbol][1]
-        self.associativity = OPERATORS[symbol][2]
-        self.operands_count = OPERATORS[symbol][3]
+        self.function, self.precedence, self.associativity, self.operands_count = OPERATORS[symbol]
 
     def __eq__(self, other):
         return super().__eq__(other) and self.operands_count == other.operands_count
 
 
 class Function(Token):
-    def __init__(self, function):
+    __slots__ = ('function', 'operands_count', 'vectorized', 'pure')
+
+    def __init__(self, function, implementation=None, operands_count=1, vectorized=None, pure=True):
         super().__init__(function)
-        self.function = FUNCTIONS[function][0]
-        self.operands_count = FUNCTIONS[function][1]
+        if implementation is None:
+            implementation, operands_count = FUNCTIONS[function]
+        self.function = implementation
+        self.operands_count = operands_count
+        self.vectorized = vectorized
+        self.pure = pure
 
 
 class Variable(Token):
-    pass
+    __slots__ = ()
 
 
-class Constant(Token, Value):
-    def __init__(self, symbol):
-        Token.__init__(self, symbol)
-        Value.__init__(self, CONSTANTS[symbol])
+class Constant(Token):
+    __slots__ = ('value',)
+
+    def __init__(self, symbol, value=None):
+        super().__init__(symbol)
+        self.value = CONSTANTS[symbol] if value is None else float(value)
 
 
 class OpenParentheses(Token):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__('(')
 
 
 class CloseParentheses(Token):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(')')
+
+
+class Comma(Token):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(',')
+
+
+# Tokens are never changed after being created, so the tokenizer shares a single instance
+# of every operator, function, constant, parentheses and comma among all the parsed expressions
+OPERATOR_TOKENS = {symbol: Operator(symbol) for symbol in OPERATORS}
+FUNCTION_TOKENS = {function: Function(function) for function in FUNCTIONS}
+CONSTANT_TOKENS = {symbol: Constant(symbol) for symbol in CONSTANTS}
+OPEN_PARENTHESES_TOKEN = OpenParentheses()
+CLOSE_PARENTHESES_TOKEN = CloseParentheses()
+COMMA_TOKEN = Comma()
+SHARED_TOKENS = {(token.__class__, token.symbol): token
+                 for token in [*OPERATOR_TOKENS.values(), *FUNCTION_TOKENS.values(), *CONSTANT_TOKENS.values(),
+                               OPEN_PARENTHESES_TOKEN, CLOSE_PARENTHESES_TOKEN, COMMA_TOKEN]}
+
+
+def shared_token(kind, symbol):
+    return SHARED_TOKENS[kind, symbol]
+
+
+class Registry:
+    def __init__(self, defaults=True):
+        self._lock = threading.Lock()
+        self._update({**FUNCTION_TOKENS, **CONSTANT_TOKENS} if defaults else {})
+
+    def register_function(self, name, function, operands_count=1, vectorized=None, pure=True):
+        if operands_count < 1:
+            raise ValueError('functions take at least one argument')
+        return self._register(Function(name, function, operands_count, vectorized, pure))
+
+    def register_constant(self, name, value):
+        return self._register(Constant(name, value))
+
+    def _register(self, token):
+        # Only letters are read as a name, so any other name could never be tokenized
+        if not (token.symbol.isascii() and token.symbol.isalpha()):
+            raise ValueError(f"'{token.symbol}' is not a valid name")
+        # Writers are serialized so that none of them replaces the tables without the token of another
+        with self._lock:
+            self._update({**self.tokens, token.symbol: token})
+        return token
+
+    def _update(self, tokens):
+        # The tables are read without locking, so they are replaced instead of changed in place
+        self.functions = {name: token for name, token in tokens.items() if isinstance(token, Function)}
+        self.constants = {name: token for name, token in tokens.items() if isinstance(token, Constant)}
+        self.tokens = tokens
+
+    def copy(self):
+        return _registry_of(self.tokens)
+
+    def __reduce__(self):
+        # Locks cannot be pickled, so the registry is built again from its tokens when unpickled
+        return _registry_of, (self.tokens,)
+
+    def __contains__(self, name):
+        return name in self.tokens
+
+    def __getitem__(self, name):
+        return self.tokens[name]
+
+
+def _registry_of(tokens):
+    registry = Registry(defaults=False)
+    registry._update(tokens)
+    return registry
+
+
+DEFAULT_REGISTRY = Registry()
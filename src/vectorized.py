@@ -0,0 +1,88 @@
+import math
+from tokenizer import Value, Variable, Function, Operator, Constant, FUNCTION_TOKENS
+from errors import UnassignedVariable
+from src.tokens import factorial
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _float_factorial(value):
+    # 171! is already too large for a float, larger factorials overflow to inf like the other operations, and
+    # values without a factorial give nan instead of failing the whole batch
+    if value > 170:
+        return math.inf if value == math.inf or float(value).is_integer() else math.nan
+    if value < 0 or not float(value).is_integer():
+        return math.nan
+    return float(factorial(value))
+
+
+def _factorial(values):
+    # There is no factorial ufunc, so fall back to the scalar implementation element by element
+    return np.asarray(np.frompyfunc(_float_factorial, 1, 1)(values), dtype=float)
+
+
+def _cbrt(values):
+    # np.cbrt rounds differently than the scalar v ** (1. / 3), so keep the same formula on the magnitude
+    return np.power(np.abs(values), 1. / 3) * np.where(values < 0, -1., 1.)
+
+
+if np is not None:
+    OPERATORS = {'+': np.add,
+                 '-': np.subtract,
+                 '/': np.true_divide,
+                 '*': np.multiply,
+                 '^': np.power,
+                 '!': _factorial,
+                 '-u': np.negative}
+
+    FUNCTIONS = {'sqrt': np.sqrt,
+                 'cbrt': _cbrt,
+                 'sin': np.sin,
+                 'cos': np.cos,
+                 'tan': np.tan,
+                 'radians': np.radians,
+                 'degrees': np.degrees}
+else:  # pragma: no cover
+    OPERATORS = {}
+    FUNCTIONS = {}
+
+
+def function_of(token):
+    if isinstance(token, Operator):
+        return OPERATORS[token.symbol]
+    if token.vectorized is not None:
+        return token.vectorized
+    if FUNCTION_TOKENS.get(token.symbol) is token:
+        return FUNCTIONS[token.symbol]
+    # Registered functions without a vectorized counterpart are applied element by element
+    elementwise = np.frompyfunc(token.function, token.operands_count, 1)
+    return lambda *operands: np.asarray(elementwise(*operands), dtype=float)
+
+
+def apply(token, operands):
+    return function_of(token)(*operands)
+
+
+def evaluate_batch(rpn, variables, columns):
+    if np is None:
+        raise ImportError('NumPy is required for batch evaluation')
+    unassigned_variables = [name for name in variables if columns.get(name) is None]
+    if unassigned_variables:
+        raise UnassignedVariable(str(unassigned_variables))
+    arrays = {name: np.asarray(columns[name], dtype=float) for name in variables}
+    shape = np.broadcast_shapes(*(array.shape for array in arrays.values()))
+    stack = []
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for token in rpn:
+            if isinstance(token, (Operator, Function)):
+                operands = stack[-token.operands_count:]
+                del stack[-token.operands_count:]
+                stack.append(apply(token, operands))
+            if isinstance(token, (Value, Constant)):
+                stack.append(np.float64(float(token.value)))
+            if isinstance(token, Variable):
+                stack.append(arrays[token.symbol])
+    return np.broadcast_to(stack[0], shape).copy()
@@ -0,0 +1,109 @@
+import math
+import unittest
+from expression import Expression
+from errors import UnassignedVariable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def finite_differences(e, variables, step=1e-6):
+    partials = {}
+    for name in variables:
+        forward = dict(variables, **{name: variables[name] + step})
+        backward = dict(variables, **{name: variables[name] - step})
+        partials[name] = (e.evaluate(forward) - e.evaluate(backward)) / (2 * step)
+    return partials
+
+
+class GradientTest(unittest.TestCase):
+    CASES = {'x + y': {'x': 1.5, 'y': 2.5},
+             'x - y': {'x': 1.5, 'y': 2.5},
+             'x * y': {'x': 1.5, 'y': 2.5},
+             'x / y': {'x': 1.5, 'y': 2.5},
+             'x ^ y': {'x': 1.5, 'y': 2.5},
+             '-x * y': {'x': 1.5, 'y': 2.5},
+             'sqrt(x) + cbrt(y)': {'x': 1.5, 'y': 2.5},
+             'sin(x) * cos(y)': {'x': 1.5, 'y': 2.5},
+             'tan(x) - tan(y)': {'x': 0.5, 'y': 0.25},
+             'radians(x) + degrees(y)': {'x': 1.5, 'y': 2.5},
+             '2pi * r * (r + h)': {'r': 2, 'h': 3},
+             'sin(radians(x))^2 + x/y^3 - sqrt(x*y)': {'x': 30, 'y': 2}}
+
+    def test_gradient_matches_finite_differences(self):
+        for text, variables in self.CASES.items():
+            for mode in ['forward', 'reverse']:
+                with self.subTest(text=text, mode=mode):
+                    e = Expression(text)
+                    value, partials = e.gradient(variables, mode)
+                    self.assertEqual(e.evaluate(variables), value)
+                    expected = finite_differences(e, variables)
+                    self.assertEqual(expected.keys(), partials.keys())
+                    for name, partial in partials.items():
+                        self.assertAlmostEqual(expected[name], partial, 5)
+
+    def test_gradient_of_factorial(self):
+        _, partials = Expression('x!').gradient({'x': 3})
+        # d/dx gamma(x + 1) = gamma(x + 1) * digamma(x + 1) and digamma(4) = 1 + 1/2 + 1/3 - euler_gamma
+        self.assertAlmostEqual(6 * (11 / 6 - 0.5772156649015329), partials['x'], 12)
+
+    def test_gradient_of_power_with_zero_base(self):
+        _, partials = Expression('x^y').gradient({'x': 0, 'y': 2})
+        self.assertEqual({'x': 0, 'y': 0}, partials)
+
+    def test_gradient_where_the_derivative_is_unbounded(self):
+        cases = {'x^0': (1, 0), 'x^0.5': (0, math.inf), 'sqrt(x)': (0, math.inf), 'cbrt(x)': (0, math.inf)}
+        for text, expected in cases.items():
+            for mode in ['forward', 'reverse']:
+                with self.subTest(text=text, mode=mode):
+                    value, partials = Expression(text).gradient({'x': 0}, mode)
+                    self.assertEqual(expected[0], value)
+                    self.assertEqual(str(float(expected[1])), str(partials['x']))
+
+    def test_gradient_uses_assigned_variables(self):
+        e = Expression('x*y')
+        e.assign_value('x', 2)
+        e.assign_value('y', 3)
+        self.assertEqual((6, {'x': 3, 'y': 2}), e.gradient())
+
+    def test_gradient_of_constant_expression(self):
+        self.assertEqual((4.0, {}), Expression('2^2').gradient())
+
+    def test_gradient_raises_unassigned_variable_error(self):
+        with self.assertRaises(UnassignedVariable):
+            Expression('x*y').gradient({'x': 1})
+
+    def test_gradient_raises_error_for_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            Expression('x').gradient({'x': 1}, mode='symbolic')
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_gradient_batch_matches_scalar_gradient(self):
+        e = Expression('sin(radians(x))^2 + x/y^3 - sqrt(x*y) + (x/10)! + cbrt(y)')
+        xs, ys = [10, 20, 30], [1.5, 2, 2.5]
+        values, partials = e.gradient_batch(x=xs, y=ys)
+        for index, (x, y) in enumerate(zip(xs, ys)):
+            value, expected = e.gradient({'x': x, 'y': y})
+            self.assertAlmostEqual(value, values[index], 12)
+            for name in expected:
+                self.assertAlmostEqual(expected[name], partials[name][index], 10)
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_gradient_batch_where_the_derivative_is_unbounded(self):
+        for text in ['x^0', 'x^0.5', 'x^y', 'sqrt(x)', 'cbrt(x)']:
+            for mode in ['forward', 'reverse']:
+                with self.subTest(text=text, mode=mode):
+                    e = Expression(text)
+                    _, partials = e.gradient_batch(mode, x=[0, 0], y=[0, 2])
+                    for index, y in enumerate([0, 2]):
+                        _, expected = e.gradient({'x': 0, 'y': y}, mode)
+                        for name in expected:
+                            self.assertEqual(str(expected[name]), str(partials[name][index]))
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_gradient_batch_broadcasts_constant_partials(self):
+        _, partials = Expression('x + 2y').gradient_batch(x=[1, 2, 3], y=[1, 1, 1])
+        np.testing.assert_array_equal([1, 1, 1], partials['x'])
+        np.testing.assert_array_equal([2, 2, 2], partials['y'])
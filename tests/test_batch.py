@@ -0,0 +1,111 @@
+import itertools
+import math
+import unittest
+from batch import parse_many
+from expression import Expression
+from tokenizer import OPERATOR_TOKENS, Registry
+from errors import UnexpectedToken
+from src.errors import UnmatchingOpenParentheses, UnmatchingCloseParentheses, UnexpectedCharacter
+
+
+class ParseManyTest(unittest.TestCase):
+    TEXTS = ['x + 1', '(1 + 2', 'sin(x) * y', '1 + 2)', 'x + 1', '2 * ()', '1 +', 'sin(x) * y']
+
+    def assertResults(self, results):
+        self.assertEqual(list(range(len(self.TEXTS))), [result.index for result in results])
+        self.assertEqual(self.TEXTS, [result.text for result in results])
+        for result in results:
+            with self.subTest(text=result.text):
+                if result.ok:
+                    self.assertEqual(Expression(result.text).rpn, result.expression.rpn)
+                else:
+                    self.assertIsNone(result.expression)
+        errors = [(type(result.error), result.position) for result in results if not result.ok]
+        self.assertEqual([(UnmatchingOpenParentheses, None), (UnmatchingCloseParentheses, 5),
+                          (UnexpectedCharacter, 5), (UnexpectedToken, 2)], errors)
+
+    def test_parse_many_reports_errors_without_stopping(self):
+        self.assertResults(list(parse_many(self.TEXTS, chunk_size=3)))
+
+    def test_parse_many_in_worker_processes(self):
+        results = list(parse_many(self.TEXTS * 3, workers=2, chunk_size=2))
+        self.assertResults(results[:len(self.TEXTS)])
+        self.assertEqual([result.text for result in results], self.TEXTS * 3)
+        # Tokens loaded from the workers are the shared instances
+        self.assertIs(OPERATOR_TOKENS['+'], results[0].expression.rpn[-1])
+
+    def test_parse_many_functions_of_several_arguments_in_worker_processes(self):
+        registry = Registry()
+        registry.register_function('max', max, 2)
+        registry.register_function('hypot', math.hypot, 2)
+        texts = ['max(x, y)', 'hypot(x, 2) + max(x, y)', '1 +', 'max(x, y)']
+        results = list(parse_many(texts, workers=2, chunk_size=1, registry=registry))
+        self.assertEqual([True, True, False, True], [result.ok for result in results])
+        self.assertEqual(3, results[3].expression.evaluate({'x': 3, 'y': 2}))
+
+    def test_parse_many_reports_worker_failures_per_item(self):
+        # A registry holding a lambda cannot be sent to the workers, which fails every chunk
+        registry = Registry()
+        registry.register_function('double', lambda value: 2 * value)
+        results = parse_many(['double(x)', 'x + 1', 'x + 1'], workers=2, chunk_size=1, registry=registry)
+        self.assertEqual([False, False, False], [result.ok for result in results])
+        self.assertEqual(3, results.stats()['errors'])
+
+    def test_parse_many_reports_invalid_items_without_aborting(self):
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                results = list(parse_many(['x+1', None, 'y', 5, ['x'], 'y'], workers=workers, chunk_size=2))
+                self.assertEqual([True, False, True, False, False, True], [result.ok for result in results])
+                self.assertIsInstance(results[1].error, TypeError)
+                self.assertIsInstance(results[4].error, TypeError)
+                self.assertEqual(1, results[2].expression.evaluate({'y': 1}))
+
+    def test_parse_many_does_not_count_invalid_items_as_duplicates(self):
+        results = parse_many(['1+', 'x*2', 'x*2', 5, '(x'])
+        list(results)
+        self.assertEqual({'items': 5, 'unique': 3, 'duplicates': 1, 'errors': 3},
+                         {key: results.stats()[key] for key in ['items', 'unique', 'duplicates', 'errors']})
+
+    def test_parse_many_forgets_the_oldest_texts(self):
+        results = parse_many(['x', 'y', 'x', 'y', 'y'], chunk_size=1, cache_size=1)
+        self.assertEqual(['x', 'y', 'x', 'y', 'y'], [result.expression.tokens[0].symbol for result in results])
+        self.assertEqual({'unique': 2, 'duplicates': 3},
+                         {key: results.stats()[key] for key in ['unique', 'duplicates']})
+
+    def test_parse_many_parses_repeated_texts_once(self):
+        results = parse_many(self.TEXTS)
+        first, _, _, _, repeated = itertools.islice(results, 5)
+        self.assertIsNot(first.expression, repeated.expression)
+        first.expression.assign_value('x', 2)
+        self.assertIsNone(repeated.expression.variables['x'])
+        list(results)
+        stats = results.stats()
+        self.assertEqual({'items': 8, 'unique': 6, 'duplicates': 2, 'errors': 4},
+                         {key: stats[key] for key in ['items', 'unique', 'duplicates', 'errors']})
+        self.assertGreater(stats['throughput'], 0)
+
+    def test_parse_many_streams_lazily(self):
+        texts = (f"x + {i}" for i in itertools.count())
+        results = parse_many(texts, chunk_size=10)
+        self.assertEqual(7, next(results).expression.evaluate({'x': 7}))
+
+    def test_parse_many_reports_progress(self):
+        progress = []
+        list(parse_many(self.TEXTS, chunk_size=3, progress=progress.append))
+        self.assertEqual([3, 6, 8], [stats['items'] for stats in progress])
+
+    def test_parse_many_uses_options(self):
+        result = next(parse_many(['x + 0'], optimize=False, simplify=True))
+        self.assertFalse(result.expression.optimize)
+        self.assertTrue(result.expression.simplify)
+
+    def test_parse_many_with_invalid_arguments(self):
+        for arguments in [{'chunk_size': 0}, {'workers': -1}]:
+            with self.subTest(**arguments):
+                with self.assertRaises(ValueError):
+                    parse_many(['x'], **arguments)
+
+    def test_parse_many_of_nothing(self):
+        results = parse_many([])
+        self.assertEqual([], list(results))
+        self.assertEqual(0, results.stats()['throughput'])
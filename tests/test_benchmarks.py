@@ -0,0 +1,34 @@
+import io
+import unittest
+from contextlib import redirect_stderr
+from expression import Expression
+from benchmarks.generator import generate_expression, generate_corpus, variable_names
+from benchmarks.suite import compare
+
+
+class GeneratorTest(unittest.TestCase):
+    def test_generate_expression_is_deterministic(self):
+        self.assertEqual(generate_expression(8, 2, 3, 0.5, seed=1), generate_expression(8, 2, 3, 0.5, seed=1))
+
+    def test_generated_expressions_use_requested_variables(self):
+        for text in generate_corpus(20, length=16, depth=2, variables=3, function_ratio=0.3):
+            with self.subTest(text):
+                self.assertLessEqual(Expression(text).variables.keys(), set(variable_names(3)))
+
+    def test_variable_names_are_unique(self):
+        self.assertEqual(100, len(set(variable_names(100))))
+
+
+class CompareTest(unittest.TestCase):
+    def test_compare_flags_slowdowns_above_threshold(self):
+        baseline = {'results': {'small': {'parameters': {}, 'tokenize_us': 10.0, 'evaluate_us': 10.0}}}
+        current = {'results': {'small': {'parameters': {}, 'tokenize_us': 10.5, 'evaluate_us': 12.0},
+                               'new': {'evaluate_us': 1.0}}}
+        errors = io.StringIO()
+        with redirect_stderr(errors):
+            regressions = compare(baseline, current, threshold=0.1)
+        self.assertEqual([('small', 'evaluate_us')], [(name, metric) for name, metric, _ in regressions])
+        report = errors.getvalue().splitlines()
+        self.assertEqual(2, len(report))
+        self.assertFalse(report[0].endswith('REGRESSION'))
+        self.assertTrue(report[1].startswith('small') and report[1].endswith('REGRESSION'))
@@ -0,0 +1,100 @@
+import threading
+import unittest
+from cache import ParserCache
+from tokenizer import Registry
+from errors import UnassignedVariable
+from src.errors import UnmatchingOpenParentheses
+
+
+class ParserCacheTest(unittest.TestCase):
+    def test_get_returns_parsed_expression(self):
+        cache = ParserCache()
+        e = cache.get('2x+1')
+        e.assign_value('x', 2)
+        self.assertEqual(5, e.evaluate())
+
+    def test_get_counts_hits_and_misses(self):
+        cache = ParserCache()
+        cache.get('1+1')
+        cache.get('1+1')
+        cache.get('1+2')
+        self.assertEqual({'hits': 1, 'misses': 2, 'evictions': 0, 'size': 2, 'maxsize': 4096}, cache.stats())
+
+    def test_get_returns_instances_with_independent_variables(self):
+        cache = ParserCache()
+        first = cache.get('x')
+        second = cache.get('x')
+        first.assign_value('x', 1)
+        self.assertEqual(1, first.evaluate())
+        with self.assertRaises(UnassignedVariable):
+            second.evaluate()
+
+    def test_get_evicts_least_recently_used_expression(self):
+        cache = ParserCache(maxsize=2)
+        cache.get('1')
+        cache.get('2')
+        cache.get('1')
+        cache.get('3')
+        cache.get('1')
+        self.assertEqual(1, cache.stats()['evictions'])
+        self.assertEqual(2, cache.stats()['hits'])
+        cache.get('2')
+        self.assertEqual(4, cache.stats()['misses'])
+
+    def test_get_does_not_cache_invalid_expression(self):
+        cache = ParserCache()
+        with self.assertRaises(UnmatchingOpenParentheses):
+            cache.get('(1')
+        self.assertEqual(0, cache.stats()['size'])
+
+    def test_get_parses_with_registry(self):
+        cache = ParserCache()
+        registry = Registry()
+        self.assertEqual(3, cache.get('max + 1').evaluate({'max': 2}))
+        registry.register_function('max', max, 2)
+        self.assertEqual(3, cache.get('max(x, 2)', registry=registry).evaluate({'x': 3}))
+        self.assertEqual(3, cache.get('max(x, 2)', registry=registry).evaluate({'x': 3}))
+        self.assertIs(registry, cache.get('max(x, 2)', registry=registry).tokenizer.registry)
+        self.assertEqual(7, cache.get('tau + 1', registry=registry).evaluate({'tau': 6}))
+        # Registering a name parses the texts of the registry again
+        registry.register_constant('tau', 6.)
+        self.assertEqual(7, cache.get('tau + 1', registry=registry).evaluate({}))
+        self.assertEqual(7, cache.get('tau + 1').evaluate({'tau': 6}))
+        self.assertEqual({'hits': 2, 'misses': 5}, {key: cache.stats()[key] for key in ['hits', 'misses']})
+
+    def test_invalid_maxsize(self):
+        for maxsize in [0, -1]:
+            with self.subTest(maxsize=maxsize):
+                with self.assertRaises(ValueError):
+                    ParserCache(maxsize=maxsize)
+
+    def test_clear_resets_entries_and_counters(self):
+        cache = ParserCache()
+        cache.get('1')
+        cache.get('1')
+        cache.clear()
+        self.assertEqual({'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0, 'maxsize': 4096}, cache.stats())
+
+    def test_get_is_thread_safe(self):
+        cache = ParserCache(maxsize=8)
+        texts = [f'x+{i}' for i in range(16)]
+        errors = []
+
+        def worker():
+            try:
+                for text in texts * 20:
+                    e = cache.get(text)
+                    e.assign_value('x', 1)
+                    self.assertEqual(1 + int(text[2:]), e.evaluate())
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        self.assertEqual([], errors)
+        self.assertEqual(4 * 20 * 16, stats['hits'] + stats['misses'])
+        self.assertLessEqual(stats['size'], 8)
@@ -0,0 +1,103 @@
+import math
+import re
+import pickle
+import unittest
+from expression import Expression
+from tokenizer import Registry
+from errors import UnassignedVariable
+from benchmarks.generator import generate_corpus
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def outcome(function, *args):
+    try:
+        return function(*args)
+    except (ArithmeticError, ValueError) as error:
+        return type(error)
+
+
+class GeneratedExpressionTest(unittest.TestCase):
+    EXPRESSIONS = ['1', '-x', 'x+2', 'x-y', 'x/y', 'x^10', 'x!', 'sin(pi/x)', 'cos(radians(x))', 'tan(x/4)',
+                   'sqrt(x)*cbrt(y)', '3 + 4 * x / ( 1 - y ) ^ 2 ^ 3', '((x)+(2))*y', 'degrees(phi)+e',
+                   '-(x - 1.5)! * -y', '2pi * r + sin(x)^2 - x/y']
+
+    def test_generated_matches_evaluate(self):
+        for text in self.EXPRESSIONS + generate_corpus(50, length=16, depth=3, variables=4, function_ratio=0.3):
+            e = Expression(text)
+            generated = e.compile(backend='ast')
+            variables = {name: 3 + index * 1.5 for index, name in enumerate(sorted(e.variables))}
+            with self.subTest(text=text):
+                self.assertEqual(outcome(e.evaluate, variables), outcome(generated.evaluate, variables))
+
+    def test_generated_is_flat(self):
+        generated = Expression('x' + ' + x' * 5000).compile(backend='ast')
+        self.assertEqual(5001, generated.evaluate({'x': 1}))
+        self.assertEqual({'s0'}, set(re.findall(r's[0-9]+', generated.source)))
+
+    def test_generated_raises_same_errors(self):
+        generated = Expression('x / y + sqrt(y)').compile(backend='ast')
+        with self.assertRaises(ZeroDivisionError):
+            generated.evaluate({'x': 1, 'y': 0})
+        with self.assertRaises(ValueError):
+            generated.evaluate({'x': 1, 'y': -1})
+        with self.assertRaises(UnassignedVariable):
+            generated.evaluate({'x': 1})
+
+    def test_generated_accepts_any_variable_name(self):
+        e = Expression('for + in * None')
+        self.assertEqual(7, e.compile(backend='ast').evaluate({'for': 1, 'in': 2, 'None': 3}))
+
+    def test_generated_calls_registered_functions(self):
+        registry = Registry()
+        registry.register_function('clamp', lambda value, lo, hi: min(max(value, lo), hi), 3)
+        registry.register_function('hypot', math.hypot, 2)
+        e = Expression('clamp(x, 0, 1) + 1', registry=registry)
+        self.assertEqual(2, e.compile(backend='ast').evaluate({'x': 5}))
+        e = Expression('hypot(x, clamp(y, 0, hypot(x, 2)))', registry=registry)
+        self.assertEqual(e.evaluate({'x': 3, 'y': 4}), e.compile(backend='ast').evaluate({'x': 3, 'y': 4}))
+
+    def test_generated_expression_can_be_pickled(self):
+        generated = pickle.loads(pickle.dumps(Expression('x^2 + 1').compile(backend='ast')))
+        self.assertEqual(10, generated.evaluate({'x': 3}))
+
+    def test_unknown_backend_raises_error(self):
+        with self.assertRaises(ValueError):
+            Expression('x').compile(backend='llvm')
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class GeneratedKernelTest(unittest.TestCase):
+    def test_kernel_matches_evaluate(self):
+        e = Expression('sin(radians(theta))^2 * r + sqrt(x^2 + y^2) / (1 + x*y) - cbrt(r)')
+        kernel = e.compile_kernel(block_size=7)
+        columns = {'theta': np.arange(100), 'r': np.linspace(1, 5, 100), 'x': 0.5, 'y': np.linspace(-1, 1, 100)}
+        expected = [e.evaluate({name: np.broadcast_to(column, 100)[i] for name, column in columns.items()})
+                    for i in range(100)]
+        np.testing.assert_allclose(expected, kernel.evaluate(**columns), rtol=1e-15)
+        np.testing.assert_array_equal(e.evaluate_batch(**columns), kernel.evaluate(**columns))
+
+    def test_kernel_keeps_broadcast_shape(self):
+        kernel = Expression('x * y').compile_kernel(block_size=4)
+        result = kernel.evaluate(x=np.arange(3).reshape(3, 1), y=np.arange(5))
+        np.testing.assert_array_equal(np.arange(3).reshape(3, 1) * np.arange(5), result)
+        self.assertEqual((), Expression('2 * pi').compile_kernel().evaluate().shape)
+        self.assertEqual((0,), kernel.evaluate(x=[], y=2).shape)
+
+    def test_kernel_returns_nan_and_inf_like_evaluate_batch(self):
+        kernel = Expression('1 / x + sqrt(y)').compile_kernel()
+        result = kernel.evaluate(x=[0, 1], y=[1, -1])
+        self.assertEqual(math.inf, result[0])
+        self.assertTrue(math.isnan(result[1]))
+
+    def test_kernel_raises_unassigned_variable_error(self):
+        with self.assertRaises(UnassignedVariable):
+            Expression('x + y').compile_kernel().evaluate(x=[1])
+
+    def test_kernel_can_be_pickled(self):
+        kernel = pickle.loads(pickle.dumps(Expression('x + 1').compile_kernel(block_size=2)))
+        np.testing.assert_array_equal([2, 3, 4], kernel.evaluate(x=[1, 2, 3]))
+        self.assertEqual(2, kernel.block_size)
@@ -0,0 +1,53 @@
+import unittest
+from expression import Expression
+from errors import UnassignedVariable
+
+
+class CompilerTest(unittest.TestCase):
+    EXPRESSIONS = ['1', '-1', '1+2', '1-2', '1/2', '2^10', '5!', 'sin(pi/2)', 'cos(radians(90))', 'tan(pi/4)',
+                   'sqrt(2)*cbrt(27)', '3 + 4 * 2 / ( 1 - 5 ) ^ 2 ^ 3', '((1)+(2))*3', 'degrees(phi)+e']
+
+    def test_compiled_matches_evaluate(self):
+        for text in self.EXPRESSIONS:
+            with self.subTest(text):
+                e = Expression(text)
+                self.assertEqual(e.evaluate(), e.compile().evaluate({}))
+
+    def test_compiled_matches_evaluate_with_variables(self):
+        e = Expression('2pi * r + sin(x)^2 - x/y')
+        compiled = e.compile()
+        for r, x, y in [(1, 2, 3), (0.5, -1.25, 7), (10, 0, 1e-3)]:
+            e.assign_value('r', r)
+            e.assign_value('x', x)
+            e.assign_value('y', y)
+            self.assertEqual(e.evaluate(), compiled.evaluate({'r': r, 'x': x, 'y': y}))
+
+    def test_compiled_does_not_read_expression_variables(self):
+        e = Expression('x+1')
+        compiled = e.compile()
+        e.assign_value('x', 1)
+        self.assertEqual(11, compiled.evaluate({'x': 10}))
+        self.assertEqual(2, e.evaluate())
+
+    def test_compiled_accepts_zero_as_assigned_value(self):
+        compiled = Expression('x*2').compile()
+        self.assertEqual(0, compiled.evaluate({'x': 0}))
+
+    def test_compiled_raises_unassigned_variable_error(self):
+        compiled = Expression('x+y').compile()
+        with self.assertRaises(UnassignedVariable):
+            compiled.evaluate({'x': 1})
+
+    def test_compiled_raises_unassigned_variable_error_for_none(self):
+        compiled = Expression('x').compile()
+        with self.assertRaises(UnassignedVariable):
+            compiled.evaluate({'x': None})
+
+    def test_compiled_deep_expressions(self):
+        for text in ['x+' * 3000 + '1', '-' * 3001 + 'x', 'sin(-' * 2000 + 'x' + ')' * 2000]:
+            with self.subTest(text=text[:10]):
+                e = Expression(text, optimize=False)
+                variables = {'x': 1}
+                self.assertEqual(e.evaluate(variables), e.compile().evaluate(variables))
+                self.assertEqual(e.evaluate(variables), Expression(text).compile().evaluate(variables))
+        self.assertEqual({'x': 1}, variables)
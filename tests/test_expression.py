@@ -85,6 +85,10 @@ class ParserTest(unittest.TestCase):
         e = Expression('tan(radians(90))')
         self.assertAlmostEqual(math.tan(math.pi/2), e.evaluate(), 15)
 
+    def test_evaluate_function_applies_only_to_its_argument(self):
+        e = Expression('sqrt(4)*3+1')
+        self.assertEqual(7, e.evaluate())
+
     def test_evaluate_factorial_expression(self):
         e = Expression('0!')
         self.assertEqual(1, e.evaluate())
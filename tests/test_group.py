@@ -0,0 +1,43 @@
+import unittest
+from expression import Expression
+from group import ExpressionGroup
+from errors import UnassignedVariable
+
+
+class ExpressionGroupTest(unittest.TestCase):
+    TEXTS = ['sin(radians(theta)) * r', 'sin(radians(theta)) + cos(radians(theta))', '(x^2+y^2) / 2',
+             'sqrt(x^2+y^2)', '2pi * r', '-0 + x', '0 + x', '5!']
+
+    def test_evaluate_all_matches_evaluate(self):
+        expressions = [Expression(text) for text in self.TEXTS]
+        bindings = {'theta': 30, 'r': 2.5, 'x': 3, 'y': -4}
+        expected = []
+        for e in expressions:
+            for name in e.variables:
+                e.assign_value(name, bindings[name])
+            expected.append(e.evaluate())
+        self.assertEqual(expected, ExpressionGroup(expressions).evaluate_all(bindings))
+
+    def test_shared_sub_expressions_are_deduplicated(self):
+        group = ExpressionGroup([Expression('sin(radians(theta)) * r'), Expression('sin(radians(theta)) + r')])
+        # theta, radians, sin and r are shared by the second expression
+        self.assertEqual({'expressions': 2, 'nodes': 10, 'unique_nodes': 6, 'deduplicated_nodes': 4},
+                         group.stats())
+
+    def test_operands_order_is_part_of_the_structure(self):
+        group = ExpressionGroup([Expression('x-y'), Expression('y-x')])
+        self.assertEqual([-1, 1], group.evaluate_all({'x': 1, 'y': 2}))
+        self.assertEqual(4, group.unique_nodes)
+
+    def test_signed_zero_literals_are_not_merged(self):
+        group = ExpressionGroup([Expression('-0'), Expression('0')])
+        self.assertEqual(['-0.0', '0.0'], [str(result) for result in group.evaluate_all({})])
+
+    def test_group_variables_are_the_union_of_all_variables(self):
+        group = ExpressionGroup([Expression('x+1'), Expression('y*z')])
+        self.assertEqual({'x', 'y', 'z'}, group.variables)
+
+    def test_evaluate_all_raises_unassigned_variable_error(self):
+        group = ExpressionGroup([Expression('x+1'), Expression('y')])
+        with self.assertRaises(UnassignedVariable):
+            group.evaluate_all({'x': 1})
@@ -0,0 +1,101 @@
+import math
+import random
+import unittest
+from expression import Expression
+from incremental import IncrementalExpression
+from cache import ParserCache
+from tokenizer import Registry
+from errors import UnassignedVariable
+
+
+class IncrementalExpressionTest(unittest.TestCase):
+    TEXT = 'sin(a) * b + sqrt(c^2 + d^2) / (e1 + 2) - f*g + h^2 - cos(radians(i)) * j + 2pi'
+
+    def test_evaluate_matches_full_evaluation_after_random_assignments(self):
+        rnd = random.Random(42)
+        incremental = IncrementalExpression(self.TEXT)
+        full = Expression(self.TEXT)
+        names = sorted(full.variables)
+        for name in names:
+            value = rnd.uniform(1, 10)
+            incremental.assign_value(name, value)
+            full.assign_value(name, value)
+        for _ in range(500):
+            for name in rnd.sample(names, rnd.randint(1, 3)):
+                value = rnd.choice([rnd.uniform(-10, 10), rnd.randint(1, 5)])
+                incremental.assign_value(name, value)
+                full.assign_value(name, value)
+            self.assertEqual(full.evaluate(), incremental.evaluate())
+
+    def _recording_registry(self):
+        calls = []
+
+        def record(value):
+            calls.append(value)
+            return value
+
+        registry = Registry()
+        registry.register_function('record', record)
+        return registry, calls
+
+    def test_evaluate_recomputes_only_dependent_operations(self):
+        registry, calls = self._recording_registry()
+        e = IncrementalExpression('record(x) + y*2', registry=registry)
+        e.assign_value('x', 1)
+        e.assign_value('y', 2)
+        self.assertEqual(5, e.evaluate())
+        e.assign_value('y', 3)
+        self.assertEqual(7, e.evaluate())
+        self.assertEqual([1], calls)
+        e.assign_value('x', 2)
+        self.assertEqual(8, e.evaluate())
+        self.assertEqual([1, 2], calls)
+
+    def test_assigning_the_same_value_does_not_invalidate(self):
+        registry, calls = self._recording_registry()
+        e = IncrementalExpression('1/record(x)', registry=registry)
+        e.assign_value('x', 1)
+        e.evaluate()
+        e.assign_value('x', 1)
+        e.evaluate()
+        self.assertEqual([1], calls)
+        e.assign_value('x', 1.0)
+        e.evaluate()
+        self.assertEqual(2, len(calls))
+        self.assertIs(float, type(calls[-1]))
+
+    def test_assigning_zero_of_the_other_sign_invalidates(self):
+        registry, calls = self._recording_registry()
+        e = IncrementalExpression('record(x)', registry=registry)
+        e.assign_value('x', 0.0)
+        self.assertEqual(1.0, math.copysign(1.0, e.evaluate()))
+        e.assign_value('x', -0.0)
+        self.assertEqual(-1.0, math.copysign(1.0, e.evaluate()))
+        e.assign_value('x', -0.0)
+        e.evaluate()
+        self.assertEqual(2, len(calls))
+
+    def test_evaluate_raises_unassigned_variable_error_after_reset(self):
+        e = IncrementalExpression('x*2')
+        e.assign_value('x', 4)
+        self.assertEqual(8, e.evaluate())
+        e.reset_variables()
+        with self.assertRaises(UnassignedVariable):
+            e.evaluate()
+        e.assign_value('x', 5)
+        self.assertEqual(10, e.evaluate())
+
+    def test_evaluate_recovers_after_error(self):
+        e = IncrementalExpression('1/x + y')
+        e.assign_value('x', 0)
+        e.assign_value('y', 1)
+        with self.assertRaises(ZeroDivisionError):
+            e.evaluate()
+        e.assign_value('x', 2)
+        self.assertEqual(1.5, e.evaluate())
+
+    def test_incremental_expression_from_parse_cache(self):
+        e = ParserCache().get('x^2')
+        incremental = IncrementalExpression.from_parsed(e.tokens, e.variables, e.rpn)
+        incremental.assign_value('x', 3)
+        self.assertEqual(9, incremental.evaluate())
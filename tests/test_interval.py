@@ -0,0 +1,155 @@
+import math
+import random
+import unittest
+from expression import Expression
+from errors import UnassignedVariable
+from interval import Interval
+
+
+def sample(ranges, count, seed=0):
+    generator = random.Random(seed)
+    for _ in range(count):
+        yield {name: generator.uniform(lo, hi) for name, (lo, hi) in ranges.items()}
+    # The corners are where most bounds are reached
+    yield {name: lo for name, (lo, hi) in ranges.items()}
+    yield {name: hi for name, (lo, hi) in ranges.items()}
+
+
+class EvaluateIntervalTest(unittest.TestCase):
+    CASES = {'x + y': {'x': (-1, 2), 'y': (3, 4)},
+             'x - y': {'x': (-1, 2), 'y': (3, 4)},
+             'x * y': {'x': (-1, 2), 'y': (-3, 4)},
+             'x / y': {'x': (-1, 2), 'y': (0.5, 4)},
+             'x ^ 2': {'x': (-3, 2)},
+             'x ^ 3': {'x': (-3, 2)},
+             'x ^ -2': {'x': (1, 2)},
+             'x ^ y': {'x': (0.5, 2), 'y': (-1.5, 2.5)},
+             '-x * y': {'x': (-1, 2), 'y': (3, 4)},
+             'sqrt(x) + cbrt(y)': {'x': (0, 4), 'y': (1, 8)},
+             'sin(x) * cos(y)': {'x': (0, 2), 'y': (-1, 4)},
+             'tan(x)': {'x': (-1.5, 1.5)},
+             'radians(x) + degrees(y)': {'x': (0, 90), 'y': (-1, 1)},
+             'sin(radians(x))^2 + x/y^3 - sqrt(x*y)': {'x': (10, 30), 'y': (1, 2)}}
+
+    def test_evaluate_interval_encloses_every_sample(self):
+        for text, ranges in self.CASES.items():
+            with self.subTest(text=text):
+                e = Expression(text)
+                result = e.evaluate_interval(ranges)
+                for variables in sample(ranges, 200):
+                    self.assertIn(e.evaluate(variables), result)
+
+    def test_evaluate_interval_is_tight_for_monotone_expressions(self):
+        result = Expression('2 * x + 1').evaluate_interval({'x': (1, 3)})
+        self.assertAlmostEqual(3, result.lo)
+        self.assertAlmostEqual(7, result.hi)
+        self.assertLess(result.lo, 3)
+        self.assertGreater(result.hi, 7)
+
+    def test_evaluate_interval_of_constant(self):
+        result = Expression('2 * pi').evaluate_interval({})
+        self.assertIn(2 * math.pi, result)
+        self.assertLess(result.hi - result.lo, 1e-15)
+
+    def test_interval_compares_unequal_to_other_types(self):
+        self.assertNotEqual(Interval(1., 1.), 1.)
+        self.assertNotEqual(Interval(1., 2.), (1., 2.))
+        self.assertNotEqual(Interval(1., 2.), None)
+        self.assertIn(Interval(1., 2.), [None, Interval(1., 2.)])
+
+    def test_evaluate_interval_accepts_values_and_intervals(self):
+        result = Expression('x + y').evaluate_interval({'x': 1, 'y': Interval(2., 3.)})
+        self.assertAlmostEqual(3, result.lo)
+        self.assertAlmostEqual(4, result.hi)
+
+    def test_evaluate_interval_uses_assigned_values(self):
+        e = Expression('x * 2')
+        e.assign_value('x', (1, 2))
+        self.assertIn(3, e.evaluate_interval())
+
+    def test_evaluate_interval_with_unassigned_variables(self):
+        with self.assertRaises(UnassignedVariable):
+            Expression('x + y').evaluate_interval({'x': (1, 2)})
+
+    def test_evaluate_interval_with_invalid_range(self):
+        with self.assertRaises(ValueError):
+            Expression('x + 1').evaluate_interval({'x': (2, 1)})
+
+    def test_evaluate_interval_of_sin_and_cos_reaches_extrema(self):
+        self.assertEqual(Interval(-1., 1.), Expression('sin(x)').evaluate_interval({'x': (0, 7)}))
+        self.assertEqual(1., Expression('sin(x)').evaluate_interval({'x': (1, 2)}).hi)
+        self.assertEqual(-1., Expression('cos(x)').evaluate_interval({'x': (3, 4)}).lo)
+        result = Expression('cos(x)').evaluate_interval({'x': (0.5, 1)})
+        self.assertAlmostEqual(math.cos(1), result.lo)
+        self.assertAlmostEqual(math.cos(0.5), result.hi)
+
+    def test_evaluate_interval_of_tan_across_pole(self):
+        result = Expression('tan(x)').evaluate_interval({'x': (1, 2)})
+        self.assertEqual(Interval(-math.inf, math.inf), result)
+
+    def test_evaluate_interval_of_division_crossing_zero(self):
+        self.assertEqual(Interval(-math.inf, math.inf), Expression('1 / x').evaluate_interval({'x': (-1, 1)}))
+        result = Expression('1 / x').evaluate_interval({'x': (0, 2)})
+        self.assertAlmostEqual(0.5, result.lo)
+        self.assertEqual(math.inf, result.hi)
+        result = Expression('1 / x').evaluate_interval({'x': (-2, 0)})
+        self.assertEqual(-math.inf, result.lo)
+        self.assertAlmostEqual(-0.5, result.hi)
+
+    def test_evaluate_interval_of_division_by_zero(self):
+        with self.assertRaises(ZeroDivisionError):
+            Expression('1 / x').evaluate_interval({'x': (0, 0)})
+
+    def test_evaluate_interval_of_even_power_across_zero(self):
+        result = Expression('x ^ 2').evaluate_interval({'x': (-3, 2)})
+        self.assertEqual(0, result.lo)
+        self.assertAlmostEqual(9, result.hi)
+
+    def test_evaluate_interval_of_power_with_negative_base(self):
+        with self.assertRaises(ValueError):
+            Expression('x ^ 0.5').evaluate_interval({'x': (-1, 1)})
+
+    def test_evaluate_interval_of_sqrt_of_negative(self):
+        with self.assertRaises(ValueError):
+            Expression('sqrt(x)').evaluate_interval({'x': (-1, 1)})
+
+    def test_evaluate_interval_of_cbrt_of_negative(self):
+        result = Expression('cbrt(x)').evaluate_interval({'x': (-8, 27)})
+        self.assertLessEqual(result.lo, -2)
+        self.assertGreater(result.lo, -2.001)
+        self.assertGreaterEqual(result.hi, 3)
+
+    def test_evaluate_interval_of_sqrt_of_exact_zero(self):
+        for text in ['sqrt(x - 1)', 'cbrt(x - 1)']:
+            with self.subTest(text=text):
+                result = Expression(text).evaluate_interval({'x': (1, 2)})
+                self.assertEqual(0, result.lo)
+                self.assertLessEqual(1, result.hi)
+        self.assertEqual(0, Expression('sqrt(x - y)').evaluate_interval({'x': 1, 'y': 1}).lo)
+        self.assertLess(Expression('x + 0.1').evaluate_interval({'x': 0.2}).lo, 0.2 + 0.1)
+
+    def test_evaluate_interval_of_sqrt_of_products_and_functions_at_zero(self):
+        for text in ['sqrt(x*y)', 'sqrt(x*x)', 'sqrt(x^2)', 'sqrt(x/2)', 'sqrt(radians(x))', 'sqrt(sin(x))']:
+            with self.subTest(text=text):
+                result = Expression(text).evaluate_interval({'x': (0, 1), 'y': (0, 1)})
+                self.assertEqual(0, result.lo)
+                self.assertLess(0, result.hi)
+        self.assertGreater(0, Expression('x * y').evaluate_interval({'x': (-1e-200, 1), 'y': 1e-200}).lo)
+
+    def test_evaluate_interval_of_overflowing_odd_power(self):
+        self.assertEqual(-math.inf, Expression('x ^ 3').evaluate_interval({'x': (-1e200, 1)}).lo)
+        result = Expression('x ^ 401').evaluate_interval({'x': (-10, 1)})
+        self.assertEqual(-math.inf, result.lo)
+        self.assertLessEqual(1, result.hi)
+        self.assertEqual(Interval(0, math.inf), Expression('x ^ 400').evaluate_interval({'x': (-10, 1)}))
+
+    def test_evaluate_interval_of_factorial(self):
+        self.assertEqual(Interval(2., 120.), Expression('x!').evaluate_interval({'x': (1.5, 5.5)}))
+        self.assertEqual(Interval(1., 6.), Expression('x!').evaluate_interval({'x': (-2, 3)}))
+        with self.assertRaises(ValueError):
+            Expression('x!').evaluate_interval({'x': (1.2, 1.8)})
+
+    def test_evaluate_interval_of_factorial_of_unbounded_range(self):
+        self.assertEqual(Interval(1., math.inf), Expression('(1 / x)!').evaluate_interval({'x': (0, 1)}))
+        with self.assertRaises(ValueError):
+            Expression('(1 / x)!').evaluate_interval({'x': (-1, 0)})
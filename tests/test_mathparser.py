@@ -0,0 +1,137 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from unittest import mock
+from mathparser import main
+
+
+class MathParserCommandTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def _run(self, *argv, stdin=''):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch('sys.stdin', io.StringIO(stdin)), redirect_stdout(stdout), redirect_stderr(stderr):
+            code = main(list(argv))
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_eval_csv_file(self):
+        path = self._write('rows.csv', 'x,y\n1,2\n3,4\n')
+        code, output, errors = self._run('eval', 'x*y', '--input', path)
+        self.assertEqual(0, code)
+        self.assertEqual('2.0\n12.0\n', output)
+        self.assertIn('2 rows in', errors)
+
+    def test_eval_jsonl_file(self):
+        path = self._write('rows.jsonl', '{"x": 1, "y": 2}\n\n{"x": 3, "y": 4}\n')
+        code, output, _ = self._run('eval', 'x+y', '-i', path)
+        self.assertEqual(0, code)
+        self.assertEqual('3\n7\n', output)
+
+    def test_eval_stdin_with_format(self):
+        code, output, _ = self._run('eval', '2x', '--format', 'jsonl', stdin='{"x": 1.5}\n')
+        self.assertEqual(0, code)
+        self.assertEqual('3.0\n', output)
+
+    def test_eval_maps_variables_to_columns(self):
+        code, output, _ = self._run('eval', 'x^2', '--map', 'x=value', stdin='value\n3\n')
+        self.assertEqual(0, code)
+        self.assertEqual('9.0\n', output)
+
+    def test_eval_writes_output_file_in_chunks(self):
+        rows = ''.join(f'{i}\n' for i in range(25))
+        output_path = os.path.join(self.directory, 'out.txt')
+        code, output, _ = self._run('eval', 'x+1', '-o', output_path, '--chunk-size', '4', stdin='x\n' + rows)
+        self.assertEqual(0, code)
+        self.assertEqual('', output)
+        with open(output_path, encoding='utf-8') as file:
+            self.assertEqual([str(float(i + 1)) for i in range(25)], file.read().split())
+
+    def test_eval_in_parallel(self):
+        rows = ''.join(f'{i}\n' for i in range(100))
+        code, output, _ = self._run('eval', 'x*2', '-w', '2', '-b', 'thread', '-c', '7', stdin='x\n' + rows)
+        self.assertEqual(0, code)
+        self.assertEqual([str(float(i * 2)) for i in range(100)], output.split())
+
+    def test_eval_invalid_expression(self):
+        code, _, errors = self._run('eval', '(x', stdin='x\n1\n')
+        self.assertEqual(2, code)
+        self.assertIn('UnmatchingOpenParentheses', errors)
+        code, _, errors = self._run('eval', 'x +', stdin='x\n1\n')
+        self.assertEqual(2, code)
+        self.assertIn('UnexpectedToken', errors)
+
+    def test_eval_empty_expression(self):
+        for expression in ['', '   ']:
+            with self.subTest(expression=expression):
+                code, _, errors = self._run('eval', expression, stdin='x\n1\n')
+                self.assertEqual(2, code)
+                self.assertIn('UnexpectedToken', errors)
+
+    def test_eval_missing_column(self):
+        code, _, errors = self._run('eval', 'x+y', stdin='x\n1\n')
+        self.assertEqual(1, code)
+        self.assertIn("['y']", errors)
+
+    def test_eval_arithmetic_error(self):
+        code, output, errors = self._run('eval', '1/x', '-f', 'csv', stdin='x\n0\n')
+        self.assertEqual(1, code)
+        self.assertEqual('', output)
+        self.assertEqual('mathparser: evaluation failed: ZeroDivisionError float division by zero\n', errors)
+
+    def test_eval_jsonl_line_that_is_not_an_object(self):
+        for line in ['[1, 2]', '3']:
+            with self.subTest(line=line):
+                code, _, errors = self._run('eval', 'x', '-f', 'jsonl', stdin='{"x": 1}\n' + line + '\n')
+                self.assertEqual(1, code)
+                self.assertEqual('mathparser: line 2 is not a JSON object\n', errors)
+
+    def test_eval_invalid_chunk_size(self):
+        for size in ['0', '-1', 'x']:
+            with self.subTest(size=size), self.assertRaises(SystemExit):
+                self._run('eval', 'x', '-c', size, stdin='x\n1\n')
+
+    def test_eval_invalid_workers(self):
+        for workers in ['0', '-2', 'x']:
+            with self.subTest(workers=workers), self.assertRaises(SystemExit):
+                self._run('eval', 'x', '-w', workers, stdin='x\n1\n')
+
+    def test_eval_closes_input_when_output_cannot_be_opened(self):
+        input_path = os.path.join(self.directory, 'rows.csv')
+        output_path = os.path.join(self.directory, 'missing', 'out.txt')
+        files = []
+
+        def fake_open(path, *_, **__):
+            if path != input_path:
+                raise FileNotFoundError(2, 'No such file or directory', path)
+            files.append(io.StringIO('x\n1\n'))
+            return files[-1]
+
+        with mock.patch('mathparser.open', fake_open, create=True):
+            code, _, errors = self._run('eval', 'x', '-i', input_path, '-o', output_path)
+        self.assertEqual(1, code)
+        self.assertIn('No such file or directory', errors)
+        self.assertEqual(1, len(files))
+        self.assertTrue(files[0].closed)
+
+    def test_eval_invalid_mapping(self):
+        code, _, errors = self._run('eval', 'x', '--map', 'z=value', stdin='x\n1\n')
+        self.assertEqual(1, code)
+        self.assertIn('z=value', errors)
+
+    def test_serve_options(self):
+        with mock.patch('mathparser.serve', new_callable=mock.AsyncMock) as serve:
+            code, _, errors = self._run('serve', '--port', '9000', '--batch-delay', '2', '--max-pending', '8')
+        self.assertEqual(0, code)
+        self.assertIn('127.0.0.1:9000', errors)
+        serve.assert_awaited_once_with('127.0.0.1', 9000, None, batch_size=256, batch_delay=0.002, max_pending=8)
@@ -0,0 +1,139 @@
+import math
+import threading
+import unittest
+from unittest import mock
+from expression import Expression
+from errors import UnassignedVariable
+from memo import ResultMemo
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+class ResultMemoTest(unittest.TestCase):
+    def test_get_counts_hits_and_misses(self):
+        memo = ResultMemo()
+        self.assertIsNone(memo.get('a'))
+        memo.put('a', 1)
+        self.assertEqual(1, memo.get('a'))
+        stats = memo.stats()
+        self.assertEqual((1, 1, 0.5, 1), (stats['hits'], stats['misses'], stats['hit_rate'], stats['size']))
+
+    def test_put_evicts_least_recently_used_result(self):
+        memo = ResultMemo(maxsize=2)
+        memo.put('a', 1)
+        memo.put('b', 2)
+        memo.get('a')
+        memo.put('c', 3)
+        self.assertIsNone(memo.get('b'))
+        self.assertEqual(1, memo.get('a'))
+        self.assertEqual(1, memo.stats()['evictions'])
+
+    def test_get_expires_results_after_ttl(self):
+        clock = Clock()
+        memo = ResultMemo(ttl=10, clock=clock)
+        memo.put('a', 1)
+        clock.now = 9.9
+        self.assertEqual(1, memo.get('a'))
+        clock.now = 10
+        self.assertIsNone(memo.get('a'))
+        self.assertEqual((1, 0), (memo.stats()['expirations'], memo.stats()['size']))
+
+    def test_clear_resets_results_and_counters(self):
+        memo = ResultMemo()
+        memo.put('a', 1)
+        memo.get('a')
+        memo.clear()
+        self.assertEqual({'hits': 0, 'misses': 0, 'hit_rate': 0., 'evictions': 0, 'expirations': 0, 'size': 0,
+                          'maxsize': 256, 'ttl': None}, memo.stats())
+
+    def test_invalid_size_raises_error(self):
+        with self.assertRaises(ValueError):
+            ResultMemo(maxsize=0)
+
+
+class MemoizedEvaluationTest(unittest.TestCase):
+    def test_evaluate_is_not_memoized_by_default(self):
+        self.assertIsNone(Expression('x + 1').memo)
+
+    def test_evaluate_reuses_results_of_same_bindings(self):
+        e = Expression('x * y + 1').memoize()
+        with mock.patch.object(e, '_evaluate', wraps=e._evaluate) as evaluate:
+            self.assertEqual(7, e.evaluate({'x': 2, 'y': 3}))
+            self.assertEqual(7, e.evaluate({'x': 2, 'y': 3, 'z': 5}))
+            self.assertEqual(9, e.evaluate({'x': 2, 'y': 4}))
+        self.assertEqual(2, evaluate.call_count)
+        self.assertEqual((1, 2), (e.memo.stats()['hits'], e.memo.stats()['misses']))
+
+    def test_assign_value_and_reset_variables_do_not_return_stale_results(self):
+        e = Expression('x + 1').memoize()
+        e.assign_value('x', 1)
+        self.assertEqual(2, e.evaluate())
+        e.assign_value('x', 5)
+        self.assertEqual(6, e.evaluate())
+        e.assign_value('x', 1)
+        self.assertEqual(2, e.evaluate())
+        e.reset_variables()
+        with self.assertRaises(UnassignedVariable):
+            e.evaluate()
+        self.assertEqual(1, e.memo.stats()['hits'])
+
+    def test_evaluate_distinguishes_equal_values_of_different_types(self):
+        e = Expression('x * x').memoize()
+        self.assertIs(int, type(e.evaluate({'x': 1})))
+        self.assertIs(float, type(e.evaluate({'x': 1.})))
+
+    def test_evaluate_distinguishes_zeros_of_different_signs(self):
+        e = Expression('x * 2').memoize()
+        self.assertEqual(1., math.copysign(1., e.evaluate({'x': 0.})))
+        self.assertEqual(-1., math.copysign(1., e.evaluate({'x': -0.})))
+        self.assertEqual(0, e.memo.stats()['hits'])
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_evaluate_distinguishes_numpy_zeros_of_different_signs(self):
+        e = Expression('x * 2').memoize()
+        self.assertEqual(1., math.copysign(1., e.evaluate({'x': np.float64(0.)})))
+        self.assertEqual(-1., math.copysign(1., e.evaluate({'x': np.float64(-0.)})))
+        self.assertEqual(0, e.memo.stats()['hits'])
+
+    def test_memo_is_shared_between_threads(self):
+        memo = ResultMemo(maxsize=64)
+        barrier = threading.Barrier(4)
+
+        def run(offset):
+            barrier.wait()
+            for i in range(2000):
+                key = (offset + i) % 128
+                if memo.get(key) is None:
+                    memo.put(key, key)
+
+        threads = [threading.Thread(target=run, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = memo.stats()
+        self.assertEqual(8000, stats['hits'] + stats['misses'])
+        self.assertLessEqual(stats['size'], 64)
+
+    def test_evaluate_with_unhashable_values_is_not_memoized(self):
+        e = Expression('x * y').memoize()
+        self.assertEqual([1, 1], e.evaluate({'x': [1], 'y': 2}))
+        self.assertEqual(0, e.memo.stats()['size'])
+
+    def test_memoize_options(self):
+        e = Expression('x').memoize(maxsize=1, ttl=60)
+        e.evaluate({'x': 1})
+        e.evaluate({'x': 2})
+        self.assertEqual({'maxsize': 1, 'ttl': 60, 'evictions': 1},
+                         {key: e.memo.stats()[key] for key in ['maxsize', 'ttl', 'evictions']})
@@ -0,0 +1,100 @@
+import threading
+import unittest
+from expression import Expression
+from cache import ParserCache
+from metrics import Metrics
+
+
+class MetricsTest(unittest.TestCase):
+    def test_parse_records_stages_and_token_counts(self):
+        metrics = Metrics()
+        Expression('2pi * r', metrics=metrics)
+        self.assertEqual({'tokenize': 1, 'rpn': 1}, dict(metrics.stage_calls))
+        self.assertEqual(1, metrics.counts['expressions'])
+        self.assertEqual(5, metrics.counts['tokens'])
+        self.assertEqual(5, metrics.counts['rpn_tokens'])
+
+    def test_evaluate_records_calls_and_stack_depth(self):
+        metrics = Metrics()
+        e = Expression('sin(x) + x * (x - 1)', metrics=metrics)
+        e.assign_value('x', 2)
+        result = e.evaluate()
+        e.evaluate({'x': 3})
+        self.assertEqual(Expression('sin(2) + 2 * (2 - 1)').evaluate(), result)
+        self.assertEqual(2, metrics.counts['evaluations'])
+        self.assertEqual({'sin': 2, '+': 2, '*': 2, '-': 2}, dict(metrics.calls))
+        self.assertEqual(4, metrics.max_stack_depth)
+        self.assertEqual(2, metrics.stage_calls['evaluate'])
+
+    def test_failed_evaluation_is_not_recorded(self):
+        metrics = Metrics()
+        e = Expression('1/x', metrics=metrics)
+        with self.assertRaises(ZeroDivisionError):
+            e.evaluate({'x': 0})
+        self.assertEqual(0, metrics.counts['evaluations'])
+        self.assertEqual({}, dict(metrics.calls))
+
+    def test_metrics_are_shared_between_threads(self):
+        metrics = Metrics()
+        e = Expression('x * 2 + 1', metrics=metrics)
+        threads = [threading.Thread(target=lambda: [e.evaluate({'x': i}) for i in range(1000)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(4000, metrics.counts['evaluations'])
+        self.assertEqual({'*': 4000, '+': 4000}, dict(metrics.calls))
+        self.assertEqual(4000, metrics.stage_calls['evaluate'])
+
+    def test_compile_records_stage(self):
+        metrics = Metrics()
+        Expression('x+1', metrics=metrics).compile()
+        self.assertEqual(1, metrics.stage_calls['compile'])
+
+    def test_callback_receives_every_stage(self):
+        stages = []
+        metrics = Metrics(callback=lambda stage, elapsed: stages.append(stage))
+        Expression('1+1', metrics=metrics).evaluate()
+        self.assertEqual(['tokenize', 'rpn', 'evaluate'], stages)
+
+    def test_parser_cache_records_hits_and_misses(self):
+        metrics = Metrics()
+        cache = ParserCache()
+        cache.get('x+1', metrics)
+        e = cache.get('x+1', metrics)
+        self.assertEqual((1, 1), (metrics.counts['parse_cache_hits'], metrics.counts['parse_cache_misses']))
+        self.assertEqual((0, 0), (metrics.counts['memo_hits'], metrics.counts['memo_misses']))
+        self.assertIs(metrics, e.metrics)
+
+    def test_memoized_evaluation_records_hits_and_misses(self):
+        metrics = Metrics()
+        e = Expression('x + 1', metrics=metrics).memoize()
+        for x in [1, 1, 2, 1]:
+            e.evaluate({'x': x})
+        self.assertEqual((2, 2), (metrics.counts['memo_hits'], metrics.counts['memo_misses']))
+        self.assertEqual((0, 0), (metrics.counts['parse_cache_hits'], metrics.counts['parse_cache_misses']))
+        self.assertEqual(2, metrics.counts['evaluations'])
+        self.assertEqual({'+': 2}, dict(metrics.calls))
+
+    def test_parse_cache_and_memo_are_counted_apart(self):
+        metrics = Metrics()
+        cache = ParserCache()
+        for _ in range(2):
+            cache.get('x * 2', metrics).memoize().evaluate({'x': 1})
+        counters = metrics.as_dict()
+        self.assertEqual({'parse_cache_hits': 1, 'parse_cache_misses': 1, 'memo_hits': 0, 'memo_misses': 2},
+                         {key: counters[key] for key in ['parse_cache_hits', 'parse_cache_misses',
+                                                         'memo_hits', 'memo_misses']})
+
+    def test_as_dict_and_reset(self):
+        metrics = Metrics()
+        Expression('1+1', metrics=metrics).evaluate()
+        self.assertEqual({'+': 1}, metrics.as_dict()['calls'])
+        metrics.reset()
+        self.assertEqual(0, metrics.as_dict()['evaluations'])
+        self.assertEqual({}, metrics.as_dict()['stage_times'])
+
+    def test_expression_without_metrics_records_nothing(self):
+        e = Expression('1+1')
+        self.assertIsNone(e.metrics)
+        self.assertEqual(2, e.evaluate())
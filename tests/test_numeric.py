@@ -0,0 +1,135 @@
+import decimal
+import math
+import pickle
+import unittest
+from fractions import Fraction
+from expression import Expression
+from tokenizer import Registry
+from numeric import numeric_mode, MODES
+
+BACKENDS = ['closure', 'ast']
+
+
+class NumericModeTest(unittest.TestCase):
+    def compile(self, text, numeric, registry=None, **options):
+        e = Expression(text, registry=registry)
+        return [e.compile(backend, numeric, **options) for backend in BACKENDS]
+
+    def assertEvaluates(self, expected, text, numeric, variables=None, **options):
+        for compiled in self.compile(text, numeric, **options):
+            with self.subTest(text=text, numeric=numeric, backend=compiled.__class__.__name__):
+                result = compiled.evaluate(variables or {})
+                self.assertEqual(expected, result)
+                self.assertIs(type(expected), type(result))
+
+    def test_float_mode_is_the_default(self):
+        e = Expression('0.1 + x')
+        for backend in BACKENDS:
+            self.assertEqual(e.evaluate({'x': 0.2}), e.compile(backend, 'float').evaluate({'x': 0.2}))
+            self.assertIsNone(e.compile(backend).__dict__.get('numeric'))
+
+    def test_fraction_mode_is_exact(self):
+        self.assertEvaluates(Fraction(3, 10), '0.1 + 0.2', 'fraction')
+        self.assertEvaluates(Fraction(1, 3), 'x / 3 * (1 - .5) * 2', 'fraction', {'x': 1})
+        self.assertEvaluates(Fraction(1, 1024), '2 ^ -x + 3! - 6', 'fraction', {'x': 10})
+        self.assertEvaluates(Fraction(5, 2), 'sqrt(25 / 4) + sqrt(x^2) - x', 'fraction', {'x': 0.5})
+        self.assertEvaluates(Fraction(1, 3), 'x', 'fraction', {'x': Fraction(1, 3)})
+
+    def test_fraction_mode_reads_floats_as_written(self):
+        self.assertEvaluates(Fraction(1, 10), 'x', 'fraction', {'x': 0.1})
+        self.assertEvaluates(Fraction(3, 10), 'x + 0.2', 'fraction', {'x': 0.1})
+
+    def test_fraction_mode_computes_other_functions_as_floats(self):
+        self.assertEvaluates(Fraction(math.sin(1)), 'sin(x)', 'fraction', {'x': 1})
+        self.assertEvaluates(Fraction(math.sqrt(2)), '2 ^ 0.5', 'fraction')
+        with self.assertRaises(ValueError):
+            self.compile('x!', 'fraction')[0].evaluate({'x': 0.5})
+        with self.assertRaises(ZeroDivisionError):
+            self.compile('1 / x', 'fraction')[1].evaluate({'x': 0})
+
+    def test_decimal_mode_rounds_to_context(self):
+        self.assertEvaluates(decimal.Decimal('0.3'), '0.1 + 0.2', 'decimal')
+        self.assertEvaluates(decimal.Decimal('0.33333'), '1 / x', 'decimal', {'x': 3},
+                             context=decimal.Context(prec=5))
+        self.assertEvaluates(decimal.Decimal('1.10'), 'x * 1.10', 'decimal', {'x': 1})
+
+    def test_decimal_mode_reaches_context_precision(self):
+        context = decimal.Context(prec=50)
+        pi = decimal.Decimal('3.1415926535897932384626433832795028841971693993751')
+        self.assertEvaluates(pi, 'pi', 'decimal', context=context)
+        self.assertEvaluates(decimal.Decimal(1), 'sin(x)^2 + cos(x)^2', 'decimal', {'x': 100}, context=context)
+        self.assertEvaluates(decimal.Decimal('0.5'), 'sin(radians(30))', 'decimal', context=decimal.Context(prec=20))
+        self.assertEvaluates(decimal.Decimal(5), 'sqrt(x^2 + 4^2)', 'decimal', {'x': 3})
+        self.assertEvaluates(decimal.Decimal('1.6180339887'), 'phi', 'decimal', context=decimal.Context(prec=11))
+
+    def test_decimal_mode_reduces_large_arguments(self):
+        self.assertEvaluates(decimal.Decimal('-0.6452512852657808442058117113'), 'sin(x)', 'decimal',
+                             {'x': decimal.Decimal('1e20')}, context=decimal.Context(prec=28))
+        # 1e22 is exactly a float, whose sine is correctly rounded by the math library
+        for text, function in [('sin(x)', math.sin), ('cos(x)', math.cos)]:
+            for compiled in self.compile(text, 'decimal', context=decimal.Context(prec=40)):
+                self.assertEqual(function(1e22), float(compiled.evaluate({'x': 1e22})))
+        large = decimal.Decimal('1e40')
+        for prec in [28, 60]:
+            context = decimal.Context(prec=prec)
+            expected = context.plus(self.compile('sin(x)', 'decimal', context=decimal.Context(prec=100))[0]
+                                    .evaluate({'x': large}))
+            self.assertEvaluates(expected, 'sin(x)', 'decimal', {'x': large}, context=context)
+
+    def test_decimal_mode_cube_roots(self):
+        self.assertEvaluates(decimal.Decimal(-2), 'cbrt(x)', 'decimal', {'x': -8})
+        self.assertEvaluates(decimal.Decimal(3), 'cbrt(x)', 'decimal', {'x': 27},
+                             context=decimal.Context(prec=10, rounding=decimal.ROUND_DOWN))
+        self.assertEvaluates(decimal.Decimal('-0.001'), 'cbrt(x)', 'decimal', {'x': decimal.Decimal('-1e-9')})
+        self.assertEvaluates(decimal.Decimal('1.259921049894873164767210607'), 'cbrt(2)', 'decimal')
+
+    def test_cube_roots_of_negative_values_are_real_in_every_mode(self):
+        expected = {'float': -2., 'fraction': Fraction(-2), 'decimal': decimal.Decimal(-2), 'integer': -2.}
+        for numeric in MODES:
+            self.assertEvaluates(expected[numeric], 'cbrt(x)', numeric, {'x': -8})
+
+    def test_decimal_mode_reads_floats_as_written(self):
+        self.assertEvaluates(decimal.Decimal('0.3'), 'x + 0.2', 'decimal', {'x': 0.1})
+        self.assertEvaluates(decimal.Decimal('0.3'), 'x + y', 'decimal', {'x': 0.1, 'y': decimal.Decimal('0.2')})
+
+    def test_decimal_mode_errors(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.compile('1 / x', 'decimal')[0].evaluate({'x': 0})
+        with self.assertRaises(ArithmeticError):
+            self.compile('sqrt(x)', 'decimal')[1].evaluate({'x': -1})
+
+    def test_integer_mode_keeps_integers(self):
+        self.assertEvaluates(1048, '8 / 2 * 2 + 2 ^ x + sqrt(16) + sqrt(3^2 + 4^2) + 3! - -1', 'integer', {'x': 10})
+        self.assertEvaluates(3.5, 'x / 2', 'integer', {'x': 7})
+        self.assertEvaluates(2.5, '2.5 * x', 'integer', {'x': 1})
+        self.assertEvaluates(math.sqrt(2), 'sqrt(2)', 'integer')
+        self.assertEvaluates(2 * math.pi, '2 * pi', 'integer')
+
+    def test_registered_functions_get_values_of_the_mode(self):
+        registry = Registry()
+        registry.register_function('half', lambda value: value / 2)
+        registry.register_constant('tau', 2 * math.pi)
+        self.assertEvaluates(Fraction(1, 6), 'half(x)', 'fraction', {'x': Fraction(1, 3)}, registry=registry)
+        self.assertEvaluates(Fraction(repr(2 * math.pi)), 'tau', 'fraction', registry=registry)
+
+    def test_compiled_modes_can_be_pickled(self):
+        for compiled in self.compile('x / 3', 'decimal', context=decimal.Context(prec=5)):
+            self.assertEqual(decimal.Decimal('0.33333'), pickle.loads(pickle.dumps(compiled)).evaluate({'x': 1}))
+        texts = ['sqrt(x) + cbrt(x)', 'sqrt(x^2 + 3) * sin(x) - cos(x)', 'x + 2pi + phi + e']
+        for numeric in MODES:
+            for text in texts:
+                for compiled in self.compile(text, numeric):
+                    with self.subTest(text=text, numeric=numeric, backend=compiled.__class__.__name__):
+                        variables = {'x': 4}
+                        expected = compiled.evaluate(variables)
+                        result = pickle.loads(pickle.dumps(compiled)).evaluate(variables)
+                        self.assertEqual(expected, result)
+                        self.assertIs(type(expected), type(result))
+        self.assertEqual(Fraction(2), pickle.loads(pickle.dumps(Expression('sqrt(x)').compile(numeric='fraction')))
+                         .evaluate({'x': 4}))
+
+    def test_unknown_mode_and_misplaced_context(self):
+        with self.assertRaises(ValueError):
+            Expression('x').compile(numeric='complex')
+        with self.assertRaises(ValueError):
+            numeric_mode('fraction', decimal.Context())
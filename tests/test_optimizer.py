@@ -0,0 +1,86 @@
+import unittest
+from expression import Expression
+from optimizer import fold_constants
+from tokenizer import Value, Variable, Operator, Function
+
+
+class OptimizerTest(unittest.TestCase):
+    def test_fold_constant_expression(self):
+        e = Expression('2*pi/360')
+        self.assertEqual([Value(2 * 3.141592653589793 / 360)], fold_constants(e.rpn))
+        self.assertEqual(4, e.eliminated_tokens)
+
+    def test_fold_constant_sub_expression(self):
+        e = Expression('x * sqrt(2)^2 + 1')
+        self.assertEqual([Variable('x'), Value(2.0000000000000004), Operator('*'), Value('1'), Operator('+')],
+                         fold_constants(e.rpn))
+
+    def test_fold_keeps_variable_sub_expressions(self):
+        e = Expression('sin(x) + cos(y)')
+        self.assertEqual(e.rpn, fold_constants(e.rpn))
+        self.assertEqual(0, e.eliminated_tokens)
+
+    def test_fold_keeps_failing_sub_expression(self):
+        e = Expression('x + 1/0')
+        self.assertEqual(e.rpn, fold_constants(e.rpn))
+        e.assign_value('x', 1)
+        with self.assertRaises(ZeroDivisionError):
+            e.compile().evaluate({'x': 1})
+
+    def test_fold_keeps_factorial_of_fraction(self):
+        e = Expression('(1/2)!')
+        self.assertEqual([Value(0.5), Operator('!')], fold_constants(e.rpn))
+
+    def test_simplify_identities(self):
+        sine = [Variable('x'), Function('sin')]
+        cases = {'sin(x)*1': sine, '1*sin(x)': sine, 'sin(x)-0': sine, 'sin(x)/1': sine, 'sin(x)^1': sine,
+                 '(x/2)*1': [Variable('x'), Value('2'), Operator('/')], '--x': [Variable('x')],
+                 'sin(x)*(3-2)': sine}
+        for text, expected in cases.items():
+            with self.subTest(text):
+                self.assertEqual(expected, fold_constants(Expression(text).rpn, simplify=True))
+
+    def test_simplify_keeps_the_result_of_evaluate(self):
+        # 'x + 0' turns -0.0 into 0.0 and the other identities turn integers into floats
+        cases = [('x+0', {'x': -0.0}), ('0+x', {'x': -0.0}), ('x*1', {'x': 3}), ('x/1', {'x': 3}),
+                 ('3!-0', {}), ('1*x!', {'x': 3}), ('x^1', {'x': 2})]
+        for text, variables in cases:
+            with self.subTest(text):
+                e = Expression(text, simplify=True)
+                self.assertEqual(e.rpn, e.optimized_rpn())
+                result = e.compile().evaluate(variables)
+                self.assertEqual(repr(e.evaluate(variables)), repr(result))
+
+    def test_simplify_is_disabled_by_default(self):
+        e = Expression('x*1')
+        self.assertEqual(e.rpn, fold_constants(e.rpn))
+
+    def test_simplify_keeps_non_identities(self):
+        e = Expression('1-x')
+        self.assertEqual(e.rpn, fold_constants(e.rpn, simplify=True))
+
+    def test_optimization_can_be_switched_off(self):
+        e = Expression('2*pi', optimize=False)
+        self.assertEqual(e.rpn, e.optimized_rpn())
+        self.assertEqual(0, e.eliminated_tokens)
+
+    def test_compiled_optimized_expression_matches_evaluate(self):
+        for text in ['2*pi/360*x', 'sqrt(2)^2 + x', '3 + 4 * 2 / ( 1 - 5 ) ^ 2 ^ 3 - x', 'radians(90)*sin(x)', '5!*x']:
+            with self.subTest(text):
+                e = Expression(text)
+                e.assign_value('x', 0.75)
+                self.assertEqual(e.evaluate(), e.compile().evaluate({'x': 0.75}))
+
+    def test_fold_keeps_integer_results(self):
+        e = Expression('25! + x!')
+        self.assertEqual(e.rpn, e.optimized_rpn())
+        self.assertEqual(15511210043330985984000001, e.compile().evaluate({'x': 0}))
+        self.assertEqual(e.evaluate({'x': 0}), e.compile().evaluate({'x': 0}))
+
+    def test_optimized_rpn_is_computed_once(self):
+        e = Expression('2*pi*x')
+        self.assertIs(e.optimized_rpn(), e.optimized_rpn())
+        e.simplify = True
+        self.assertEqual([Value(2 * 3.141592653589793), Variable('x'), Operator('*')], e.optimized_rpn())
+        e.rpn = Expression('sin(x)*1').rpn
+        self.assertEqual([Variable('x'), Function('sin')], e.optimized_rpn())
@@ -0,0 +1,46 @@
+import pickle
+import unittest
+from expression import Expression
+from parallel import parallel_evaluate
+from errors import UnassignedVariable
+
+
+class ParallelEvaluateTest(unittest.TestCase):
+    def setUp(self):
+        self.expression = Expression('sin(x)^2 + cbrt(y) - -x')
+        self.rows = [{'x': i / 10, 'y': i} for i in range(1000)]
+        self.expected = [self.expression.evaluate(row) for row in self.rows]
+
+    def test_evaluate_with_variables_does_not_change_expression(self):
+        e = Expression('x+1')
+        self.assertEqual(3, e.evaluate({'x': 2}))
+        self.assertEqual({'x': None}, e.variables)
+
+    def test_thread_backend_preserves_order(self):
+        results = parallel_evaluate(self.expression, self.rows, workers=4, backend='thread', chunk_size=7)
+        self.assertEqual(self.expected, list(results))
+
+    def test_process_backend_preserves_order(self):
+        results = parallel_evaluate(self.expression, iter(self.rows), workers=2, backend='process', chunk_size=64)
+        self.assertEqual(self.expected, list(results))
+
+    def test_process_backend_raises_worker_errors(self):
+        with self.assertRaises(UnassignedVariable):
+            list(parallel_evaluate(self.expression, [{'x': 1}], workers=1, backend='process'))
+
+    def test_empty_rows_produce_no_results(self):
+        self.assertEqual([], list(parallel_evaluate(self.expression, [], backend='thread')))
+
+    def test_unknown_backend_raises_error(self):
+        with self.assertRaises(ValueError):
+            parallel_evaluate(self.expression, self.rows, backend='gpu')
+
+    def test_invalid_chunk_size_or_workers_raises_error(self):
+        for arguments in [{'chunk_size': 0}, {'workers': 0}, {'workers': -2}]:
+            with self.subTest(**arguments):
+                with self.assertRaises(ValueError):
+                    parallel_evaluate(self.expression, self.rows, backend='thread', **arguments)
+
+    def test_compiled_expression_can_be_pickled(self):
+        compiled = pickle.loads(pickle.dumps(self.expression.compile()))
+        self.assertEqual(self.expected[5], compiled.evaluate(self.rows[5]))
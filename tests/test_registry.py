@@ -0,0 +1,141 @@
+import math
+import pickle
+import random
+import threading
+import unittest
+from expression import Expression
+from group import ExpressionGroup
+from incremental import IncrementalExpression
+from batch import parse_many
+from tokenizer import Tokenizer, Registry, DEFAULT_REGISTRY, Function, Constant, Variable, FUNCTION_TOKENS
+from errors import UnexpectedToken, InvalidFormat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def clamp(value, lo, hi):
+    return min(max(value, lo), hi)
+
+
+class RegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+        self.registry.register_function('clamp', clamp, 3, vectorized=None if np is None else np.clip)
+        self.registry.register_function('log', math.log, vectorized=None if np is None else np.log)
+        self.registry.register_constant('tau', 2 * math.pi)
+
+    def test_registered_functions_and_constants_are_tokenized(self):
+        tokens, _ = Tokenizer(self.registry).tokenize('clamp(x, 0, tau)')
+        self.assertIsInstance(tokens[0], Function)
+        self.assertEqual(3, tokens[0].operands_count)
+        self.assertIsInstance(tokens[-2], Constant)
+        self.assertIs(FUNCTION_TOKENS['sin'], Tokenizer(self.registry).tokenize('sin(x)')[0][0])
+
+    def test_evaluate_with_registered_functions(self):
+        e = Expression('clamp(log(x), 0, tau) + sin(0)', registry=self.registry)
+        self.assertAlmostEqual(1, e.evaluate({'x': math.e}))
+        self.assertAlmostEqual(2 * math.pi, e.evaluate({'x': 1e9}))
+
+    def test_registering_does_not_change_other_registries(self):
+        self.assertNotIn('clamp', DEFAULT_REGISTRY)
+        self.assertNotIn('clamp', Registry())
+        self.assertIsInstance(Tokenizer().tokenize('tau')[0][0], Variable)
+        with self.assertRaises(UnexpectedToken):
+            Expression('clamp(x, 0, 1)')
+        copy = self.registry.copy()
+        copy.register_constant('g', 9.81)
+        self.assertIn('clamp', copy)
+        self.assertNotIn('g', self.registry)
+
+    def test_registering_from_several_threads_keeps_every_name(self):
+        names = [''.join(chr(ord('a') + int(digit)) for digit in f'{i:03d}') + 'k' for i in range(400)]
+        threads = [threading.Thread(target=lambda part=part: [self.registry.register_constant(name, 1.)
+                                                              for name in part])
+                   for part in (names[i::8] for i in range(8))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], [name for name in names if name not in self.registry])
+
+    def test_registry_can_be_pickled(self):
+        registry = pickle.loads(pickle.dumps(self.registry))
+        self.assertAlmostEqual(1, Expression('log(x)', registry=registry).evaluate({'x': math.e}))
+        registry.register_constant('g', 9.81)
+        self.assertNotIn('g', self.registry)
+
+    def test_register_invalid_functions(self):
+        for name in ['log10', 'x_y', '']:
+            with self.subTest(name=name):
+                with self.assertRaises(ValueError):
+                    self.registry.register_function(name, math.log)
+        with self.assertRaises(ValueError):
+            self.registry.register_function('now', random.random, 0)
+
+    def test_empty_registry(self):
+        registry = Registry(defaults=False)
+        self.assertIsInstance(Tokenizer(registry).tokenize('pi')[0][0], Variable)
+
+    def test_pure_functions_are_folded(self):
+        e = Expression('clamp(5, 0, 1) * x', registry=self.registry)
+        self.assertEqual(2, len(e.optimized_rpn()) - 1)
+
+    def test_impure_functions_are_never_folded_or_memoized(self):
+        self.registry.register_function('jitter', lambda value: value + random.random(), pure=False)
+        e = Expression('jitter(1) * x', registry=self.registry)
+        self.assertEqual(e.rpn, e.optimized_rpn())
+        self.assertNotEqual(e.compile().evaluate({'x': 1}), e.compile().evaluate({'x': 1}))
+        with self.assertRaises(ValueError):
+            e.memoize()
+        Expression('clamp(x, 0, 1)', registry=self.registry).memoize()
+
+    def test_impure_functions_are_never_shared_or_cached(self):
+        self.registry.register_function('jitter', lambda value: value + random.random(), pure=False)
+        group = ExpressionGroup([Expression('jitter(x) - jitter(x)', registry=self.registry)])
+        self.assertNotEqual([0], group.evaluate_all({'x': 1}))
+        e = IncrementalExpression('jitter(x) + y', registry=self.registry)
+        e.assign_value('x', 1)
+        e.assign_value('y', 1)
+        self.assertNotEqual(e.evaluate(), e.evaluate())
+
+    def test_group_does_not_share_functions_of_other_registries(self):
+        self.registry.register_function('sin', lambda value: 2 * value)
+        group = ExpressionGroup([Expression('sin(x)'), Expression('sin(x)', registry=self.registry)])
+        self.assertEqual([math.sin(1), 2], group.evaluate_all({'x': 1}))
+
+    def test_rules_of_built_in_functions_are_not_used_for_registered_ones(self):
+        self.registry.register_function('sin', lambda value: 2 * value)
+        e = Expression('sin(x) + log(x)', registry=self.registry)
+        for evaluate in [lambda: e.gradient({'x': 1}), lambda: e.evaluate_interval({'x': (1, 2)})]:
+            with self.assertRaisesRegex(ValueError, "registered function 'sin'"):
+                evaluate()
+        self.assertEqual((math.sin(1), {'x': math.cos(1)}), Expression('sin(x)').gradient({'x': 1}))
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_evaluate_batch_uses_vectorized_counterparts(self):
+        e = Expression('clamp(x, 0, 1) + log(y)', registry=self.registry)
+        np.testing.assert_allclose([0, 1.5, 1 + math.log(3)], e.evaluate_batch(x=[-1, 0.5, 2], y=[1, math.e, 3]))
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_evaluate_batch_applies_functions_without_counterpart_element_by_element(self):
+        self.registry.register_function('max', lambda a, b: a if a > b else -b, 2)
+        e = Expression('max(x, 1)', registry=self.registry)
+        np.testing.assert_allclose([2., -1.], e.evaluate_batch(x=[2, 0]))
+        self.assertEqual([3, 1], list(Expression('max + 1').evaluate_batch(max=[2, 0])))
+
+    def test_load_with_registry(self):
+        data = Expression('clamp(x, 0, tau)', registry=self.registry).dump()
+        self.assertEqual(1, Expression.load(data, registry=self.registry).evaluate({'x': 1}))
+        with self.assertRaises(InvalidFormat):
+            Expression.load(data)
+
+    def test_parse_many_with_registry(self):
+        texts = ['log(x) + tau', 'clamp(x)', 'log(x) + tau']
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                results = list(parse_many(texts, workers=workers, registry=self.registry))
+                self.assertEqual([True, False, True], [result.ok for result in results])
+                self.assertAlmostEqual(2 * math.pi, results[2].expression.evaluate({'x': 1}))
@@ -0,0 +1,160 @@
+import math
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+from expression import Expression
+from tokenizer import Registry
+from incremental import IncrementalExpression
+from bundle import ExpressionBundle, write_bundle
+from serialization import EXPRESSION_HEADER, INSTRUCTION, FORMAT_VERSION
+from errors import InvalidFormat
+
+
+class SerializationTest(unittest.TestCase):
+    EXPRESSIONS = ['1 + 2', '2pi * r', 'sin(radians(theta))^2 + x/y^3 - sqrt(x*y)', '-(x - 1.5)! * e',
+                   '2(x + 1)(y - .5)', 'cbrt(phi) / tan(x) - -x', 'abc + abc * abd']
+
+    def test_dump_and_load_round_trip(self):
+        for text in self.EXPRESSIONS:
+            with self.subTest(text=text):
+                e = Expression(text)
+                loaded = Expression.load(e.dump())
+                self.assertEqual(e.tokens, loaded.tokens)
+                self.assertEqual(e.rpn, loaded.rpn)
+                self.assertEqual(e.variables, loaded.variables)
+                variables = {name: 1.5 + i for i, name in enumerate(sorted(e.variables))}
+                self.assertEqual(e.evaluate(variables), loaded.evaluate(variables))
+
+    def test_load_interns_tokens(self):
+        e = Expression.load(Expression('x * x + sin(x)').dump())
+        variables = [token for token in e.tokens if token.__class__.__name__ == 'Variable']
+        self.assertIs(variables[0], variables[1])
+        self.assertIs(e.tokens[1], Expression('1 * 1').tokens[1])
+
+    def test_load_as_subclass(self):
+        e = IncrementalExpression.load(Expression('x + y').dump())
+        self.assertIsInstance(e, IncrementalExpression)
+        e.assign_value('x', 1)
+        e.assign_value('y', 2)
+        self.assertEqual(3, e.evaluate())
+
+    def test_dump_is_smaller_than_pickle(self):
+        e = Expression('sin(radians(theta))^2 + x/y^3 - sqrt(x*y)')
+        self.assertLess(len(e.dump()), len(pickle.dumps((e.tokens, e.variables, e.rpn))) / 2)
+
+    def test_load_rejects_invalid_data(self):
+        data = Expression('x + 1').dump()
+        cases = {'empty': b'',
+                 'magic': b'XXXX' + data[4:],
+                 'truncated': data[:-1],
+                 'trailing': data + b'\x00',
+                 'corrupted': data[:-1] + bytes([data[-1] ^ 0xFF])}
+        for name, invalid in cases.items():
+            with self.subTest(name=name):
+                with self.assertRaises(InvalidFormat):
+                    Expression.load(invalid)
+
+    def test_load_rejects_other_versions(self):
+        data = Expression('x + 1').dump()
+        data = data[:4] + struct.pack('<B', FORMAT_VERSION + 1) + data[5:]
+        with self.assertRaisesRegex(InvalidFormat, 'version'):
+            Expression.load(data)
+
+    def test_load_reads_records_of_version_1(self):
+        data = Expression('x + 1').dump()
+        data = data[:4] + struct.pack('<B', 1) + data[5:]
+        self.assertEqual(3, Expression.load(data).evaluate({'x': 2}))
+
+    def test_dump_and_load_functions_of_several_arguments(self):
+        registry = Registry()
+        registry.register_function('max', max, 2)
+        registry.register_function('hypot', math.hypot, 2)
+        original = Expression('max(x, 2) + hypot(x, max(y, 4))', registry=registry)
+        e = Expression.load(original.dump(), registry=registry)
+        self.assertEqual(original.evaluate({'x': 3, 'y': 4}), e.evaluate({'x': 3, 'y': 4}))
+        self.assertEqual(original.rpn, e.rpn)
+
+    def test_dump_rejects_tables_larger_than_the_format_allows(self):
+        Expression('+'.join(map(str, range(2 ** 16 - 1)))).dump()
+        with self.assertRaisesRegex(ValueError, 'too many'):
+            Expression('+'.join(map(str, range(2 ** 16)))).dump()
+
+    def test_load_validates_rpn(self):
+        # The RPN of '1 2 +' is swapped to '1 + 2' with a valid checksum, so only the validation can reject it
+        data = Expression('1 + 2').dump()
+        header = list(EXPRESSION_HEADER.unpack_from(data))
+        body = data[EXPRESSION_HEADER.size:]
+        last, second = -INSTRUCTION.size, -2 * INSTRUCTION.size
+        body = body[:second] + body[last:] + body[second:last]
+        header[2] = zlib.crc32(body)
+        with self.assertRaisesRegex(InvalidFormat, 'operands'):
+            Expression.load(EXPRESSION_HEADER.pack(*header) + body)
+
+
+class ExpressionBundleTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'expressions.mpxb')
+
+    def test_bundle_round_trip(self):
+        texts = SerializationTest.EXPRESSIONS
+        write_bundle(self.path, texts)
+        with ExpressionBundle(self.path) as bundle:
+            self.assertEqual(len(texts), len(bundle))
+            self.assertEqual(texts, list(bundle))
+            for text in texts:
+                self.assertEqual(Expression(text).rpn, bundle[text].rpn)
+
+    def test_bundle_is_materialized_lazily(self):
+        write_bundle(self.path, {'area': 'pi * r^2', 'perimeter': Expression('2pi * r')})
+        with ExpressionBundle(self.path) as bundle:
+            self.assertEqual(0, bundle.materialized)
+            self.assertAlmostEqual(12.566370614359172, bundle['area'].evaluate({'r': 2}))
+            self.assertEqual(1, bundle.materialized)
+            self.assertIn('perimeter', bundle)
+            self.assertIsNone(bundle.get('volume'))
+            self.assertEqual(1, bundle.materialized)
+
+    def test_bundle_returns_independent_expressions(self):
+        write_bundle(self.path, ['x + 1'])
+        with ExpressionBundle(self.path) as bundle:
+            first, second = bundle['x + 1'], bundle['x + 1']
+            first.assign_value('x', 1)
+            self.assertEqual({'x': None}, second.variables)
+            first.simplify = True
+            self.assertEqual((True, False), (first.simplify, second.simplify))
+
+    def test_empty_bundle(self):
+        write_bundle(self.path, [])
+        with ExpressionBundle(self.path) as bundle:
+            self.assertEqual(0, len(bundle))
+
+    def test_bundle_rejects_keys_too_long_without_writing(self):
+        write_bundle(self.path, {'x' * (2 ** 16 - 1): 'x'})
+        os.remove(self.path)
+        with self.assertRaisesRegex(ValueError, 'too long'):
+            write_bundle(self.path, ['x + 1', 'x' + ' + x' * 2 ** 14])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_invalid_bundle(self):
+        for content in [b'', b'MPXB', b'not a bundle at all']:
+            with self.subTest(content=content):
+                with open(self.path, 'wb') as file:
+                    file.write(content)
+                with self.assertRaises(InvalidFormat):
+                    ExpressionBundle(self.path)
+
+    def test_corrupted_entry_is_rejected_on_use(self):
+        write_bundle(self.path, ['x + 1', 'x + 2'])
+        with open(self.path, 'r+b') as file:
+            file.seek(-1, os.SEEK_END)
+            file.write(b'\xff')
+        with ExpressionBundle(self.path) as bundle:
+            self.assertEqual(2, bundle['x + 1'].evaluate({'x': 1}))
+            with self.assertRaises(InvalidFormat):
+                bundle.get('x + 2')
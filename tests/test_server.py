@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import unittest
+from unittest import mock
+from server import EvaluationServer
+from tokenizer import Registry
+from client import EvaluationClient
+from errors import UnassignedVariable
+from src.errors import UnmatchingOpenParentheses
+
+
+class EvaluationServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await EvaluationServer(batch_size=64, batch_delay=0.01).start()
+        self.client = await EvaluationClient.connect(*self.server.address)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def test_evaluate(self):
+        self.assertEqual(7, await self.client.evaluate('x * y + 1', {'x': 2, 'y': 3}))
+        self.assertEqual(4, await self.client.evaluate('2 + 2'))
+
+    async def test_concurrent_requests_are_batched(self):
+        rows = [{'x': i} for i in range(200)]
+        results = await self.client.evaluate_many('x ^ 2 + 1', rows)
+        self.assertEqual([i ** 2 + 1 for i in range(200)], results)
+        stats = await self.client.stats()
+        self.assertEqual(200, stats['requests'])
+        self.assertLess(stats['batches'], 10)
+        self.assertGreater(stats['mean_batch_size'], 20)
+        self.assertEqual(1, stats['expressions'])
+
+    async def test_batches_are_per_expression(self):
+        results = await asyncio.gather(self.client.evaluate('x + 1', {'x': 1}),
+                                       self.client.evaluate('x * 10', {'x': 1}),
+                                       self.client.evaluate('x + 1', {'x': 2}))
+        self.assertEqual([2, 10, 3], results)
+
+    async def test_errors_are_raised_on_the_client(self):
+        with self.assertRaises(UnassignedVariable):
+            await self.client.evaluate('x + y', {'x': 1})
+        with self.assertRaises(ZeroDivisionError):
+            await self.client.evaluate('1 / x', {'x': 0})
+        with self.assertRaises(UnmatchingOpenParentheses):
+            await self.client.evaluate('(x + 1', {'x': 0})
+        with self.assertRaises(ValueError):
+            await self.client.evaluate('x ^ 0.5', {'x': -1})
+        self.assertEqual(3, await self.client.evaluate('x + 1', {'x': 2}))
+        self.assertEqual(4, (await self.client.stats())['errors'])
+
+    async def test_stats(self):
+        await self.client.evaluate_many('x + 1', [{'x': i} for i in range(10)])
+        stats = self.server.stats()
+        self.assertEqual(0, stats['pending'])
+        self.assertGreater(stats['throughput'], 0)
+        self.assertEqual({'p50', 'p90', 'p99', 'max'}, set(stats['latency_ms']))
+        self.assertLessEqual(stats['latency_ms']['p50'], stats['latency_ms']['max'])
+
+    async def test_invalid_request(self):
+        reader, writer = await asyncio.open_connection(*self.server.address)
+        writer.write(b'not json\n{"id": 1}\n')
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in range(2)]
+        writer.close()
+        self.assertEqual(['JSONDecodeError', 'KeyError'], [response['error'] for response in responses])
+        self.assertEqual(1, responses[1]['id'])
+
+    async def test_request_that_is_not_an_object(self):
+        reader, writer = await asyncio.open_connection(*self.server.address)
+        writer.write(b'[1]\n"x"\n3\n')
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in range(3)]
+        writer.close()
+        self.assertEqual(['ValueError'] * 3, [response['error'] for response in responses])
+
+    async def test_invalid_variables_only_fail_their_request(self):
+        reader, writer = await asyncio.open_connection(*self.server.address)
+        writer.write(b'{"id": 1, "expression": "x + 1", "variables": [1]}\n'
+                     b'{"id": 2, "expression": "x + 1", "variables": "x"}\n')
+        await writer.drain()
+        responses = sorted([json.loads(await reader.readline()) for _ in range(2)], key=lambda response: response['id'])
+        writer.close()
+        self.assertEqual(['ValueError'] * 2, [response['error'] for response in responses])
+        self.assertEqual(2, await self.client.evaluate('x + 1', {'x': 1}))
+
+    async def test_expression_that_is_not_a_string(self):
+        reader, writer = await asyncio.open_connection(*self.server.address)
+        writer.write(b'{"id": 1, "expression": 5}\n{"id": 2, "expression": ["x"]}\n')
+        await writer.drain()
+        lines = [await asyncio.wait_for(reader.readline(), 5) for _ in range(2)]
+        responses = sorted(map(json.loads, lines), key=lambda response: response['id'])
+        writer.close()
+        self.assertEqual(['ValueError'] * 2, [response['error'] for response in responses])
+
+    async def test_unexpected_error_is_answered(self):
+        reader, writer = await asyncio.open_connection(*self.server.address)
+        with mock.patch.object(self.server, 'submit', side_effect=RuntimeError('unexpected')):
+            writer.write(b'{"id": 1, "expression": "x"}\n')
+            await writer.drain()
+            response = json.loads(await asyncio.wait_for(reader.readline(), 5))
+        writer.close()
+        self.assertEqual({'id': 1, 'error': 'RuntimeError', 'message': 'unexpected'}, response)
+        self.assertEqual(0, self.server.pending)
+
+    async def test_failure_in_a_batch_only_fails_its_request(self):
+        # An exception outside the request errors must not leave the other requests of the batch waiting
+        results = await asyncio.gather(self.server.submit('x + 1', {'x': 1}), self.server.submit('x + 1', [1]),
+                                       self.server.submit('x + 1', {'x': 2}), return_exceptions=True)
+        self.assertEqual([2, 3], [results[0], results[2]])
+        self.assertIsInstance(results[1], AttributeError)
+
+
+class RegistryTest(unittest.IsolatedAsyncioTestCase):
+    async def test_evaluate_registered_functions(self):
+        registry = Registry()
+        registry.register_function('max', max, 2)
+        server = await EvaluationServer(registry=registry).start()
+        async with server, await EvaluationClient.connect(*server.address) as client:
+            self.assertEqual(3, await client.evaluate('max(x, 2) + 1', {'x': 1}))
+
+
+class BackpressureTest(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_over_the_limit_wait(self):
+        server = await EvaluationServer(max_pending=2, batch_delay=0.001).start()
+        async with server, await EvaluationClient.connect(*server.address) as client:
+            results = await client.evaluate_many('x - 1', [{'x': i} for i in range(100)])
+            self.assertEqual([i - 1 for i in range(100)], results)
+            self.assertLessEqual(server.stats()['mean_batch_size'], 2)
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets are not available')
+class UnixSocketTest(unittest.IsolatedAsyncioTestCase):
+    async def test_evaluate_over_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'mathparser.sock')
+            server = await EvaluationServer().start(path=path)
+            async with server, await EvaluationClient.connect(path=path) as client:
+                self.assertEqual(6, await client.evaluate('x!', {'x': 3}))
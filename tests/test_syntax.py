@@ -0,0 +1,107 @@
+import math
+import unittest
+from expression import Expression
+from tokenizer import Tokenizer, Registry, Value, Variable, Operator, Function, Constant
+from syntax import parse, to_rpn, Number, Name, NamedConstant, UnaryOperation, BinaryOperation, Call
+from errors import UnexpectedToken
+
+
+# Functions of several arguments are not built in, these are registered to parse commas
+REGISTRY = Registry()
+REGISTRY.register_function('max', max, 2)
+REGISTRY.register_function('min', min, 2)
+REGISTRY.register_function('hypot', math.hypot, 2)
+
+
+def tree(text):
+    return parse(Tokenizer(REGISTRY).tokenize(text)[0])
+
+
+def rpn(text):
+    return [getattr(token, 'symbol', None) or token.value for token in to_rpn(tree(text))]
+
+
+class SyntaxTreeTest(unittest.TestCase):
+    def test_parse_builds_typed_nodes(self):
+        expected = BinaryOperation(Operator('+'), Number(Value('1')),
+                                   BinaryOperation(Operator('*'), Name(Variable('x')),
+                                                   Call(Function('sin'), NamedConstant(Constant('pi')))))
+        self.assertEqual(expected, tree('1 + x * sin(pi)'))
+        self.assertEqual('x', tree('1 + x * 2').right.left.token.symbol)
+
+    def test_parse_precedence_and_associativity(self):
+        cases = {'1 - 2 - 3': ['1', '2', '-', '3', '-'],
+                 '2 ^ 3 ^ 2': ['2', '3', '2', '^', '^'],
+                 '1 + 2 * 3': ['1', '2', '3', '*', '+'],
+                 '(1 + 2) * 3': ['1', '2', '+', '3', '*'],
+                 '-2 ^ 2': ['2', '-u', '2', '^'],
+                 '2 ^ -3': ['2', '3', '-u', '^'],
+                 '-x!': ['x', '!', '-u'],
+                 '2 ^ 3!': ['2', '3', '!', '^'],
+                 '3 + 4 * 2 / ( 1 - 5 ) ^ 2 ^ 3': ['3', '4', '2', '*', '1', '5', '-', '2', '3', '^', '^', '/', '+']}
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(expected, rpn(text))
+
+    def test_parse_functions_of_several_arguments(self):
+        self.assertEqual(['x', '2', 'max', '3', '4', 'hypot', '+'], rpn('max(x, 2) + hypot(3, 4)'))
+        e = Expression('max(x, 2) + hypot(3, 4) - min(1, max(2, 3))', registry=REGISTRY)
+        self.assertEqual(7, e.evaluate({'x': 3}))
+
+    def test_names_of_registered_functions_are_variables_by_default(self):
+        self.assertEqual(3, Expression('max+1').evaluate({'max': 2}))
+        self.assertEqual(4, Expression('min*2').evaluate({'min': 2}))
+        self.assertEqual(5, Expression('hypot').evaluate({'hypot': 5}))
+
+    def test_parse_function_without_parentheses(self):
+        self.assertEqual(['x', '-u', 'sin', '1', '+'], rpn('sin-x + 1'))
+        self.assertAlmostEqual(1 - math.sin(1), Expression('sin-x + 1').evaluate({'x': 1}))
+
+    def test_parse_negation_after_parentheses_and_postfix_operators(self):
+        self.assertEqual(-2, Expression('(-2)').evaluate())
+        self.assertAlmostEqual(-math.sin(1), Expression('sin(-x)').evaluate({'x': 1}))
+        self.assertEqual(4, Expression('3!-2').evaluate())
+        self.assertEqual(-1, Expression('max(-1, -2)', registry=REGISTRY).evaluate())
+
+    def test_parse_subtraction_after_postfix_operators(self):
+        cases = [('a*b!-c', {'a': 2, 'b': 3, 'c': 1}, 11, ['a', 'b', '!', '*', 'c', '-']),
+                 ('-a!-b', {'a': 3, 'b': 1}, -7, ['a', '!', '-u', 'b', '-']),
+                 ('a/b!-c', {'a': 2, 'b': 2, 'c': 1}, 0, ['a', 'b', '!', '/', 'c', '-']),
+                 ('a^b!-c', {'a': 2, 'b': 2, 'c': 1}, 3, ['a', 'b', '!', '^', 'c', '-'])]
+        for text, variables, value, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(expected, rpn(text))
+                self.assertEqual(value, Expression(text).evaluate(variables))
+
+    def test_parse_empty_expression(self):
+        for text in ['', '   ']:
+            with self.subTest(text=text):
+                with self.assertRaises(UnexpectedToken) as context:
+                    Expression(text)
+                self.assertEqual(0, context.exception.position)
+
+    def test_parse_long_chains_without_recursion(self):
+        e = Expression('x' + ' + x' * 5000)
+        self.assertEqual(5001, e.evaluate({'x': 1}))
+
+    def test_parse_deep_nesting_without_recursion(self):
+        cases = ['(' * 3000 + '1' + ')' * 3000, ' ^ '.join(['1'] * 3000), '-' * 3000 + '1',
+                 'cos(' * 3000 + '0' + ')' * 3000, 'max(1, ' * 3000 + '1' + ')' * 3000, 'sin-' * 3000 + 'x']
+        for text in cases:
+            with self.subTest(text=text[:20]):
+                e = Expression(text, registry=REGISTRY)
+                self.assertEqual(e.evaluate({'x': 0}), e.compile('ast').evaluate({'x': 0}))
+
+    def test_parse_invalid_expressions(self):
+        cases = {'1 +': 2, '* 2': 0, 'max(1)': 3, 'sin(1, 2)': 5, '(1, 2)': 2, 'x(1)': 1, 'sqrt2': 1}
+        for text, position in cases.items():
+            with self.subTest(text=text):
+                with self.assertRaises(UnexpectedToken) as context:
+                    Expression(text, registry=REGISTRY)
+                self.assertEqual(position, context.exception.position)
+
+    def test_syntax_tree_of_expression(self):
+        e = Expression('hypot(x, y)', registry=REGISTRY)
+        self.assertIsInstance(e.syntax_tree(), Call)
+        self.assertEqual(e.rpn, to_rpn(e.syntax_tree()))
+        self.assertIsInstance(tree('-x'), UnaryOperation)
@@ -1,6 +1,7 @@
 import unittest
 from src.errors import UnmatchingOpenParentheses, UnmatchingCloseParentheses, UnexpectedCharacter
-from src.tokenizer import Tokenizer, Value, Operator, Constant, Variable, Function, OpenParentheses, CloseParentheses
+from src.tokenizer import Tokenizer, Value, Operator, Constant, Variable, Function, OpenParentheses, CloseParentheses, \
+    Comma, Registry
 
 
 class TokenizerTest(unittest.TestCase):
@@ -174,3 +175,11 @@ class TokenizerTest(unittest.TestCase):
                            Value('10')]
         self.assertEqual(expected_tokens, tokens)
         self.assertEqual({'x'}, variables)
+
+    def test_parse_function_arguments(self):
+        registry = Registry()
+        registry.register_function('max', max, 2)
+        tokens, variables = Tokenizer(registry).tokenize('max(x,2)')
+        expected_tokens = [registry['max'], OpenParentheses(), Variable('x'), Comma(), Value('2'), CloseParentheses()]
+        self.assertEqual(expected_tokens, tokens)
+        self.assertEqual({'x'}, variables)
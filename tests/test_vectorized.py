@@ -0,0 +1,61 @@
+import math
+import unittest
+from errors import UnassignedVariable
+from expression import Expression
+from tokenizer import Registry
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class VectorizedTest(unittest.TestCase):
+    def assertMatchesEvaluate(self, text, registry=None, **columns):
+        e = Expression(text, registry=registry)
+        results = e.evaluate_batch(**columns)
+        for index, result in enumerate(results):
+            for name, column in columns.items():
+                e.assign_value(name, column[index])
+            self.assertAlmostEqual(e.evaluate(), result, 12)
+
+    def test_evaluate_batch_matches_evaluate_for_operators(self):
+        self.assertMatchesEvaluate('-x + y - x * y / 2 ^ y', x=[1, 2.5, -3, 0], y=[4, 0.5, 2, 3])
+
+    def test_evaluate_batch_matches_evaluate_for_functions(self):
+        self.assertMatchesEvaluate('sqrt(x) + cbrt(x) + sin(x) + cos(x) + tan(x) + radians(x) + degrees(x)',
+                                   x=[0, 0.25, 1, 8, 27, 100])
+        self.assertMatchesEvaluate('cbrt(x)', x=[-27, -0.5, -0., 8])
+
+    def test_evaluate_batch_matches_evaluate_for_functions_of_two_arguments(self):
+        registry = Registry()
+        registry.register_function('hypot', math.hypot, 2, vectorized=np.hypot)
+        registry.register_function('max', max, 2, vectorized=np.fmax)
+        registry.register_function('min', min, 2, vectorized=np.fmin)
+        self.assertMatchesEvaluate('hypot(x, y) + max(x, y) - min(x, y)', registry, x=[1, 2.5, -3, 0], y=[4, 0.5, 2, 0])
+
+    def test_evaluate_batch_matches_evaluate_for_factorial(self):
+        self.assertMatchesEvaluate('x! + 1', x=[0, 1, 5, 10])
+
+    def test_evaluate_batch_factorial_overflows_to_infinity(self):
+        np.testing.assert_array_equal([6, float(math.factorial(170)), np.inf, np.inf],
+                                      Expression('x!').evaluate_batch(x=[3, 170, 171, 1e6]))
+
+    def test_evaluate_batch_factorial_without_result_is_nan(self):
+        np.testing.assert_array_equal([np.nan, 2, np.nan, np.nan, np.inf],
+                                      Expression('x!').evaluate_batch(x=[1.5, 2, -1, np.nan, np.inf]))
+
+    def test_evaluate_batch_broadcasts_constant_expression(self):
+        results = Expression('2pi + x - x').evaluate_batch(x=np.zeros(3))
+        np.testing.assert_array_equal(np.full(3, Expression('2pi').evaluate()), results)
+
+    def test_evaluate_batch_without_variables_returns_scalar_array(self):
+        self.assertEqual(1024, Expression('2^10').evaluate_batch())
+
+    def test_evaluate_batch_division_by_zero_returns_infinity(self):
+        np.testing.assert_array_equal([np.inf, -np.inf], Expression('x/0').evaluate_batch(x=[1, -1]))
+
+    def test_evaluate_batch_raises_unassigned_variable_error(self):
+        with self.assertRaises(UnassignedVariable):
+            Expression('x+y').evaluate_batch(x=[1, 2])